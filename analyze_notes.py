@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Run NLP analysis over a file of transcribed notes
+
+Usage:
+    python analyze_notes.py notes.ndjson -o results.ndjson
+    python analyze_notes.py notes.ndjson --chunk-size 500
+
+Each input line is a JSON string or an {"id": ..., "text": ...} object.
+Results are written as NDJSON in input order; notes are analyzed in
+parallel on NLP_BATCH_WORKERS processes (one per CPU by default).
+"""
+import argparse
+import json
+import os
+import sys
+
+# Add current directory to path
+sys.path.append(os.getcwd())
+
+from server_py.services.nlp_batch import (
+    BATCH_CHUNK_SIZE, BatchStats, analyze_texts, parse_ndjson_line, shutdown_pool
+)
+
+def read_items(path):
+    with open(path, encoding="utf-8") as f:
+        for index, line in enumerate(line for line in f if line.strip()):
+            _, doc_id, text = parse_ndjson_line(index, line)
+            yield {"id": doc_id, "text": text} if doc_id is not None else text
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze notes from an NDJSON file in parallel")
+    parser.add_argument("path")
+    parser.add_argument("-o", "--output", help="results file (default: stdout)")
+    parser.add_argument("--chunk-size", type=int, default=BATCH_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    stats = BatchStats()
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    next_report = 10000
+    try:
+        for result in analyze_texts(read_items(args.path), chunk_size=args.chunk_size, stats=stats):
+            out.write(json.dumps(result) + "\n")
+            if args.output and stats.documents >= next_report:
+                print(f"   ✓ {stats.documents} notes ({stats.docs_per_second:.0f} notes/sec)")
+                next_report += 10000
+    finally:
+        if args.output:
+            out.close()
+        shutdown_pool()
+
+    print(f"\n✅ Analyzed {stats.documents} notes in {stats.seconds:.1f}s "
+          f"({stats.docs_per_second:.0f} notes/sec, {stats.failed} failed)", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Backfill the patient_events store from existing appointments, lab results,
+notes, files, prescriptions, bills and payments.
+
+Run once on every deploy, before the new app serves traffic (Procfile
+release phase, nixpacks build). Until it has run, records written before the
+event store existed are missing from patient timelines.
+
+Safe to re-run: only records without a patient_events entry are added, and
+source tables that do not exist yet (a fresh database) are skipped.
+"""
+import os
+import sys
+from sqlalchemy import and_, exists, inspect
+
+# Add current directory to path
+sys.path.append(os.getcwd())
+
+from server_py.db.session import engine, Base, SessionLocal
+from server_py.models.patient_event import PatientEvent
+from server_py.services.patient_events import EVENT_SOURCES, PatientEventService
+
+BATCH_SIZE = 1000
+
+def backfill():
+    print("Creating patient_events table...")
+    Base.metadata.create_all(bind=engine, tables=[PatientEvent.__table__])
+
+    db = SessionLocal()
+    try:
+        events = PatientEventService(db)
+        tables = inspect(engine)
+        for event_type, (model, _) in EVENT_SOURCES.items():
+            if not tables.has_table(model.__tablename__):
+                print(f"   - {event_type}: no {model.__tablename__} table yet")
+                continue
+            missing = ~exists().where(and_(
+                PatientEvent.event_type == event_type,
+                PatientEvent.source_id == model.id
+            ))
+            total = 0
+            last_id = ""
+            while True:
+                # Keyset over the primary key so each batch commits independently
+                batch = db.query(model).filter(model.id > last_id, missing).order_by(model.id).limit(BATCH_SIZE).all()
+                if not batch:
+                    break
+                for record in batch:
+                    events.record(event_type, record, "created")
+                db.commit()
+                total += len(batch)
+                last_id = batch[-1].id
+            print(f"   ✓ {event_type}: {total} events backfilled")
+
+        print("\n✅ Patient event backfill completed successfully!")
+    except Exception as e:
+        print(f"\n❌ Error during backfill: {e}")
+        db.rollback()
+        sys.exit(1)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    backfill()
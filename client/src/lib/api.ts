@@ -1,3 +1,5 @@
+import { NEXT_CURSOR_HEADER, withCursor } from './queryClient';
+
 // API Configuration for Python FastAPI Backend
 const API_URL = import.meta.env.VITE_API_URL || 'https://tegaconsults-cloud-digital-doctors.onrender.com';
 
@@ -5,7 +7,7 @@ console.log('🔗 API URL:', API_URL);
 console.log('🔧 VITE_API_URL env:', import.meta.env.VITE_API_URL);
 
 // Generic fetch wrapper with error handling
-async function apiFetch(endpoint: string, options: RequestInit = {}) {
+async function apiResponse(endpoint: string, options: RequestInit = {}) {
   const url = `${API_URL}${endpoint}`;
   
   const defaultOptions: RequestInit = {
@@ -23,9 +25,20 @@ async function apiFetch(endpoint: string, options: RequestInit = {}) {
     throw new Error(error.detail || `HTTP ${response.status}: ${response.statusText}`);
   }
 
+  return response;
+}
+
+async function apiFetch(endpoint: string, options: RequestInit = {}) {
+  const response = await apiResponse(endpoint, options);
   return response.json();
 }
 
+// One page of a list endpoint (patients, appointments); pass nextCursor back for the next page
+async function apiFetchPage(endpoint: string, cursor?: string | null) {
+  const response = await apiResponse(withCursor(endpoint, cursor));
+  return { items: await response.json(), nextCursor: response.headers.get(NEXT_CURSOR_HEADER) };
+}
+
 // Authentication API
 export const authAPI = {
   login: (username: string, password: string) =>
@@ -79,7 +92,7 @@ export const usersAPI = {
 
 // Patients API
 export const patientsAPI = {
-  getAll: () => apiFetch('/api/patients'),
+  getPage: (cursor?: string | null) => apiFetchPage('/api/patients', cursor),
   
   getById: (id: string) => apiFetch(`/api/patients/${id}`),
   
@@ -98,7 +111,7 @@ export const patientsAPI = {
 
 // Appointments API
 export const appointmentsAPI = {
-  getAll: () => apiFetch('/api/appointments'),
+  getPage: (cursor?: string | null) => apiFetchPage('/api/appointments', cursor),
   
   getById: (id: string) => apiFetch(`/api/appointments/${id}`),
   
@@ -23,6 +23,28 @@ export async function apiRequest(
   return res;
 }
 
+// List endpoints return one page at a time and put the next page's cursor in
+// this header; pass it back as `cursor` to load the following page
+export const NEXT_CURSOR_HEADER = "X-Next-Cursor";
+
+export interface Page<T> {
+  items: T[];
+  nextCursor: string | null;
+}
+
+export function withCursor(url: string, cursor?: string | null): string {
+  if (!cursor) return url;
+  return `${url}${url.includes("?") ? "&" : "?"}cursor=${encodeURIComponent(cursor)}`;
+}
+
+// One page of a list endpoint, for useInfiniteQuery:
+//   queryFn: ({ pageParam }) => fetchPage<Patient>("/api/patients", pageParam),
+//   getNextPageParam: (lastPage) => lastPage.nextCursor,
+export async function fetchPage<T>(url: string, cursor?: string | null): Promise<Page<T>> {
+  const res = await apiRequest("GET", withCursor(url, cursor));
+  return { items: await res.json(), nextCursor: res.headers.get(NEXT_CURSOR_HEADER) };
+}
+
 type UnauthorizedBehavior = "returnNull" | "throw";
 export const getQueryFn: <T>(options: {
   on401: UnauthorizedBehavior;
@@ -1,7 +1,7 @@
 import { useState } from "react";
 import { useLocation } from "wouter";
 import { useAuth } from "@/lib/auth-context";
-import { useQuery, useMutation } from "@tanstack/react-query";
+import { useInfiniteQuery, useQuery, useMutation } from "@tanstack/react-query";
 import {
   Search,
   Plus,
@@ -21,12 +21,23 @@ import { Skeleton } from "@/components/ui/skeleton";
 import { Badge } from "@/components/ui/badge";
 import { Tabs, TabsContent, TabsList, TabsTrigger } from "@/components/ui/tabs";
 import { useToast } from "@/hooks/use-toast";
-import { apiRequest } from "@/lib/queryClient";
+import { apiRequest, fetchPage } from "@/lib/queryClient";
 import { ChatBot } from "@/components/chatbot";
 import type { Patient, HealthAssessment } from "@shared/schema";
 
 type PatientStatusFilter = "all" | "new" | "last-visit" | "critical" | "low-risk" | "booked" | "discharged" | "death";
 
+interface PatientStatusCounts {
+  total: number;
+  new: number;
+  lastVisit: number;
+  critical: number;
+  lowRisk: number;
+  booked: number;
+  discharged: number;
+  death: number;
+}
+
 interface PatientStatus {
   isNew: boolean;
   isLastVisit: boolean;
@@ -50,15 +61,31 @@ export default function Dashboard() {
   const [showCDS, setShowCDS] = useState(false);
   const [statusFilter, setStatusFilter] = useState<PatientStatusFilter>("all");
 
-  const { data: patients, isLoading: patientsLoading} = useQuery<Patient[]>({
-    queryKey: ["/api/patients", user?.role === "doctor" ? user?.id : null],
+  // Doctors only see their assigned patients
+  const doctorId = user?.role === "doctor" ? user.id : null;
+  const doctorQuery = doctorId ? `?doctor_id=${doctorId}` : "";
+
+  // The table loads one page at a time; filters apply to the pages loaded so far
+  const {
+    data: patientPages,
+    isLoading: patientsLoading,
+    hasNextPage,
+    fetchNextPage,
+    isFetchingNextPage,
+  } = useInfiniteQuery({
+    queryKey: ["/api/patients", "list", doctorId ?? "all"],
+    queryFn: ({ pageParam }) => fetchPage<Patient>(`/api/patients${doctorQuery}`, pageParam),
+    initialPageParam: null as string | null,
+    getNextPageParam: (lastPage) => lastPage.nextCursor,
+  });
+  const patients = patientPages?.pages.flatMap((page) => page.items);
+
+  // Filter totals cover every patient, counted by the server
+  const { data: statusCounts } = useQuery<PatientStatusCounts>({
+    queryKey: ["/api/patients", "status-counts", doctorId ?? "all"],
     queryFn: async () => {
-      // Doctors only see their assigned patients
-      const url = user?.role === "doctor" 
-        ? `/api/patients?doctor_id=${user.id}`
-        : "/api/patients";
-      const res = await apiRequest("GET", url);
-      return res.json();
+      const res = await apiRequest("GET", `/api/patients/status-counts${doctorQuery}`);
+      return await res.json();
     }
   });
 
@@ -183,16 +210,6 @@ export default function Dashboard() {
     }
   });
 
-  const statusCounts = {
-    new: (patients || []).filter(p => getPatientStatus(p).isNew).length,
-    lastVisit: (patients || []).filter(p => getPatientStatus(p).isLastVisit).length,
-    critical: (patients || []).filter(p => getPatientStatus(p).isCritical).length,
-    lowRisk: (patients || []).filter(p => getPatientStatus(p).isLowRisk).length,
-    booked: (patients || []).filter(p => getPatientStatus(p).isBooked).length,
-    discharged: (patients || []).filter(p => getPatientStatus(p).isDischarged).length,
-    death: (patients || []).filter(p => getPatientStatus(p).isDeath).length,
-  };
-
   // Patient-specific dashboard view
   if (user?.role === "patient") {
     return (
@@ -693,7 +710,7 @@ export default function Dashboard() {
                     data-testid="button-filter-all"
                   >
                     <span>All Patients</span>
-                    <span className="text-xs bg-gray-200 px-2 py-1 rounded">{patients?.length || 0}</span>
+                    <span className="text-xs bg-gray-200 px-2 py-1 rounded">{statusCounts?.total ?? 0}</span>
                   </Button>
                   <Button
                     variant={statusFilter === "new" ? "default" : "outline"}
@@ -702,7 +719,7 @@ export default function Dashboard() {
                     data-testid="button-filter-new"
                   >
                     <span>New Patients</span>
-                    <span className="text-xs bg-blue-200 text-blue-900 px-2 py-1 rounded">{statusCounts.new}</span>
+                    <span className="text-xs bg-blue-200 text-blue-900 px-2 py-1 rounded">{statusCounts?.new ?? 0}</span>
                   </Button>
                   <Button
                     variant={statusFilter === "last-visit" ? "default" : "outline"}
@@ -711,7 +728,7 @@ export default function Dashboard() {
                     data-testid="button-filter-last-visit"
                   >
                     <span>Last Visit</span>
-                    <span className="text-xs bg-purple-200 text-purple-900 px-2 py-1 rounded">{statusCounts.lastVisit}</span>
+                    <span className="text-xs bg-purple-200 text-purple-900 px-2 py-1 rounded">{statusCounts?.lastVisit ?? 0}</span>
                   </Button>
                   <Button
                     variant={statusFilter === "critical" ? "default" : "outline"}
@@ -720,7 +737,7 @@ export default function Dashboard() {
                     data-testid="button-filter-critical"
                   >
                     <span>Critical</span>
-                    <span className="text-xs bg-red-200 text-red-900 px-2 py-1 rounded">{statusCounts.critical}</span>
+                    <span className="text-xs bg-red-200 text-red-900 px-2 py-1 rounded">{statusCounts?.critical ?? 0}</span>
                   </Button>
                   <Button
                     variant={statusFilter === "low-risk" ? "default" : "outline"}
@@ -729,7 +746,7 @@ export default function Dashboard() {
                     data-testid="button-filter-low-risk"
                   >
                     <span>Low Risk</span>
-                    <span className="text-xs bg-green-200 text-green-900 px-2 py-1 rounded">{statusCounts.lowRisk}</span>
+                    <span className="text-xs bg-green-200 text-green-900 px-2 py-1 rounded">{statusCounts?.lowRisk ?? 0}</span>
                   </Button>
                   <Button
                     variant={statusFilter === "booked" ? "default" : "outline"}
@@ -738,7 +755,7 @@ export default function Dashboard() {
                     data-testid="button-filter-booked"
                   >
                     <span>Booked Appointment</span>
-                    <span className="text-xs bg-yellow-200 text-yellow-900 px-2 py-1 rounded">{statusCounts.booked}</span>
+                    <span className="text-xs bg-yellow-200 text-yellow-900 px-2 py-1 rounded">{statusCounts?.booked ?? 0}</span>
                   </Button>
                   <Button
                     variant={statusFilter === "discharged" ? "default" : "outline"}
@@ -747,7 +764,7 @@ export default function Dashboard() {
                     data-testid="button-filter-discharged"
                   >
                     <span>Discharged</span>
-                    <span className="text-xs bg-gray-300 text-gray-900 px-2 py-1 rounded">{statusCounts.discharged}</span>
+                    <span className="text-xs bg-gray-300 text-gray-900 px-2 py-1 rounded">{statusCounts?.discharged ?? 0}</span>
                   </Button>
                 </CardContent>
               </Card>
@@ -765,7 +782,7 @@ export default function Dashboard() {
               </div>
 
               <div className="text-sm text-gray-700 font-semibold">
-                Showing: <span data-testid="text-filtered-patients">{filteredPatients.length}</span> of <span data-testid="text-total-patients">{patients?.length || 0}</span> patients
+                Showing: <span data-testid="text-filtered-patients">{filteredPatients.length}</span> of <span data-testid="text-total-patients">{statusCounts?.total ?? 0}</span> patients
               </div>
 
               <Card className="bg-white overflow-hidden">
@@ -825,6 +842,19 @@ export default function Dashboard() {
                   </div>
                 )}
               </Card>
+
+              {hasNextPage && (
+                <div className="flex justify-center">
+                  <Button
+                    variant="outline"
+                    onClick={() => fetchNextPage()}
+                    disabled={isFetchingNextPage}
+                    data-testid="button-load-more-patients"
+                  >
+                    {isFetchingNextPage ? "Loading..." : "Load more patients"}
+                  </Button>
+                </div>
+              )}
             </div>
           </div>
         </div>
@@ -1,18 +1,43 @@
-import { useQuery } from "@tanstack/react-query";
+import { useInfiniteQuery, useQuery } from "@tanstack/react-query";
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from "@/components/ui/card";
 import { Badge } from "@/components/ui/badge";
+import { Button } from "@/components/ui/button";
 import { AlertCircle, Clock, CheckCircle2, Inbox } from "lucide-react";
 import { useAuth } from "@/lib/auth-context";
+import { fetchPage } from "@/lib/queryClient";
 import type { Notification } from "@shared/schema";
 
+interface NotificationCounts {
+  total: number;
+  unread: number;
+  active: number;
+}
+
 export default function DepartmentDashboard() {
   const { user } = useAuth();
 
   // Get department from user
   const departmentId = user?.departmentId;
 
-  const { data: notifications = [], isLoading } = useQuery<Notification[]>({
+  // Newest first, one page at a time
+  const {
+    data,
+    isLoading,
+    hasNextPage,
+    fetchNextPage,
+    isFetchingNextPage,
+  } = useInfiniteQuery({
     queryKey: ["/api/departments", departmentId, "notifications"],
+    queryFn: ({ pageParam }) =>
+      fetchPage<Notification>(`/api/departments/${departmentId}/notifications`, pageParam),
+    initialPageParam: null as string | null,
+    getNextPageParam: (lastPage) => lastPage.nextCursor,
+    enabled: !!departmentId,
+  });
+  const notifications = data?.pages.flatMap((page) => page.items) ?? [];
+
+  const { data: counts } = useQuery<NotificationCounts>({
+    queryKey: ["/api/departments", departmentId, "notifications", "counts"],
     enabled: !!departmentId,
   });
 
@@ -40,8 +65,8 @@ export default function DepartmentDashboard() {
     }
   };
 
-  const unreadCount = notifications.filter((n) => n.status === "unread").length;
-  const activeRequests = notifications.filter((n) => n.status !== "completed").length;
+  const unreadCount = counts?.unread ?? 0;
+  const activeRequests = counts?.active ?? 0;
 
   if (!departmentId) {
     return (
@@ -85,7 +110,7 @@ export default function DepartmentDashboard() {
             <CardTitle className="text-sm font-medium text-muted-foreground">Total Notifications</CardTitle>
           </CardHeader>
           <CardContent>
-            <div className="text-3xl font-bold">{notifications.length}</div>
+            <div className="text-3xl font-bold">{counts?.total ?? 0}</div>
             <p className="text-xs text-muted-foreground mt-1">All time</p>
           </CardContent>
         </Card>
@@ -144,6 +169,18 @@ export default function DepartmentDashboard() {
                   </div>
                 </div>
               ))}
+              {hasNextPage && (
+                <div className="flex justify-center pt-2">
+                  <Button
+                    variant="outline"
+                    onClick={() => fetchNextPage()}
+                    disabled={isFetchingNextPage}
+                    data-testid="button-load-more-notifications"
+                  >
+                    {isFetchingNextPage ? "Loading..." : "Load more"}
+                  </Button>
+                </div>
+              )}
             </div>
           )}
         </CardContent>
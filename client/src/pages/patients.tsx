@@ -1,6 +1,6 @@
 import { useState } from "react";
 import { Link } from "wouter";
-import { useQuery } from "@tanstack/react-query";
+import { useInfiniteQuery } from "@tanstack/react-query";
 import { Search, UserPlus, Eye } from "lucide-react";
 import { Card, CardContent } from "@/components/ui/card";
 import { Input } from "@/components/ui/input";
@@ -8,14 +8,26 @@ import { Button } from "@/components/ui/button";
 import { Badge } from "@/components/ui/badge";
 import { Avatar, AvatarFallback } from "@/components/ui/avatar";
 import { Skeleton } from "@/components/ui/skeleton";
+import { fetchPage } from "@/lib/queryClient";
 import type { Patient } from "@shared/schema";
 
 export default function Patients() {
   const [searchTerm, setSearchTerm] = useState("");
 
-  const { data: patients, isLoading } = useQuery<Patient[]>({
-    queryKey: ["/api/patients"],
+  // Newest first, one page at a time; search filters the pages loaded so far
+  const {
+    data,
+    isLoading,
+    hasNextPage,
+    fetchNextPage,
+    isFetchingNextPage,
+  } = useInfiniteQuery({
+    queryKey: ["/api/patients", "list", "all"],
+    queryFn: ({ pageParam }) => fetchPage<Patient>("/api/patients", pageParam),
+    initialPageParam: null as string | null,
+    getNextPageParam: (lastPage) => lastPage.nextCursor,
   });
+  const patients = data?.pages.flatMap((page) => page.items);
 
   const filteredPatients = patients?.filter(patient =>
     `${patient.firstName} ${patient.lastName}`
@@ -145,6 +157,19 @@ export default function Patients() {
           </CardContent>
         </Card>
       )}
+
+      {hasNextPage && (
+        <div className="flex justify-center">
+          <Button
+            variant="outline"
+            onClick={() => fetchNextPage()}
+            disabled={isFetchingNextPage}
+            data-testid="button-load-more-patients"
+          >
+            {isFetchingNextPage ? "Loading..." : "Load more patients"}
+          </Button>
+        </div>
+      )}
     </div>
   );
 }
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Bulk-import legacy patient records from a CSV or NDJSON file
+
+Usage:
+    python import_patients.py patients.csv --hospital-id <id> --registered-by <user id>
+    python import_patients.py patients.ndjson --chunk-size 5000
+
+The file is streamed and committed in chunks, so an interrupted import can be
+re-run: rows whose MRN is already present are reported and skipped.
+"""
+import argparse
+import json
+import os
+import sys
+
+# Add current directory to path
+sys.path.append(os.getcwd())
+
+from server_py.db.session import SessionLocal
+from server_py.services.patient_import import (
+    IMPORT_CHUNK_SIZE, IMPORT_FORMATS, PatientImportService, detect_format
+)
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-import patients from CSV or NDJSON")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=IMPORT_FORMATS, help="inferred from the file extension if omitted")
+    parser.add_argument("--hospital-id")
+    parser.add_argument("--registered-by", help="used for rows without a registered_by column")
+    parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+    parser.add_argument("--errors", help="write the per-row error report to this JSON file")
+    args = parser.parse_args()
+
+    fmt = args.format or detect_format(args.path)
+    if fmt is None:
+        parser.error("cannot infer the format from the file name; pass --format")
+
+    print(f"Importing patients from {args.path} ({fmt})...")
+    db = SessionLocal()
+    try:
+        service = PatientImportService(
+            db, hospital_id=args.hospital_id, registered_by=args.registered_by, chunk_size=args.chunk_size
+        )
+        with open(args.path, encoding="utf-8-sig", newline="") as stream:
+            report = service.run(
+                stream, fmt,
+                on_progress=lambda r: print(f"   ✓ {r.processed} rows processed ({r.imported} imported, {r.failed} failed)")
+            )
+    finally:
+        db.close()
+
+    for error in report.errors[:20]:
+        print(f"   ❌ line {error['line']} (MRN {error['mrn']}): {error['error']}")
+    if report.failed > 20:
+        print(f"   ... and {report.failed - 20} more")
+    if args.errors:
+        with open(args.errors, "w") as f:
+            json.dump(report.to_dict(), f, indent=2)
+        print(f"Error report written to {args.errors}")
+
+    print(f"\n✅ Imported {report.imported} of {report.processed} patients")
+    if report.failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Database migration for per-hospital document number sequences
+
+- Creates the document_sequences table
+- Seeds it from the highest BIL-/PAY-/REC- number already issued per hospital and year
+- Replaces the global unique constraints on bill/payment/receipt numbers with
+  per-hospital ones, since each hospital now numbers from 00001. SQLite
+  cannot drop a table's inline UNIQUE, so there the affected tables are
+  rebuilt from the current models and their rows copied across
+
+Safe to re-run: counters only ever move forward.
+"""
+import os
+import sys
+from sqlalchemy import text
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+# Add current directory to path
+sys.path.append(os.getcwd())
+
+from server_py.db.session import engine, Base, SessionLocal
+from server_py.models.document_sequence import DocumentSequence
+from server_py.services.document_numbers import DOCUMENT_TYPES
+
+# table -> (old global unique constraint, new per-hospital constraint, number column)
+CONSTRAINTS = {
+    "patient_bills": ("patient_bills_bill_number_key", "uq_patient_bills_hospital_number", "bill_number"),
+    "payments": ("payments_payment_number_key", "uq_payments_hospital_number", "payment_number"),
+    "receipts": ("receipts_receipt_number_key", "uq_receipts_hospital_number", "receipt_number"),
+}
+
+def seed_sequences():
+    db = SessionLocal()
+    try:
+        for document_type, (prefix, model, number_column) in DOCUMENT_TYPES.items():
+            highest = {}
+            rows = db.query(model.hospital_id, number_column).filter(
+                number_column.like(f"{prefix}-%")
+            ).yield_per(5000)
+            for hospital_id, number in rows:
+                try:
+                    _, year, value = number.split("-")
+                    key = (hospital_id, int(year))
+                    highest[key] = max(highest.get(key, 0), int(value))
+                except ValueError:
+                    continue
+
+            for (hospital_id, year), value in highest.items():
+                sequence = db.get(DocumentSequence, (hospital_id, document_type, year))
+                if sequence is None:
+                    db.add(DocumentSequence(
+                        hospital_id=hospital_id, document_type=document_type,
+                        year=year, last_value=value
+                    ))
+                elif sequence.last_value < value:
+                    sequence.last_value = value
+            db.commit()
+            print(f"   ✓ {document_type}: {len(highest)} hospital/year counters")
+    finally:
+        db.close()
+
+def _sqlite_global_unique(conn, table: str, column: str) -> bool:
+    """Whether SQLite still has a unique index on the number column alone"""
+    for index in conn.execute(f"PRAGMA index_list({table})").fetchall():
+        name, unique = index[1], index[2]
+        columns = [row[2] for row in conn.execute(f"PRAGMA index_info('{name}')").fetchall()]
+        if unique and columns == [column]:
+            return True
+    return False
+
+def _rebuild_sqlite_table(conn, table: str):
+    """Recreate a table from its model (per-hospital unique included) and copy the rows over"""
+    model_table = Base.metadata.tables[table]
+    existing = [row[1] for row in conn.execute(f"PRAGMA table_info({table})").fetchall()]
+    unknown = [name for name in existing if name not in model_table.c]
+    if unknown:
+        raise RuntimeError(f"{table} has columns the model does not know ({', '.join(unknown)}); "
+                           "rebuilding it would drop them")
+    missing = [
+        column.name for column in model_table.c
+        if column.name not in existing and not column.nullable
+        and column.default is None and column.server_default is None
+    ]
+    if missing:
+        raise RuntimeError(f"{table} lacks required columns ({', '.join(missing)}); run the earlier migrations first")
+
+    rebuilt = f"{table}_rebuilt"
+    create = str(CreateTable(model_table).compile(dialect=engine.dialect))
+    conn.execute(create.replace(f"CREATE TABLE {table} ", f"CREATE TABLE {rebuilt} ", 1))
+    columns = ", ".join(existing)
+    conn.execute(f"INSERT INTO {rebuilt} ({columns}) SELECT {columns} FROM {table}")
+    # Dropping the old table drops its indexes, so the model's can be recreated under the same names
+    conn.execute(f"DROP TABLE {table}")
+    conn.execute(f"ALTER TABLE {rebuilt} RENAME TO {table}")
+    for index in model_table.indexes:
+        conn.execute(str(CreateIndex(index).compile(dialect=engine.dialect)))
+
+def _scope_sqlite_constraints():
+    raw = engine.raw_connection()
+    conn = raw.driver_connection
+    isolation_level = conn.isolation_level
+    # Explicit BEGIN/COMMIT so the CREATE/DROP/RENAME run in one transaction
+    conn.isolation_level = None
+    try:
+        conn.execute("BEGIN")
+        try:
+            for table, (_, _, column) in CONSTRAINTS.items():
+                if _sqlite_global_unique(conn, table, column):
+                    _rebuild_sqlite_table(conn, table)
+                print(f"   ✓ {table}: unique ({column}) -> unique (hospital_id, {column})")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    finally:
+        conn.isolation_level = isolation_level
+        raw.close()
+
+def scope_constraints_per_hospital():
+    if engine.dialect.name == "sqlite":
+        _scope_sqlite_constraints()
+        return
+    if engine.dialect.name != "postgresql":
+        raise RuntimeError(f"Don't know how to scope unique constraints on {engine.dialect.name}")
+    with engine.begin() as conn:
+        for table, (old, new, column) in CONSTRAINTS.items():
+            conn.execute(text(f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {old}"))
+            exists = conn.execute(text(
+                "SELECT 1 FROM pg_constraint WHERE conname = :name"
+            ), {"name": new}).first()
+            if not exists:
+                conn.execute(text(f"ALTER TABLE {table} ADD CONSTRAINT {new} UNIQUE (hospital_id, {column})"))
+            print(f"   ✓ {table}: unique ({column}) -> unique (hospital_id, {column})")
+
+def migrate():
+    try:
+        print("Creating document_sequences table...")
+        Base.metadata.create_all(bind=engine, tables=[DocumentSequence.__table__])
+        
+        print("Seeding sequences from issued numbers...")
+        seed_sequences()
+        
+        print("Scoping document number uniqueness per hospital...")
+        scope_constraints_per_hospital()
+        
+        print("\n✅ Document sequences migration completed successfully!")
+    except Exception as e:
+        print(f"\n❌ Error during migration: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    migrate()
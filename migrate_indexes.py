@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Database migration to add lookup indexes on patient, billing and clinical tables
+
+Usage:
+    python migrate_indexes.py          # create missing indexes, then verify query plans
+    python migrate_indexes.py --check  # only verify query plans (exits 1 on regression)
+"""
+import os
+import sys
+import json
+from datetime import datetime
+from sqlalchemy import select, text
+
+# Add current directory to path
+sys.path.append(os.getcwd())
+
+from server_py.db.session import engine
+from server_py.api.pagination import DEFAULT_PAGE_SIZE, encode_cursor, page_statement
+from server_py.models.patient import Patient
+from server_py.models.appointment import Appointment
+from server_py.models.lab_result import LabResult
+from server_py.models.notification import Notification
+from server_py.models.doctor_note import DoctorNote
+from server_py.models.patient_file import PatientFile
+from server_py.models.prescription import Prescription
+from server_py.models.billing import PatientBill, BillItem, Payment
+from server_py.models.ticket import Ticket
+from server_py.models.telemedicine_session import TelemedicineSession
+
+INDEXED_MODELS = [
+    Patient, Appointment, LabResult, Notification, DoctorNote,
+    PatientFile, Prescription, PatientBill, BillItem, Payment,
+    Ticket, TelemedicineSession
+]
+
+# Hot queries that must be served by an index rather than a full table scan
+HOT_QUERIES = {
+    "lab results by patient": select(LabResult.id).where(LabResult.patient_id == "x").order_by(LabResult.created_at.desc()),
+    "appointments by patient": select(Appointment.id).where(Appointment.patient_id == "x"),
+    "appointments by doctor": select(Appointment.id).where(Appointment.doctor_id == "x"),
+    "prescriptions by patient": select(Prescription.id).where(Prescription.patient_id == "x").order_by(Prescription.created_at.desc()),
+    "pending prescriptions": select(Prescription.id).where(Prescription.status == "pending"),
+    "bill items by bill": select(BillItem.id).where(BillItem.bill_id == "x"),
+    "bill items by date": select(BillItem.id).where(BillItem.created_at >= "2024-01-01", BillItem.created_at < "2024-02-01"),
+    "payments by bill": select(Payment.id).where(Payment.bill_id == "x"),
+    "payments by hospital and date": select(Payment.id).where(Payment.hospital_id == "x", Payment.payment_date >= "2024-01-01"),
+    "bills by patient": select(PatientBill.id).where(PatientBill.patient_id == "x").order_by(PatientBill.created_at.desc()),
+    "bills by hospital and status": select(PatientBill.id).where(PatientBill.hospital_id == "x", PatientBill.status == "open"),
+    "receivable bills by hospital": select(PatientBill.id).where(PatientBill.hospital_id == "x", PatientBill.balance > 0),
+    "notifications by department": select(Notification.id).where(Notification.department_id == "x"),
+    "doctor notes by patient": select(DoctorNote.id).where(DoctorNote.patient_id == "x").order_by(DoctorNote.created_at.desc()),
+    "patient files by patient": select(PatientFile.id).where(PatientFile.patient_id == "x").order_by(PatientFile.created_at.desc()),
+    "patients by assigned doctor": select(Patient.id).where(Patient.assigned_doctor_id == "x"),
+    "patients by hospital": select(Patient.id).where(Patient.hospital_id == "x"),
+}
+
+# Keyset pages of list endpoints: the statement paginate() runs, for the first
+# page and for a later one (cursor on a non-NULL and on a NULL sort value)
+PAGED_QUERIES = {
+    "patients page": (select(Patient), Patient.created_at, Patient.id),
+    "patients by doctor page": (select(Patient).where(Patient.assigned_doctor_id == "x"), Patient.created_at, Patient.id),
+    "appointments page": (select(Appointment), Appointment.created_at, Appointment.id),
+    "tickets page": (select(Ticket), Ticket.created_at, Ticket.id),
+    "pending prescriptions page": (select(Prescription).where(Prescription.status == "pending"), Prescription.created_at, Prescription.id),
+    "department notifications page": (select(Notification).where(Notification.department_id == "x"), Notification.created_at, Notification.id),
+    "telemedicine sessions page": (select(TelemedicineSession), TelemedicineSession.scheduled_time, TelemedicineSession.id),
+}
+PAGE_CURSORS = {
+    "": None,
+    ", later page": encode_cursor(datetime(2024, 1, 1), "x"),
+    ", NULL-sorted page": encode_cursor(None, "x"),
+}
+for name, (stmt, sort_column, id_column) in PAGED_QUERIES.items():
+    for suffix, cursor in PAGE_CURSORS.items():
+        HOT_QUERIES[name + suffix] = page_statement(
+            stmt, sort_column, id_column, cursor, DEFAULT_PAGE_SIZE, engine.dialect.name
+        )
+
+def migrate():
+    """Create any model-declared index that is missing from the live database"""
+    print("Creating lookup indexes...")
+    for model in INDEXED_MODELS:
+        for index in model.__table__.indexes:
+            index.create(bind=engine, checkfirst=True)
+            print(f"   ✓ {model.__tablename__}.{index.name}")
+    print("Indexes created successfully!")
+
+def _full_scans(conn, sql: str) -> list:
+    """Return the tables a statement reads with a sequential scan"""
+    if engine.dialect.name == "postgresql":
+        # Tiny tables make a seq scan the cheapest plan; disable it so only a
+        # missing index can still produce one
+        conn.execute(text("SET LOCAL enable_seqscan = off"))
+        plan = conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        scans = []
+        nodes = [plan[0]["Plan"]]
+        while nodes:
+            node = nodes.pop()
+            if node.get("Node Type") == "Seq Scan":
+                scans.append(node.get("Relation Name"))
+            nodes.extend(node.get("Plans", []))
+        return scans
+
+    rows = conn.execute(text(f"EXPLAIN QUERY PLAN {sql}")).fetchall()
+    return [row[-1] for row in rows if row[-1].startswith("SCAN") and "INDEX" not in row[-1]]
+
+def check_query_plans() -> bool:
+    """EXPLAIN each hot query and report any that regressed to a full table scan"""
+    print("Checking query plans...")
+    ok = True
+    with engine.connect() as conn:
+        for name, stmt in HOT_QUERIES.items():
+            sql = str(stmt.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+            trans = conn.begin()
+            try:
+                scans = _full_scans(conn, sql)
+            finally:
+                trans.rollback()
+            if scans:
+                ok = False
+                print(f"   ❌ {name}: full scan ({', '.join(str(s) for s in scans)})")
+            else:
+                print(f"   ✓ {name}")
+    return ok
+
+if __name__ == "__main__":
+    if "--check" not in sys.argv:
+        migrate()
+    if not check_query_plans():
+        print("\n❌ Hot queries are doing sequential scans - run migrate_indexes.py")
+        sys.exit(1)
+    print("\n✅ All hot queries use indexes")
@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+"""
+Database migration to install the patient search index behind /api/patients/search
+
+PostgreSQL: enables pg_trgm and adds a trigram GIN index over name, MRN and NIN
+SQLite:     creates the patients_fts FTS5 table, its sync triggers, and indexes existing patients
+
+The API also installs this on startup; run it explicitly where the app's
+database user lacks CREATE EXTENSION rights (run it as an owner instead).
+"""
+import os
+import sys
+
+# Add current directory to path
+sys.path.append(os.getcwd())
+
+from server_py.db.session import engine
+from server_py.services.patient_search import install_search_backend
+
+if __name__ == "__main__":
+    print(f"Installing patient search index ({engine.dialect.name})...")
+    if not install_search_backend(engine):
+        print("\n❌ Patient search index not installed - search falls back to ILIKE")
+        sys.exit(1)
+    print("\n✅ Patient search index installed successfully!")
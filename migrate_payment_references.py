@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Database migration for idempotent payments
+
+Adds the unique (hospital_id, payment_reference) index that lets a retried
+payment request return the original payment instead of charging twice.
+Payments without a reference are unaffected. Existing duplicate references
+are listed and must be resolved before the index can be created.
+
+Safe to re-run.
+"""
+import os
+import sys
+from sqlalchemy import func
+
+# Add current directory to path
+sys.path.append(os.getcwd())
+
+from server_py.db.session import engine, SessionLocal
+from server_py.models.billing import Payment
+
+def find_duplicate_references():
+    db = SessionLocal()
+    try:
+        return db.query(
+            Payment.hospital_id, Payment.payment_reference, func.count(Payment.id)
+        ).filter(
+            Payment.payment_reference.isnot(None)
+        ).group_by(
+            Payment.hospital_id, Payment.payment_reference
+        ).having(func.count(Payment.id) > 1).all()
+    finally:
+        db.close()
+
+def migrate():
+    try:
+        print("Checking for duplicate payment references...")
+        duplicates = find_duplicate_references()
+        if duplicates:
+            for hospital_id, reference, count in duplicates[:50]:
+                print(f"   ❌ hospital {hospital_id}: reference {reference!r} used by {count} payments")
+            print(f"\n❌ {len(duplicates)} duplicate references; fix them and re-run")
+            sys.exit(1)
+        print("   ✓ No duplicates")
+        
+        print("Creating payment reference index...")
+        for index in Payment.__table__.indexes:
+            if index.name == "uq_payments_hospital_reference":
+                index.create(bind=engine, checkfirst=True)
+                print(f"   ✓ payments.{index.name}")
+        
+        print("\n✅ Payment reference migration completed successfully!")
+    except Exception as e:
+        print(f"\n❌ Error during migration: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    migrate()
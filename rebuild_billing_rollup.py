@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Rebuild the billing_daily_rollup table from bill items and payments
+
+Usage:
+    python rebuild_billing_rollup.py                      # all hospitals, all history
+    python rebuild_billing_rollup.py --hospital-id <id> --since 2024-01-01 --until 2024-12-31
+
+Creates the table if it does not exist. Rows in the selected range are
+replaced, so the command is safe to re-run; run it periodically (or after a
+logged "Billing rollup update failed") to correct deltas that were lost
+between a charge or payment commit and its rollup update.
+"""
+import argparse
+import os
+import sys
+from datetime import date
+
+# Add current directory to path
+sys.path.append(os.getcwd())
+
+from server_py.db.session import engine, Base, SessionLocal
+from server_py.models.billing import BillingDailyRollup
+from server_py.services.billing_rollup import rebuild_rollup
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the daily billing rollup")
+    parser.add_argument("--hospital-id")
+    parser.add_argument("--since", type=date.fromisoformat, help="first day to rebuild (YYYY-MM-DD)")
+    parser.add_argument("--until", type=date.fromisoformat, help="last day to rebuild (YYYY-MM-DD)")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine, tables=[BillingDailyRollup.__table__])
+    print("   ✓ billing_daily_rollup table ready")
+
+    db = SessionLocal()
+    try:
+        rebuild_rollup(db, hospital_id=args.hospital_id, start=args.since, end=args.until)
+        rows = db.query(BillingDailyRollup).count()
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Rebuild failed: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+    print(f"\n✅ Billing rollup rebuilt ({rows} rows)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Check that every bill's stored subtotal/total/balance matches its items
+
+Usage:
+    python reconcile_bill_totals.py
+    python reconcile_bill_totals.py --hospital-id <id> --fix
+
+Without --fix the drifted bills are only listed and the exit status is 1.
+Run it as one scheduled job (e.g. hourly cron) rather than the in-process
+BILL_RECONCILIATION_INTERVAL_SECONDS loop when the app has several workers,
+so only one process ever repairs a given bill.
+"""
+import argparse
+import os
+import sys
+
+# Add current directory to path
+sys.path.append(os.getcwd())
+
+from server_py.db.session import SessionLocal
+from server_py.services.billing_totals import reconcile_bill_totals
+
+def main():
+    parser = argparse.ArgumentParser(description="Reconcile stored bill totals against bill items")
+    parser.add_argument("--hospital-id")
+    parser.add_argument("--fix", action="store_true", help="recalculate the totals of drifted bills")
+    args = parser.parse_args()
+
+    print("Reconciling bill totals...")
+    db = SessionLocal()
+    try:
+        mismatches = reconcile_bill_totals(db, hospital_id=args.hospital_id, fix=args.fix)
+    finally:
+        db.close()
+
+    for mismatch in mismatches:
+        print(
+            f"   ❌ {mismatch['bill_number']}: subtotal ₦{mismatch['stored_subtotal']:,.2f}, "
+            f"items ₦{mismatch['items_total']:,.2f}, balance ₦{mismatch['stored_balance']:,.2f}"
+        )
+
+    if not mismatches:
+        print("\n✅ All bill totals match their items")
+    elif args.fix:
+        print(f"\n✅ Recalculated {len(mismatches)} bills")
+    else:
+        print(f"\n{len(mismatches)} bills drifted; re-run with --fix to recalculate them")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 
 from server_py.db.session import get_db
+from server_py.api.pagination import NEXT_CURSOR_HEADER, limit_param, paginate
+from server_py.models.appointment import Appointment
 from server_py.services.storage import StorageService
 
 router = APIRouter(prefix="/api/appointments", tags=["Appointments"])
@@ -23,9 +25,16 @@ def appointment_to_dict(appointment) -> Dict[str, Any]:
     }
 
 @router.get("")
-def get_all_appointments(db: Session = Depends(get_db)):
-    storage = StorageService(db)
-    appointments = storage.get_all_appointments()
+def get_all_appointments(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = limit_param(),
+    db: Session = Depends(get_db)
+):
+    """Appointments, newest first; pass the X-Next-Cursor header back as `cursor` for the next page"""
+    appointments, next_cursor = paginate(db.query(Appointment), Appointment.created_at, Appointment.id, cursor, limit)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return [appointment_to_dict(a) for a in appointments]
 
 @router.get("/{appointment_id}")
@@ -41,7 +50,22 @@ def get_appointment(appointment_id: str, db: Session = Depends(get_db)):
 @router.post("")
 def create_appointment(appointment_data: Dict[str, Any], db: Session = Depends(get_db)):
     storage = StorageService(db)
-    appointment = storage.create_appointment(appointment_data)
+    department_id = appointment_data.get("departmentId") or appointment_data.get("department_id")
+    
+    # The booking and the department's notification commit together
+    with storage.batch():
+        appointment = storage.create_appointment(appointment_data)
+        if department_id:
+            storage.create_notification({
+                "department_id": department_id,
+                "patient_id": appointment.patient_id,
+                "appointment_id": appointment.id,
+                "type": "appointment",
+                "title": "New appointment",
+                "message": f"{appointment.appointment_date} {appointment.appointment_time}: {appointment.reason}",
+                "requested_by": appointment.created_by,
+            })
+    db.refresh(appointment)
     return appointment_to_dict(appointment)
 
 @router.patch("/{appointment_id}")
@@ -1,7 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
-from typing import Optional, List
+from sqlalchemy import func, and_, insert
+from sqlalchemy.exc import IntegrityError
+from typing import Dict, Iterable, Optional, List
 from datetime import datetime, timedelta
 import uuid
 
@@ -11,10 +13,21 @@ from server_py.models.billing import (
 )
 from server_py.models.user import User
 from server_py.models.patient import Patient
+from server_py.services.entity_loader import EntityLoader
+from server_py.services.patient_events import PatientEventService
+from server_py.services.document_numbers import next_document_number
+from server_py.services.billing_totals import add_charge_to_totals, apply_payment_to_totals, recalculate_bill_totals
+from server_py.services.billing_reports import BillingReportService
+from server_py.services.pricing_cache import PricingCatalog, pricing_cache
+from server_py.services.receivables_aging import AGING_GROUPS, ReceivablesAging, stream_aging_csv
+from server_py.services.billing_rollup import GRANULARITIES, record_charges, record_payment, revenue_trend
 from pydantic import BaseModel
 
 router = APIRouter(prefix="/api/billing", tags=["billing"])
 
+# Upper bound on charges accepted by one /charges/batch request
+MAX_BATCH_CHARGES = 1000
+
 # ============= Pydantic Models =============
 
 class ServicePricingCreate(BaseModel):
@@ -38,6 +51,9 @@ class ChargeCreate(BaseModel):
     reference_type: Optional[str] = None
     notes: Optional[str] = None
 
+class ChargeBatchCreate(BaseModel):
+    charges: List[ChargeCreate]
+
 class DiscountApply(BaseModel):
     discount_percentage: Optional[float] = None
     discount_amount: Optional[float] = None
@@ -79,26 +95,26 @@ def create_service_pricing(
     db.add(pricing)
     db.commit()
     db.refresh(pricing)
+    pricing_cache.invalidate(hospital_id)
     
     return {"pricing": serialize_pricing(pricing)}
 
 @router.get("/pricing")
 def get_service_pricing(
     hospital_id: str,
+    request: Request,
+    response: Response,
     category: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
-    """Get all service pricing"""
-    query = db.query(ServicePricing).filter(
-        ServicePricing.hospital_id == hospital_id,
-        ServicePricing.is_active == True
-    )
+    """Get all service pricing (answers If-None-Match with 304 while the catalog is unchanged)"""
+    catalog = get_pricing_catalog(hospital_id, db)
     
-    if category:
-        query = query.filter(ServicePricing.service_category == category)
+    if etag_matches(request.headers.get("if-none-match"), catalog.etag):
+        return Response(status_code=304, headers={"ETag": catalog.etag})
     
-    pricing = query.order_by(ServicePricing.service_category, ServicePricing.service_name).all()
-    return {"pricing": [serialize_pricing(p) for p in pricing]}
+    response.headers["ETag"] = catalog.etag
+    return {"pricing": catalog.by_category(category)}
 
 @router.put("/pricing/{pricing_id}")
 def update_service_pricing(
@@ -125,6 +141,7 @@ def update_service_pricing(
     
     db.commit()
     db.refresh(pricing)
+    pricing_cache.invalidate(pricing.hospital_id)
     
     return {"pricing": serialize_pricing(pricing)}
 
@@ -148,20 +165,15 @@ def add_charge_to_bill(
     # Get pricing if not provided
     unit_price = charge_data.unit_price
     if not unit_price:
-        pricing = db.query(ServicePricing).filter(
-            ServicePricing.hospital_id == hospital_id,
-            ServicePricing.service_category == charge_data.service_category,
-            ServicePricing.service_name == charge_data.service_name,
-            ServicePricing.is_active == True
-        ).first()
-        
-        if pricing:
-            unit_price = pricing.base_price
-        else:
+        unit_price = get_pricing_catalog(hospital_id, db).price(
+            charge_data.service_category, charge_data.service_name
+        )
+        if unit_price is None:
             raise HTTPException(status_code=404, detail="Service pricing not found")
     
     # Create bill item
     total_price = unit_price * charge_data.quantity
+    now = datetime.now()
     
     bill_item = BillItem(
         id=str(uuid.uuid4()),
@@ -172,17 +184,18 @@ def add_charge_to_bill(
         unit_price=unit_price,
         total_price=total_price,
         performed_by=charge_data.performed_by or user_id,
-        performed_at=datetime.now(),
+        performed_at=now,
         department=charge_data.department,
         reference_id=charge_data.reference_id,
         reference_type=charge_data.reference_type,
-        notes=charge_data.notes
+        notes=charge_data.notes,
+        created_at=now
     )
     
     db.add(bill_item)
     
     # Update bill totals
-    update_bill_totals(bill, db)
+    add_charge_to_totals(bill, total_price, db)
     
     # Audit trail
     create_audit_log(
@@ -191,11 +204,113 @@ def add_charge_to_bill(
         total_price, db
     )
     
+    PatientEventService(db).record("billing", bill)
     db.commit()
+    record_charges(db, hospital_id, now.date(), {charge_data.service_category: (total_price, 1)})
     db.refresh(bill)
     
     return {"bill": serialize_bill(bill, db), "item": serialize_bill_item(bill_item, db)}
 
+@router.post("/charges/batch")
+def add_charges_batch(
+    batch: ChargeBatchCreate,
+    user_id: str,
+    hospital_id: str,
+    db: Session = Depends(get_db)
+):
+    """Post many charges (e.g. a lab panel or a day of ward fees) in one transaction"""
+    if not batch.charges:
+        raise HTTPException(status_code=400, detail="No charges provided")
+    if len(batch.charges) > MAX_BATCH_CHARGES:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_CHARGES} charges per batch")
+    
+    user = db.query(User).filter(User.id == user_id).first()
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    # Resolve every missing unit price from the cached catalog
+    unpriced = {
+        (charge.service_category, charge.service_name)
+        for charge in batch.charges if not charge.unit_price
+    }
+    prices = {}
+    if unpriced:
+        catalog = get_pricing_catalog(hospital_id, db)
+        for category, name in unpriced:
+            price = catalog.price(category, name)
+            if price is not None:
+                prices[(category, name)] = price
+        missing = sorted(unpriced - set(prices))
+        if missing:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Service pricing not found: {', '.join(f'{c}/{n}' for c, n in missing)}"
+            )
+    
+    bills = get_or_create_patient_bills([charge.patient_id for charge in batch.charges], hospital_id, db)
+    
+    now = datetime.now()
+    items = []
+    audits = []
+    bill_totals: Dict[str, float] = {}
+    category_totals: Dict[str, List[float]] = {}
+    for charge in batch.charges:
+        bill = bills[charge.patient_id]
+        unit_price = charge.unit_price or prices[(charge.service_category, charge.service_name)]
+        total_price = unit_price * charge.quantity
+        bill_totals[bill.id] = bill_totals.get(bill.id, 0.0) + total_price
+        category_total = category_totals.setdefault(charge.service_category, [0.0, 0])
+        category_total[0] += total_price
+        category_total[1] += 1
+        items.append({
+            "id": str(uuid.uuid4()),
+            "bill_id": bill.id,
+            "service_category": charge.service_category,
+            "service_name": charge.service_name,
+            "quantity": charge.quantity,
+            "unit_price": unit_price,
+            "total_price": total_price,
+            "performed_by": charge.performed_by or user_id,
+            "performed_at": now,
+            "department": charge.department,
+            "reference_id": charge.reference_id,
+            "reference_type": charge.reference_type,
+            "notes": charge.notes,
+            "created_at": now
+        })
+        audits.append({
+            "id": str(uuid.uuid4()),
+            "hospital_id": hospital_id,
+            "bill_id": bill.id,
+            "action_type": "charge_added",
+            "action_by": user_id,
+            "action_details": f"Added {charge.service_name} - ₦{total_price:,.2f}",
+            "amount_involved": total_price
+        })
+    
+    db.execute(insert(BillItem), items)
+    db.execute(insert(BillingAudit), audits)
+    
+    # One increment per bill rather than per charge
+    affected = {bill.id: bill for bill in bills.values() if bill.id in bill_totals}
+    events = PatientEventService(db)
+    for bill_id, amount in bill_totals.items():
+        add_charge_to_totals(affected[bill_id], amount, db)
+        events.record("billing", affected[bill_id])
+    db.commit()
+    record_charges(db, hospital_id, now.date(), {
+        category: (amount, count) for category, (amount, count) in category_totals.items()
+    })
+    
+    # Reload the committed bills together instead of one refresh each
+    bills = db.query(PatientBill).filter(PatientBill.id.in_(list(affected))).all()
+    EntityLoader.for_session(db).prime(Patient, (bill.patient_id for bill in bills))
+    return {
+        "bills": [serialize_bill(bill, db) for bill in bills],
+        "itemsAdded": len(items),
+        "totalCharged": sum(bill_totals.values())
+    }
+
 # ============= Bill Management =============
 
 @router.get("/bills/patient/{patient_id}")
@@ -211,6 +326,7 @@ def get_patient_bills(
         query = query.filter(PatientBill.status == status)
     
     bills = query.order_by(PatientBill.created_at.desc()).all()
+    EntityLoader.for_session(db).prime(Patient, [bill.patient_id for bill in bills])
     return {"bills": [serialize_bill(bill, db) for bill in bills]}
 
 @router.get("/bills/{bill_id}")
@@ -223,6 +339,11 @@ def get_bill_details(bill_id: str, db: Session = Depends(get_db)):
     items = db.query(BillItem).filter(BillItem.bill_id == bill_id).all()
     payments = db.query(Payment).filter(Payment.bill_id == bill_id).all()
     
+    EntityLoader.for_session(db).prime(
+        User,
+        [item.performed_by for item in items] + [payment.received_by for payment in payments]
+    )
+    
     return {
         "bill": serialize_bill(bill, db),
         "items": [serialize_bill_item(item, db) for item in items],
@@ -262,7 +383,7 @@ def apply_discount(
     bill.discount_reason = discount_data.reason
     bill.discount_approved_by = user_id
     
-    update_bill_totals(bill, db)
+    recalculate_bill_totals(bill, db)
     
     create_audit_log(
         bill.hospital_id, bill.id, "discount_applied", user_id,
@@ -270,6 +391,7 @@ def apply_discount(
         bill.discount_amount, db
     )
     
+    PatientEventService(db).record("billing", bill)
     db.commit()
     db.refresh(bill)
     
@@ -295,6 +417,7 @@ def close_bill(bill_id: str, user_id: str, db: Session = Depends(get_db)):
         bill.total_amount, db
     )
     
+    PatientEventService(db).record("billing", bill)
     db.commit()
     db.refresh(bill)
     
@@ -318,9 +441,15 @@ def process_payment(
     if not bill:
         raise HTTPException(status_code=404, detail="Bill not found")
     
+    # A retried request with a known reference returns the original payment
+    if payment_data.payment_reference:
+        existing = find_payment_by_reference(hospital_id, payment_data.payment_reference, db)
+        if existing:
+            return replay_payment(existing, payment_data, db)
+    
     # Generate payment number
-    payment_count = db.query(Payment).filter(Payment.hospital_id == hospital_id).count()
-    payment_number = f"PAY-{datetime.now().year}-{payment_count + 1:05d}"
+    payment_number = next_document_number(db, hospital_id, "payment")
+    now = datetime.now()
     
     # Create payment
     payment = Payment(
@@ -334,15 +463,23 @@ def process_payment(
         payment_reference=payment_data.payment_reference,
         payment_status="completed",
         received_by=user_id,
-        notes=payment_data.notes
+        notes=payment_data.notes,
+        payment_date=now
     )
     
     db.add(payment)
+    try:
+        db.flush()
+    except IntegrityError:
+        # A concurrent request with the same reference committed first
+        db.rollback()
+        existing = find_payment_by_reference(hospital_id, payment_data.payment_reference, db)
+        if not existing:
+            raise
+        return replay_payment(existing, payment_data, db)
     
-    # Update bill
-    bill.amount_paid += payment_data.amount
-    bill.balance = bill.total_amount - bill.amount_paid
-    bill.updated_at = datetime.now()
+    # Update bill in place; no read-modify-write of amount_paid
+    apply_payment_to_totals(bill, payment_data.amount, db)
     
     # Generate receipt
     receipt = generate_receipt(payment, bill, user_id, hospital_id, db)
@@ -353,7 +490,11 @@ def process_payment(
         payment_data.amount, db
     )
     
+    events = PatientEventService(db)
+    events.record("payment", payment, "created")
+    events.record("billing", bill)
     db.commit()
+    record_payment(db, hospital_id, now.date(), payment_data.payment_method, payment_data.amount)
     db.refresh(payment)
     db.refresh(receipt)
     
@@ -367,6 +508,7 @@ def process_payment(
 def get_bill_payments(bill_id: str, db: Session = Depends(get_db)):
     """Get all payments for a bill"""
     payments = db.query(Payment).filter(Payment.bill_id == bill_id).all()
+    EntityLoader.for_session(db).prime(User, [p.received_by for p in payments])
     return {"payments": [serialize_payment(p, db) for p in payments]}
 
 # ============= Receipt Management =============
@@ -400,44 +542,18 @@ def get_daily_report(
     start_of_day = target_date.replace(hour=0, minute=0, second=0, microsecond=0)
     end_of_day = start_of_day + timedelta(days=1)
     
-    # Payments received
-    payments = db.query(Payment).filter(
-        Payment.hospital_id == hospital_id,
-        Payment.payment_date >= start_of_day,
-        Payment.payment_date < end_of_day,
-        Payment.payment_status == "completed"
-    ).all()
-    
-    total_collected = sum(p.amount for p in payments)
-    
-    # Payment methods breakdown
-    payment_methods = {}
-    for p in payments:
-        if p.payment_method not in payment_methods:
-            payment_methods[p.payment_method] = 0
-        payment_methods[p.payment_method] += p.amount
-    
-    # New bills created
-    new_bills = db.query(PatientBill).filter(
-        PatientBill.hospital_id == hospital_id,
-        PatientBill.created_at >= start_of_day,
-        PatientBill.created_at < end_of_day
-    ).count()
-    
-    # Outstanding bills
-    outstanding = db.query(func.sum(PatientBill.balance)).filter(
-        PatientBill.hospital_id == hospital_id,
-        PatientBill.status == "open",
-        PatientBill.balance > 0
-    ).scalar() or 0
+    reports = BillingReportService(db, hospital_id)
+    payments = reports.payments_by_method(start_of_day, end_of_day)
     
     return {
         "date": target_date.date().isoformat(),
-        "totalCollected": total_collected,
-        "paymentMethodsBreakdown": payment_methods,
-        "paymentsCount": len(payments),
-        "newBills": new_bills,
-        "outstandingBalance": outstanding
+        "totalCollected": sum((p["amount"] for p in payments.values()), 0.0),
+        "paymentMethodsBreakdown": {method: p["amount"] for method, p in payments.items()},
+        "paymentsCount": sum(p["count"] for p in payments.values()),
+        "newBills": reports.bills_created(start_of_day, end_of_day)["count"],
+        "outstandingBalance": reports.outstanding_balance(),
+        "revenueByCategory": reports.charges_by_category(start_of_day, end_of_day),
+        "revenueByDepartment": reports.charges_by_department(start_of_day, end_of_day)
     }
 
 @router.get("/reports/monthly")
@@ -454,88 +570,178 @@ def get_monthly_report(
     else:
         end_date = datetime(year, month + 1, 1)
     
-    # Total revenue
-    payments = db.query(Payment).filter(
-        Payment.hospital_id == hospital_id,
-        Payment.payment_date >= start_date,
-        Payment.payment_date < end_date,
-        Payment.payment_status == "completed"
-    ).all()
-    
-    total_revenue = sum(p.amount for p in payments)
+    reports = BillingReportService(db, hospital_id)
+    payments = reports.payments_by_method(start_date, end_date)
+    bills = reports.bills_created(start_date, end_date)
     
-    # Revenue by category
-    bill_items = db.query(BillItem).join(PatientBill).filter(
-        PatientBill.hospital_id == hospital_id,
-        BillItem.created_at >= start_date,
-        BillItem.created_at < end_date
-    ).all()
-    
-    revenue_by_category = {}
-    for item in bill_items:
-        if item.service_category not in revenue_by_category:
-            revenue_by_category[item.service_category] = 0
-        revenue_by_category[item.service_category] += item.total_price
-    
-    # Discounts given
-    bills = db.query(PatientBill).filter(
-        PatientBill.hospital_id == hospital_id,
-        PatientBill.created_at >= start_date,
-        PatientBill.created_at < end_date
-    ).all()
+    return {
+        "period": f"{year}-{month:02d}",
+        "totalRevenue": sum((p["amount"] for p in payments.values()), 0.0),
+        "revenueByCategory": reports.charges_by_category(start_date, end_date),
+        "revenueByDepartment": reports.charges_by_department(start_date, end_date),
+        "paymentMethodsBreakdown": {method: p["amount"] for method, p in payments.items()},
+        "totalDiscounts": bills["discounts"],
+        "paymentsCount": sum(p["count"] for p in payments.values()),
+        "billsGenerated": bills["count"]
+    }
+
+@router.get("/reports/trend")
+def get_revenue_trend(
+    hospital_id: str,
+    granularity: str = "month",
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """Revenue per day/month/quarter/year from the daily rollup (defaults to the last 12 months)"""
+    if granularity not in GRANULARITIES:
+        raise HTTPException(status_code=400, detail=f"granularity must be one of: {', '.join(GRANULARITIES)}")
     
-    total_discounts = sum(b.discount_amount for b in bills)
+    end_date = datetime.fromisoformat(end).date() if end else datetime.now().date()
+    if start:
+        start_date = datetime.fromisoformat(start).date()
+    else:
+        months_back = end_date.year * 12 + end_date.month - 12
+        start_date = end_date.replace(year=months_back // 12, month=months_back % 12 + 1, day=1)
     
     return {
-        "period": f"{year}-{month:02d}",
-        "totalRevenue": total_revenue,
-        "revenueByCat egory": revenue_by_category,
-        "totalDiscounts": total_discounts,
-        "paymentsCount": len(payments),
-        "billsGenerated": len(bills)
+        "granularity": granularity,
+        "start": start_date.isoformat(),
+        "end": end_date.isoformat(),
+        "periods": revenue_trend(db, hospital_id, start_date, end_date, granularity)
     }
 
+@router.get("/reports/aging")
+def get_aging_report(
+    user_id: str,
+    hospital_id: Optional[str] = None,
+    group_by: str = "payer",
+    as_of: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db)
+):
+    """
+    Accounts-receivable aging: outstanding balances by 0-30/31-60/61-90/90+ days.
+    Omitting hospital_id reports across every hospital (system admins only).
+    """
+    if group_by not in AGING_GROUPS or group_by == "bill":
+        raise HTTPException(status_code=400, detail="group_by must be one of: hospital, payer, patient")
+    authorize_hospital_report(user_id, hospital_id, db)
+    
+    as_of_date = datetime.fromisoformat(as_of) if as_of else None
+    return ReceivablesAging(db, hospital_id, as_of_date).summary(group_by, limit)
+
+@router.get("/reports/aging/export")
+def export_aging_report(
+    user_id: str,
+    hospital_id: Optional[str] = None,
+    group_by: str = "bill",
+    as_of: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """Stream the aging report as CSV, one row per bill or per group (all hospitals: system admins only)"""
+    if group_by not in AGING_GROUPS:
+        raise HTTPException(status_code=400, detail=f"group_by must be one of: {', '.join(AGING_GROUPS)}")
+    authorize_hospital_report(user_id, hospital_id, db)
+    
+    as_of_date = datetime.fromisoformat(as_of) if as_of else datetime.now()
+    filename = f"ar-aging-{group_by}-{as_of_date.date().isoformat()}.csv"
+    return StreamingResponse(
+        stream_aging_csv(hospital_id, as_of_date, group_by),
+        media_type="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
 # ============= Helper Functions =============
 
+def authorize_hospital_report(user_id: str, hospital_id: Optional[str], db: Session) -> None:
+    """A report covers one hospital the user belongs to; only system admins may span hospitals"""
+    user = db.query(User).filter(User.id == user_id).first()
+    if not user:
+        raise HTTPException(status_code=403, detail="Unknown user")
+    if user.role == "system_admin":
+        return
+    if hospital_id is None:
+        raise HTTPException(status_code=403, detail="hospital_id is required; only system admins can report across hospitals")
+    if user.hospital_id != hospital_id:
+        raise HTTPException(status_code=403, detail="You can only view reports for your own hospital")
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or any(tag.removeprefix("W/") == etag for tag in tags)
+
+def get_pricing_catalog(hospital_id: str, db: Session) -> PricingCatalog:
+    """Hospital's active pricing, from the cache or loaded and cached"""
+    catalog = pricing_cache.get(hospital_id)
+    if catalog is None:
+        pricing = db.query(ServicePricing).filter(
+            ServicePricing.hospital_id == hospital_id,
+            ServicePricing.is_active == True
+        ).order_by(ServicePricing.service_category, ServicePricing.service_name).all()
+        catalog = PricingCatalog([serialize_pricing(p) for p in pricing])
+        pricing_cache.set(hospital_id, catalog)
+    return catalog
+
 def get_or_create_patient_bill(patient_id: str, hospital_id: str, db: Session) -> PatientBill:
     """Get existing open bill or create new one"""
-    bill = db.query(PatientBill).filter(
-        PatientBill.patient_id == patient_id,
+    return get_or_create_patient_bills([patient_id], hospital_id, db)[patient_id]
+
+def get_or_create_patient_bills(patient_ids: Iterable[str], hospital_id: str, db: Session) -> Dict[str, PatientBill]:
+    """Open bill per patient, found with one query; missing bills are created"""
+    patient_ids = list(dict.fromkeys(patient_ids))
+    bills: Dict[str, PatientBill] = {}
+    for bill in db.query(PatientBill).filter(
+        PatientBill.patient_id.in_(patient_ids),
         PatientBill.hospital_id == hospital_id,
         PatientBill.status == "open"
+    ):
+        bills.setdefault(bill.patient_id, bill)
+    
+    for patient_id in patient_ids:
+        if patient_id not in bills:
+            bill_number = next_document_number(db, hospital_id, "bill")
+            
+            bill = PatientBill(
+                id=str(uuid.uuid4()),
+                bill_number=bill_number,
+                hospital_id=hospital_id,
+                patient_id=patient_id,
+                visit_type="outpatient",
+                status="open"
+            )
+            db.add(bill)
+            bills[patient_id] = bill
+    db.flush()
+    
+    return bills
+
+def find_payment_by_reference(hospital_id: str, payment_reference: Optional[str], db: Session) -> Optional[Payment]:
+    if not payment_reference:
+        return None
+    return db.query(Payment).filter(
+        Payment.hospital_id == hospital_id,
+        Payment.payment_reference == payment_reference
     ).first()
-    
-    if not bill:
-        bill_count = db.query(PatientBill).filter(PatientBill.hospital_id == hospital_id).count()
-        bill_number = f"BIL-{datetime.now().year}-{bill_count + 1:05d}"
-        
-        bill = PatientBill(
-            id=str(uuid.uuid4()),
-            bill_number=bill_number,
-            hospital_id=hospital_id,
-            patient_id=patient_id,
-            visit_type="outpatient",
-            status="open"
-        )
-        db.add(bill)
-        db.flush()
-    
-    return bill
 
-def update_bill_totals(bill: PatientBill, db: Session):
-    """Recalculate bill totals"""
-    items = db.query(BillItem).filter(BillItem.bill_id == bill.id).all()
+def replay_payment(payment: Payment, payment_data: PaymentCreate, db: Session) -> dict:
+    """Response for a payment already recorded under this reference"""
+    if payment.bill_id != payment_data.bill_id or payment.amount != payment_data.amount:
+        raise HTTPException(status_code=409, detail="Payment reference already used for a different payment")
     
-    bill.subtotal = sum(item.total_price for item in items)
-    bill.total_amount = bill.subtotal - bill.discount_amount + bill.tax_amount
-    bill.balance = bill.total_amount - bill.amount_paid
-    bill.patient_responsibility = bill.total_amount - bill.insurance_coverage
-    bill.updated_at = datetime.now()
+    receipt = db.query(Receipt).filter(Receipt.payment_id == payment.id).first()
+    bill = db.query(PatientBill).filter(PatientBill.id == payment.bill_id).first()
+    return {
+        "payment": serialize_payment(payment, db),
+        "receipt": serialize_receipt(receipt, db) if receipt else None,
+        "bill": serialize_bill(bill, db),
+        "replayed": True
+    }
 
 def generate_receipt(payment: Payment, bill: PatientBill, user_id: str, hospital_id: str, db: Session) -> Receipt:
     """Generate receipt for payment"""
-    receipt_count = db.query(Receipt).filter(Receipt.hospital_id == hospital_id).count()
-    receipt_number = f"REC-{datetime.now().year}-{receipt_count + 1:05d}"
+    receipt_number = next_document_number(db, hospital_id, "receipt")
     
     receipt = Receipt(
         id=str(uuid.uuid4()),
@@ -582,7 +788,7 @@ def serialize_pricing(pricing: ServicePricing):
     }
 
 def serialize_bill(bill: PatientBill, db: Session):
-    patient = db.query(Patient).filter(Patient.id == bill.patient_id).first()
+    patient = EntityLoader.for_session(db).get(Patient, bill.patient_id)
     
     return {
         "id": bill.id,
@@ -610,7 +816,7 @@ def serialize_bill(bill: PatientBill, db: Session):
 def serialize_bill_item(item: BillItem, db: Session):
     performed_by_user = None
     if item.performed_by:
-        user = db.query(User).filter(User.id == item.performed_by).first()
+        user = EntityLoader.for_session(db).get(User, item.performed_by)
         if user:
             performed_by_user = {"id": user.id, "name": user.full_name, "role": user.role}
     
@@ -629,7 +835,7 @@ def serialize_bill_item(item: BillItem, db: Session):
     }
 
 def serialize_payment(payment: Payment, db: Session):
-    received_by_user = db.query(User).filter(User.id == payment.received_by).first()
+    received_by_user = EntityLoader.for_session(db).get(User, payment.received_by)
     
     return {
         "id": payment.id,
@@ -647,7 +853,7 @@ def serialize_payment(payment: Payment, db: Session):
     }
 
 def serialize_receipt(receipt: Receipt, db: Session):
-    issued_by_user = db.query(User).filter(User.id == receipt.issued_by).first()
+    issued_by_user = EntityLoader.for_session(db).get(User, receipt.issued_by)
     
     return {
         "id": receipt.id,
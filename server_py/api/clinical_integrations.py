@@ -3,8 +3,9 @@ Clinical Integrations API
 Connect to external clinical systems (HL7, FHIR, Lab Systems, etc.)
 """
 from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
-from server_py.db.session import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from server_py.db.session import get_async_db
 from server_py.models.clinical_integration import ClinicalIntegration, IntegrationType, IntegrationStatus
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
@@ -55,24 +56,24 @@ class IntegrationResponse(BaseModel):
 async def list_integrations(
     hospital_id: Optional[str] = None,
     integration_type: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """List clinical integrations"""
-    query = db.query(ClinicalIntegration)
+    query = select(ClinicalIntegration)
     
     if hospital_id:
-        query = query.filter(ClinicalIntegration.hospital_id == hospital_id)
+        query = query.where(ClinicalIntegration.hospital_id == hospital_id)
     if integration_type:
-        query = query.filter(ClinicalIntegration.integration_type == integration_type)
+        query = query.where(ClinicalIntegration.integration_type == integration_type)
     
-    integrations = query.all()
-    return integrations
+    result = await db.execute(query)
+    return result.scalars().all()
 
 @router.post("/", response_model=IntegrationResponse, status_code=201)
 async def create_integration(
     integration_data: IntegrationCreate,
     current_user_id: str = "system",  # Should come from auth
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new clinical integration (Hospital Admin only)"""
     
@@ -103,8 +104,8 @@ async def create_integration(
     )
     
     db.add(new_integration)
-    db.commit()
-    db.refresh(new_integration)
+    await db.commit()
+    await db.refresh(new_integration)
     
     # Initialize in-memory storage for this integration
     integration_data_store[new_integration.id] = {
@@ -115,11 +116,9 @@ async def create_integration(
     return new_integration
 
 @router.get("/{integration_id}", response_model=IntegrationResponse)
-async def get_integration(integration_id: str, db: Session = Depends(get_db)):
+async def get_integration(integration_id: str, db: AsyncSession = Depends(get_async_db)):
     """Get integration details"""
-    integration = db.query(ClinicalIntegration).filter(
-        ClinicalIntegration.id == integration_id
-    ).first()
+    integration = await db.get(ClinicalIntegration, integration_id)
     
     if not integration:
         raise HTTPException(status_code=404, detail="Integration not found")
@@ -130,12 +129,10 @@ async def get_integration(integration_id: str, db: Session = Depends(get_db)):
 async def update_integration(
     integration_id: str,
     integration_data: IntegrationUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update integration settings"""
-    integration = db.query(ClinicalIntegration).filter(
-        ClinicalIntegration.id == integration_id
-    ).first()
+    integration = await db.get(ClinicalIntegration, integration_id)
     
     if not integration:
         raise HTTPException(status_code=404, detail="Integration not found")
@@ -150,16 +147,14 @@ async def update_integration(
         else:
             setattr(integration, field, value)
     
-    db.commit()
-    db.refresh(integration)
+    await db.commit()
+    await db.refresh(integration)
     return integration
 
 @router.delete("/{integration_id}", status_code=204)
-async def delete_integration(integration_id: str, db: Session = Depends(get_db)):
+async def delete_integration(integration_id: str, db: AsyncSession = Depends(get_async_db)):
     """Delete integration"""
-    integration = db.query(ClinicalIntegration).filter(
-        ClinicalIntegration.id == integration_id
-    ).first()
+    integration = await db.get(ClinicalIntegration, integration_id)
     
     if not integration:
         raise HTTPException(status_code=404, detail="Integration not found")
@@ -168,16 +163,14 @@ async def delete_integration(integration_id: str, db: Session = Depends(get_db))
     if integration_id in integration_data_store:
         del integration_data_store[integration_id]
     
-    db.delete(integration)
-    db.commit()
+    await db.delete(integration)
+    await db.commit()
     return None
 
 @router.post("/{integration_id}/sync")
-async def trigger_sync(integration_id: str, db: Session = Depends(get_db)):
+async def trigger_sync(integration_id: str, db: AsyncSession = Depends(get_async_db)):
     """Manually trigger data sync from external system"""
-    integration = db.query(ClinicalIntegration).filter(
-        ClinicalIntegration.id == integration_id
-    ).first()
+    integration = await db.get(ClinicalIntegration, integration_id)
     
     if not integration:
         raise HTTPException(status_code=404, detail="Integration not found")
@@ -190,7 +183,7 @@ async def trigger_sync(integration_id: str, db: Session = Depends(get_db)):
         # Update last sync time
         integration.last_sync_time = datetime.now()
         integration.status = IntegrationStatus.ACTIVE
-        db.commit()
+        await db.commit()
         
         # Simulate fetching data
         simulated_data = {
@@ -210,19 +203,17 @@ async def trigger_sync(integration_id: str, db: Session = Depends(get_db)):
         
     except Exception as e:
         integration.status = IntegrationStatus.ERROR
-        db.commit()
+        await db.commit()
         raise HTTPException(status_code=500, detail=f"Sync failed: {str(e)}")
 
 @router.get("/{integration_id}/data")
 async def get_integration_data(
     integration_id: str,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get data from integration's in-memory storage"""
-    integration = db.query(ClinicalIntegration).filter(
-        ClinicalIntegration.id == integration_id
-    ).first()
+    integration = await db.get(ClinicalIntegration, integration_id)
     
     if not integration:
         raise HTTPException(status_code=404, detail="Integration not found")
@@ -243,12 +234,10 @@ async def get_integration_data(
 async def add_integration_data(
     integration_id: str,
     data: dict,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Add data to integration's in-memory storage (for testing)"""
-    integration = db.query(ClinicalIntegration).filter(
-        ClinicalIntegration.id == integration_id
-    ).first()
+    integration = await db.get(ClinicalIntegration, integration_id)
     
     if not integration:
         raise HTTPException(status_code=404, detail="Integration not found")
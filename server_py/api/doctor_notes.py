@@ -8,6 +8,8 @@ from server_py.db.session import get_db
 from server_py.models.doctor_note import DoctorNote
 from server_py.models.user import User
 from server_py.models.patient import Patient
+from server_py.services.entity_loader import EntityLoader
+from server_py.services.patient_events import PatientEventService
 from pydantic import BaseModel
 
 router = APIRouter(prefix="/api/doctor-notes", tags=["doctor-notes"])
@@ -49,6 +51,7 @@ def create_note(note_data: NoteCreate, doctor_id: str, db: Session = Depends(get
     )
     
     db.add(note)
+    PatientEventService(db).record("doctor_note", note, "created")
     db.commit()
     db.refresh(note)
     
@@ -77,6 +80,7 @@ def get_patient_notes(
         query = query.filter(DoctorNote.note_type == note_type)
     
     notes = query.order_by(DoctorNote.created_at.desc()).all()
+    EntityLoader.for_session(db).prime(User, [n.doctor_id for n in notes])
     return {"notes": [serialize_note(n, db) for n in notes]}
 
 @router.get("/{note_id}")
@@ -108,6 +112,7 @@ def update_note(note_id: str, updates: NoteUpdate, doctor_id: str, db: Session =
         note.is_private = updates.is_private
     
     note.updated_at = datetime.now()
+    PatientEventService(db).record("doctor_note", note)
     db.commit()
     db.refresh(note)
     
@@ -122,13 +127,14 @@ def delete_note(note_id: str, doctor_id: str, db: Session = Depends(get_db)):
     if note.doctor_id != doctor_id:
         raise HTTPException(status_code=403, detail="You can only delete your own notes")
     
+    PatientEventService(db).retract("doctor_note", note)
     db.delete(note)
     db.commit()
     
     return {"message": "Note deleted successfully"}
 
 def serialize_note(note: DoctorNote, db: Session):
-    doctor = db.query(User).filter(User.id == note.doctor_id).first()
+    doctor = EntityLoader.for_session(db).get(User, note.doctor_id)
     
     return {
         "id": note.id,
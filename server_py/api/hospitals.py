@@ -4,8 +4,9 @@ System Admin: Manage all hospitals
 Hospital Admin: Manage their own hospital
 """
 from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
-from server_py.db.session import get_db
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from server_py.db.session import get_async_db
 from server_py.models.hospital import Hospital, HospitalStatus, SubscriptionTier
 from server_py.models.user import User
 from server_py.services.permissions import PermissionService
@@ -53,17 +54,17 @@ class HospitalResponse(BaseModel):
 
 # System Admin Endpoints
 @router.get("/", response_model=List[HospitalResponse])
-async def list_all_hospitals(db: Session = Depends(get_db)):
+async def list_all_hospitals(db: AsyncSession = Depends(get_async_db)):
     """List all hospitals (System Admin only)"""
-    hospitals = db.query(Hospital).all()
-    return hospitals
+    result = await db.execute(select(Hospital))
+    return result.scalars().all()
 
 @router.post("/", response_model=HospitalResponse, status_code=201)
-async def create_hospital(hospital_data: HospitalCreate, db: Session = Depends(get_db)):
+async def create_hospital(hospital_data: HospitalCreate, db: AsyncSession = Depends(get_async_db)):
     """Create a new hospital (System Admin only)"""
     
     # Verify admin user exists
-    admin_user = db.query(User).filter(User.id == hospital_data.admin_user_id).first()
+    admin_user = await db.get(User, hospital_data.admin_user_id)
     if not admin_user:
         raise HTTPException(status_code=404, detail="Admin user not found")
     
@@ -88,15 +89,15 @@ async def create_hospital(hospital_data: HospitalCreate, db: Session = Depends(g
     if admin_user.role not in ["system_admin", "hospital_admin"]:
         admin_user.role = "hospital_admin"
     
-    db.commit()
-    db.refresh(new_hospital)
+    await db.commit()
+    await db.refresh(new_hospital)
     
     return new_hospital
 
 @router.get("/{hospital_id}", response_model=HospitalResponse)
-async def get_hospital(hospital_id: str, db: Session = Depends(get_db)):
+async def get_hospital(hospital_id: str, db: AsyncSession = Depends(get_async_db)):
     """Get hospital details"""
-    hospital = db.query(Hospital).filter(Hospital.id == hospital_id).first()
+    hospital = await db.get(Hospital, hospital_id)
     if not hospital:
         raise HTTPException(status_code=404, detail="Hospital not found")
     return hospital
@@ -105,10 +106,10 @@ async def get_hospital(hospital_id: str, db: Session = Depends(get_db)):
 async def update_hospital(
     hospital_id: str,
     hospital_data: HospitalUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update hospital details (System Admin or Hospital Admin)"""
-    hospital = db.query(Hospital).filter(Hospital.id == hospital_id).first()
+    hospital = await db.get(Hospital, hospital_id)
     if not hospital:
         raise HTTPException(status_code=404, detail="Hospital not found")
     
@@ -122,48 +123,54 @@ async def update_hospital(
         else:
             setattr(hospital, field, value)
     
-    db.commit()
-    db.refresh(hospital)
+    await db.commit()
+    await db.refresh(hospital)
     return hospital
 
 @router.delete("/{hospital_id}", status_code=204)
-async def delete_hospital(hospital_id: str, db: Session = Depends(get_db)):
+async def delete_hospital(hospital_id: str, db: AsyncSession = Depends(get_async_db)):
     """Delete hospital (System Admin only)"""
-    hospital = db.query(Hospital).filter(Hospital.id == hospital_id).first()
+    hospital = await db.get(Hospital, hospital_id)
     if not hospital:
         raise HTTPException(status_code=404, detail="Hospital not found")
     
-    db.delete(hospital)
-    db.commit()
+    await db.delete(hospital)
+    await db.commit()
     return None
 
 # Hospital Statistics
 @router.get("/{hospital_id}/stats")
-async def get_hospital_stats(hospital_id: str, db: Session = Depends(get_db)):
+async def get_hospital_stats(hospital_id: str, db: AsyncSession = Depends(get_async_db)):
     """Get hospital statistics"""
-    hospital = db.query(Hospital).filter(Hospital.id == hospital_id).first()
+    hospital = await db.get(Hospital, hospital_id)
     if not hospital:
         raise HTTPException(status_code=404, detail="Hospital not found")
     
     # Count staff
-    staff_count = db.query(User).filter(
-        User.hospital_id == hospital_id,
-        User.role.in_(["doctor", "nurse", "pharmacist", "lab_tech", "receptionist"])
-    ).count()
+    staff_count = await db.scalar(
+        select(func.count(User.id)).where(
+            User.hospital_id == hospital_id,
+            User.role.in_(["doctor", "nurse", "pharmacist", "lab_tech", "receptionist"])
+        )
+    )
     
     # Count patients (those registered by this hospital's staff)
     from server_py.models.patient import Patient
-    patient_count = db.query(Patient).filter(
-        Patient.registered_by.in_(
-            db.query(User.id).filter(User.hospital_id == hospital_id)
+    patient_count = await db.scalar(
+        select(func.count(Patient.id)).where(
+            Patient.registered_by.in_(
+                select(User.id).where(User.hospital_id == hospital_id)
+            )
         )
-    ).count()
+    )
     
     # Count appointments
     from server_py.models.appointment import Appointment
-    appointment_count = db.query(Appointment).join(
-        User, Appointment.doctor_id == User.id
-    ).filter(User.hospital_id == hospital_id).count()
+    appointment_count = await db.scalar(
+        select(func.count(Appointment.id)).join(
+            User, Appointment.doctor_id == User.id
+        ).where(User.hospital_id == hospital_id)
+    )
     
     return {
         "hospital_id": hospital_id,
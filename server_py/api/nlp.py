@@ -1,10 +1,28 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from typing import Dict, Any, List
+import json
 
+from server_py.config import get_settings
 from server_py.services.nlp_service import NLPService
+from server_py.services.nlp_batch import (
+    BatchStats, analyze_records_async, iter_list_records, iter_ndjson_records
+)
 
 router = APIRouter(prefix="/api/nlp", tags=["NLP"])
 
+async def _read_body(request: Request, limit: int) -> bytes:
+    """The request body, or 413 as soon as it is known to exceed limit bytes"""
+    too_large = HTTPException(status_code=413, detail=f"Request body exceeds {limit} bytes")
+    if int(request.headers.get("content-length") or 0) > limit:
+        raise too_large
+    body = bytearray()
+    async for chunk in request.stream():
+        body.extend(chunk)
+        if len(body) > limit:
+            raise too_large
+    return bytes(body)
+
 @router.post("/analyze")
 def analyze_text(data: Dict[str, Any]):
     text = data.get("text")
@@ -14,14 +32,50 @@ def analyze_text(data: Dict[str, Any]):
     analysis = NLPService.analyze_text(text)
     return analysis
 
+@router.post("/analyze/batch")
+async def analyze_batch(request: Request):
+    """Analyze many texts on the process pool.
+    
+    Body: {"texts": [...]} or an application/x-ndjson stream, one string or
+    {"id": ..., "text": ...} object per line. Responds with NDJSON results in
+    input order, followed by a {"summary": ...} line with throughput.
+    
+    The whole body is buffered before the response starts, since
+    StreamingResponse listens on the same receive channel for client
+    disconnects, so bodies over NLP_BATCH_MAX_BODY_BYTES are rejected with 413.
+    Split larger workloads into several requests.
+    """
+    body = await _read_body(request, get_settings().NLP_BATCH_MAX_BODY_BYTES)
+    content_type = request.headers.get("content-type", "")
+    if "ndjson" in content_type or "jsonl" in content_type:
+        records = iter_ndjson_records(body)
+    else:
+        try:
+            data = json.loads(body)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Expected a JSON body or an NDJSON stream")
+        texts = data.get("texts") if isinstance(data, dict) else data
+        if not isinstance(texts, list) or not texts:
+            raise HTTPException(status_code=400, detail="Texts list is required")
+        records = iter_list_records(texts)
+    
+    stats = BatchStats()
+    
+    async def results():
+        async for result in analyze_records_async(records, stats=stats):
+            yield json.dumps(result) + "\n"
+        yield json.dumps({"summary": stats.to_dict()}) + "\n"
+    
+    return StreamingResponse(results(), media_type="application/x-ndjson")
+
 @router.post("/normalize-symptoms")
 def normalize_symptoms(data: Dict[str, Any]):
     text = data.get("text")
     if not text:
         raise HTTPException(status_code=400, detail="Text is required")
     
-    normalized = NLPService.normalize_symptoms(text)
-    return {"symptoms": normalized}
+    normalized, corrections = NLPService.normalize_symptoms_with_corrections(text)
+    return {"symptoms": normalized, "corrections": corrections}
 
 @router.post("/extract-entities")
 def extract_entities(data: Dict[str, Any]):
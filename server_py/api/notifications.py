@@ -1,8 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy import case, func
 from sqlalchemy.orm import Session
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 from server_py.db.session import get_db
+from server_py.api.pagination import NEXT_CURSOR_HEADER, limit_param, paginate
+from server_py.models.notification import Notification
 from server_py.services.storage import StorageService
 
 router = APIRouter(prefix="/api", tags=["Notifications"])
@@ -25,11 +28,30 @@ def notification_to_dict(notification) -> Dict[str, Any]:
     }
 
 @router.get("/departments/{department_id}/notifications")
-def get_department_notifications(department_id: str, db: Session = Depends(get_db)):
-    storage = StorageService(db)
-    notifications = storage.get_department_notifications(department_id)
+def get_department_notifications(
+    department_id: str,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = limit_param(),
+    db: Session = Depends(get_db)
+):
+    """Department notifications, newest first; pass the X-Next-Cursor header back as `cursor` for the next page"""
+    query = db.query(Notification).filter(Notification.department_id == department_id)
+    notifications, next_cursor = paginate(query, Notification.created_at, Notification.id, cursor, limit)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return [notification_to_dict(n) for n in notifications]
 
+@router.get("/departments/{department_id}/notifications/counts")
+def get_department_notification_counts(department_id: str, db: Session = Depends(get_db)):
+    """Totals for the department dashboard, counted in the database rather than over every notification"""
+    total, unread, active = db.query(
+        func.count(Notification.id),
+        func.count(case((Notification.status == "unread", 1))),
+        func.count(case((Notification.status != "completed", 1)))
+    ).filter(Notification.department_id == department_id).one()
+    return {"total": total, "unread": unread, "active": active}
+
 @router.post("/departments/{department_id}/notifications")
 def create_notification(department_id: str, notification_data: Dict[str, Any], db: Session = Depends(get_db)):
     storage = StorageService(db)
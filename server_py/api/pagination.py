@@ -0,0 +1,103 @@
+"""
+Keyset Pagination
+Shared (sort column, id) seek pagination for list endpoints. Pages are read
+newest first with WHERE (sort, id) < (cursor sort, cursor id) ... LIMIT n+1
+on the raw sort column, so every page costs one index range scan however
+deep the client pages. Rows with a NULL sort value come where the database
+puts NULLs in a descending index (first on PostgreSQL, last on SQLite) and
+are paged by id.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Tuple, Union
+
+from fastapi import HTTPException, Query
+from sqlalchemy import String, and_, or_, type_coerce
+from sqlalchemy.ext.asyncio import AsyncSession
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+# Header carrying the cursor on endpoints whose body is a bare JSON list
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Dialects whose descending order puts NULLs first
+NULLS_FIRST_DESC = ("postgresql",)
+
+SortValue = Union[datetime, str, None]
+
+def limit_param(default: int = DEFAULT_PAGE_SIZE):
+    return Query(default, ge=1, le=MAX_PAGE_SIZE)
+
+def encode_cursor(sort_value: SortValue, row_id: str) -> str:
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    raw = json.dumps([sort_value, row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+def decode_cursor(cursor: str, dialect: str = "postgresql") -> Tuple[SortValue, str]:
+    """(sort value, id) from a cursor; SQLite gets the stored text back unchanged"""
+    try:
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if sort_value is not None:
+            parsed = datetime.fromisoformat(sort_value)
+            if dialect != "sqlite":
+                sort_value = parsed
+        return sort_value, str(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def _sort_key(sort_column, dialect: str):
+    if dialect == "sqlite":
+        # SQLite keeps DateTime as text, and CURRENT_TIMESTAMP defaults lack the
+        # fractional seconds SQLAlchemy writes. Seek on the stored text itself
+        # (no SQL cast, so the index still applies) and carry that exact text
+        # in the cursor, so tied rows neither repeat nor get skipped.
+        return type_coerce(sort_column, String)
+    return sort_column
+
+def _after_cursor(sort_key, id_column, cursor: str, dialect: str):
+    sort_value, row_id = decode_cursor(cursor, dialect)
+    nulls_first = dialect in NULLS_FIRST_DESC
+    if sort_value is None:
+        after_nulls = and_(sort_key.is_(None), id_column < row_id)
+        return or_(after_nulls, sort_key.isnot(None)) if nulls_first else after_nulls
+    after = or_(
+        sort_key < sort_value,
+        and_(sort_key == sort_value, id_column < row_id)
+    )
+    return after if nulls_first else or_(after, sort_key.is_(None))
+
+def page_statement(stmt, sort_column, id_column, cursor: Optional[str], limit: int, dialect: str):
+    """
+    One page of an ORM query or select() over a single entity, newest first.
+    Rows come back as (entity, sort value); migrate_indexes.py EXPLAINs this
+    exact statement.
+    """
+    sort_key = _sort_key(sort_column, dialect)
+    stmt = stmt.add_columns(sort_key.label("page_sort_value"))
+    if cursor:
+        stmt = stmt.where(_after_cursor(sort_key, id_column, cursor, dialect))
+    return stmt.order_by(sort_key.desc(), id_column.desc()).limit(limit + 1)
+
+def _split_page(rows: List[Any], limit: int) -> Tuple[List[Any], Optional[str]]:
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        entity, sort_value = rows[-1]
+        next_cursor = encode_cursor(sort_value, entity.id)
+    return [row[0] for row in rows], next_cursor
+
+def paginate(query, sort_column, id_column, cursor: Optional[str], limit: int) -> Tuple[List[Any], Optional[str]]:
+    """Return one page of an ORM query, newest first, and the cursor for the next page"""
+    dialect = query.session.get_bind().dialect.name
+    rows = page_statement(query, sort_column, id_column, cursor, limit, dialect).all()
+    return _split_page(rows, limit)
+
+async def paginate_async(db: AsyncSession, stmt, sort_column, id_column,
+                         cursor: Optional[str], limit: int) -> Tuple[List[Any], Optional[str]]:
+    """paginate() for a select() statement on an AsyncSession"""
+    dialect = db.get_bind().dialect.name
+    result = await db.execute(page_statement(stmt, sort_column, id_column, cursor, limit, dialect))
+    return _split_page(result.all(), limit)
@@ -4,6 +4,7 @@ from typing import List, Optional
 from datetime import datetime
 
 from server_py.db.session import get_db
+from server_py.api.pagination import limit_param, paginate
 from server_py.models.patient import Patient
 from server_py.models.user import User
 from pydantic import BaseModel
@@ -87,18 +88,21 @@ def bulk_assign_patients(
 @router.get("/unassigned")
 def get_unassigned_patients(
     hospital_id: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = limit_param(),
     db: Session = Depends(get_db)
 ):
-    """Get all patients without an assigned doctor"""
+    """Get patients without an assigned doctor, newest first, one page at a time"""
     query = db.query(Patient).filter(Patient.assigned_doctor_id.is_(None))
     
     if hospital_id:
         query = query.filter(Patient.hospital_id == hospital_id)
     
-    patients = query.all()
+    patients, next_cursor = paginate(query, Patient.created_at, Patient.id, cursor, limit)
     return {
         "patients": [serialize_patient_assignment(p, db) for p in patients],
-        "count": len(patients)
+        "count": len(patients),
+        "next_cursor": next_cursor
     }
 
 @router.get("/by-doctor/{doctor_id}")
@@ -9,6 +9,8 @@ from server_py.db.session import get_db
 from server_py.models.patient_file import PatientFile
 from server_py.models.user import User
 from server_py.models.patient import Patient
+from server_py.services.entity_loader import EntityLoader
+from server_py.services.patient_events import PatientEventService
 from pydantic import BaseModel
 
 router = APIRouter(prefix="/api/patient-files", tags=["patient-files"])
@@ -74,6 +76,7 @@ def upload_patient_file(
     )
     
     db.add(patient_file)
+    PatientEventService(db).record("file_upload", patient_file, "created")
     db.commit()
     db.refresh(patient_file)
     
@@ -95,6 +98,7 @@ def get_patient_files(
         query = query.filter(PatientFile.category == category)
     
     files = query.order_by(PatientFile.created_at.desc()).all()
+    EntityLoader.for_session(db).prime(User, [f.uploaded_by for f in files])
     return {"files": [serialize_file(f, db) for f in files]}
 
 @router.delete("/{file_id}")
@@ -116,13 +120,14 @@ def delete_patient_file(file_id: str, user_id: str, db: Session = Depends(get_db
     except Exception:
         pass
     
+    PatientEventService(db).retract("file_upload", patient_file)
     db.delete(patient_file)
     db.commit()
     
     return {"message": "File deleted successfully"}
 
 def serialize_file(patient_file: PatientFile, db: Session):
-    uploader = db.query(User).filter(User.id == patient_file.uploaded_by).first()
+    uploader = EntityLoader.for_session(db).get(User, patient_file.uploaded_by)
     
     return {
         "id": patient_file.id,
@@ -1,13 +1,32 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, UploadFile, File
+from sqlalchemy import and_, case, func, or_
 from sqlalchemy.orm import Session
+from datetime import datetime, timedelta
 from typing import List, Optional, Dict, Any
+import io
+import logging
+import re
 
 from server_py.db.session import get_db
+from server_py.api.pagination import NEXT_CURSOR_HEADER, limit_param, paginate
 from server_py.services.storage import StorageService
+from server_py.services.patient_autocomplete import patient_autocomplete
+from server_py.services.patient_import import IMPORT_FORMATS, PatientImportService, detect_format
 from server_py.services.ml_service import MLHealthService
 
 router = APIRouter(prefix="/api", tags=["Patients"])
 
+logger = logging.getLogger(__name__)
+
+# Dashboard status heuristics; keep in step with getPatientStatus in client/src/pages/dashboard.tsx
+CRITICAL_SYSTOLIC = 160
+CRITICAL_HEART_RATE = 120
+LOW_RISK_MAX_TEMPERATURE = 37.5
+DISCHARGE_MIN_AGE = 60
+
+# Leading number of a free-text reading, as JavaScript's parseFloat reads it ("37.8C" -> 37.8)
+LEADING_NUMBER = re.compile(r"\s*([+-]?(?:\d+\.?\d*|\.\d+))")
+
 def patient_to_dict(patient) -> Dict[str, Any]:
     return {
         "id": patient.id,
@@ -39,31 +58,120 @@ def patient_to_dict(patient) -> Dict[str, Any]:
 
 @router.get("/patients")
 def get_all_patients(
+    response: Response,
     doctor_id: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = limit_param(),
     db: Session = Depends(get_db)
 ):
     """
-    Get patients. If doctor_id is provided, returns only patients assigned to that doctor.
+    Get patients, newest first. If doctor_id is provided, returns only patients assigned to that doctor.
     Otherwise returns all patients (for admins).
+    
+    Pass the X-Next-Cursor response header back as `cursor` to fetch the next page.
     """
     from server_py.models.patient import Patient
     
+    query = db.query(Patient)
     if doctor_id:
         # Filter by assigned doctor
-        patients = db.query(Patient).filter(Patient.assigned_doctor_id == doctor_id).all()
-    else:
-        # Return all patients
-        storage = StorageService(db)
-        patients = storage.get_all_patients()
+        query = query.filter(Patient.assigned_doctor_id == doctor_id)
     
+    patients, next_cursor = paginate(query, Patient.created_at, Patient.id, cursor, limit)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return [patient_to_dict(p) for p in patients]
 
+@router.get("/patients/status-counts")
+def get_patient_status_counts(doctor_id: Optional[str] = None, db: Session = Depends(get_db)):
+    """
+    Patient totals per dashboard status filter, aggregated in the database so the
+    dashboard does not have to download every patient to count them.
+    If doctor_id is provided, counts only patients assigned to that doctor.
+    """
+    from server_py.models.patient import Patient
+    
+    filters = [Patient.assigned_doctor_id == doctor_id] if doctor_id else []
+    now = datetime.utcnow()
+    
+    def count_where(condition):
+        return func.count(case((condition, 1)))
+    
+    critical = or_(Patient.bp_systolic > CRITICAL_SYSTOLIC, Patient.heart_rate > CRITICAL_HEART_RATE)
+    total, new, last_visit, critical_count, booked = db.query(
+        func.count(Patient.id),
+        # Registered within the last day or seven days (whole days elapsed)
+        count_where(Patient.created_at > now - timedelta(days=2)),
+        count_where(Patient.created_at > now - timedelta(days=8)),
+        count_where(critical),
+        count_where(Patient.phone_number != "")
+    ).filter(*filters).one()
+    
+    # Temperature is free text, so parse each distinct reading once in Python
+    not_critical = and_(
+        or_(Patient.bp_systolic.is_(None), Patient.bp_systolic <= CRITICAL_SYSTOLIC),
+        or_(Patient.heart_rate.is_(None), Patient.heart_rate <= CRITICAL_HEART_RATE)
+    )
+    senior = Patient.age > DISCHARGE_MIN_AGE
+    readings = db.query(Patient.temperature, senior, func.count(Patient.id)).filter(
+        *filters, not_critical, Patient.temperature.isnot(None)
+    ).group_by(Patient.temperature, senior).all()
+    
+    low_risk = discharged = 0
+    for temperature, is_senior, count in readings:
+        match = LEADING_NUMBER.match(temperature)
+        if match and float(match.group(1)) < LOW_RISK_MAX_TEMPERATURE:
+            low_risk += count
+            if is_senior:
+                discharged += count
+    
+    return {
+        "total": total,
+        "new": new,
+        "lastVisit": last_visit,
+        "critical": critical_count,
+        "lowRisk": low_risk,
+        "booked": booked,
+        "discharged": discharged,
+        "death": 0
+    }
+
 @router.get("/patients/search")
-def search_patients(query: str = Query(...), db: Session = Depends(get_db)):
+def search_patients(
+    query: str = Query(...),
+    hospital_id: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db)
+):
+    """
+    Search patients by name, MRN or NIN, best match first.
+    Exact MRN/NIN matches rank first; page through results with limit/offset.
+    """
     storage = StorageService(db)
-    patients = storage.search_patients(query)
+    patients = storage.search_patients(query, hospital_id=hospital_id, limit=limit, offset=offset)
     return [patient_to_dict(p) for p in patients]
 
+@router.get("/patients/autocomplete")
+def autocomplete_patients(
+    query: str = Query(..., min_length=1),
+    hospital_id: Optional[str] = None,
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db)
+):
+    """
+    Type-ahead over patient names, MRN and NIN from an in-memory index.
+    Hospitals too large to hold in memory are served by the search index.
+    """
+    matches = patient_autocomplete.lookup(db, query, hospital_id=hospital_id, limit=limit)
+    if matches is None:
+        storage = StorageService(db)
+        matches = [
+            {"id": p.id, "mrn": p.mrn, "firstName": p.first_name, "lastName": p.last_name, "nin": p.nin}
+            for p in storage.search_patients(query, hospital_id=hospital_id, limit=limit)
+        ]
+    return matches
+
 @router.get("/patients/{patient_id}")
 def get_patient(patient_id: str, db: Session = Depends(get_db)):
     storage = StorageService(db)
@@ -86,6 +194,32 @@ def create_patient(patient_data: Dict[str, Any], db: Session = Depends(get_db)):
     patient = storage.create_patient(patient_data)
     return patient_to_dict(patient)
 
+@router.post("/patients/import")
+def import_patients(
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, description="csv or ndjson; inferred from the file name if omitted"),
+    hospital_id: Optional[str] = None,
+    registered_by: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Bulk-import legacy patient records from a CSV or NDJSON upload.
+    The file is parsed as a stream and inserted in chunked transactions; rows
+    that fail validation or duplicate an existing MRN are reported, not fatal.
+    """
+    fmt = format or detect_format(file.filename)
+    if fmt not in IMPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported import format. Must be one of: {', '.join(IMPORT_FORMATS)}")
+    
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    service = PatientImportService(db, hospital_id=hospital_id, registered_by=registered_by)
+    report = service.run(
+        stream, fmt,
+        on_progress=lambda r: logger.info("Patient import: %d rows processed, %d imported, %d failed",
+                                          r.processed, r.imported, r.failed)
+    )
+    return report.to_dict()
+
 @router.patch("/patients/{patient_id}")
 def update_patient(patient_id: str, updates: Dict[str, Any], db: Session = Depends(get_db)):
     storage = StorageService(db)
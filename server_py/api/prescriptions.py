@@ -1,17 +1,25 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 import uuid
 
 from server_py.db.session import get_db
+from server_py.api.pagination import limit_param, paginate
 from server_py.models.prescription import Prescription
 from server_py.models.user import User
 from server_py.models.patient import Patient
+from server_py.services.entity_loader import EntityLoader
+from server_py.services.drug_interactions import get_interaction_graph
+from server_py.services.allergy_index import get_allergy_index, parse_allergies
+from server_py.services.patient_events import PatientEventService
 from pydantic import BaseModel
 
 router = APIRouter(prefix="/api/prescriptions", tags=["prescriptions"])
 
+# Prescriptions the patient may still be taking
+ACTIVE_PRESCRIPTION_STATUSES = ("pending", "dispensed")
+
 class PrescriptionCreate(BaseModel):
     patient_id: str
     medication_name: str
@@ -19,6 +27,10 @@ class PrescriptionCreate(BaseModel):
     frequency: str
     duration: str
     instructions: Optional[str] = None
+    # Prescribe despite a contraindicated interaction with an active prescription
+    override_interactions: bool = False
+    # Prescribe despite a high-severity conflict with the patient's recorded allergies
+    override_allergies: bool = False
 
 class PrescriptionDispense(BaseModel):
     notes: Optional[str] = None
@@ -33,6 +45,22 @@ def create_prescription(rx_data: PrescriptionCreate, doctor_id: str, db: Session
     if not patient:
         raise HTTPException(status_code=404, detail="Patient not found")
     
+    interactions = check_active_interactions(rx_data.patient_id, rx_data.medication_name, db)
+    contraindicated = [i for i in interactions if i["severity"] == "contraindicated"]
+    if contraindicated and not rx_data.override_interactions:
+        raise HTTPException(status_code=409, detail={
+            "message": "Contraindicated with an active prescription; set override_interactions to prescribe anyway",
+            "interactions": contraindicated
+        })
+    
+    allergy_conflicts = get_allergy_index().check([rx_data.medication_name], parse_allergies(patient.allergies))
+    high_risk = [c for c in allergy_conflicts if c["severity"] == "high"]
+    if high_risk and not rx_data.override_allergies:
+        raise HTTPException(status_code=409, detail={
+            "message": "Conflicts with the patient's recorded allergies; set override_allergies to prescribe anyway",
+            "allergyConflicts": high_risk
+        })
+    
     prescription = Prescription(
         id=str(uuid.uuid4()),
         patient_id=rx_data.patient_id,
@@ -46,10 +74,23 @@ def create_prescription(rx_data: PrescriptionCreate, doctor_id: str, db: Session
     )
     
     db.add(prescription)
+    PatientEventService(db).record("prescription", prescription, "created")
     db.commit()
     db.refresh(prescription)
     
-    return {"prescription": serialize_prescription(prescription, db)}
+    return {
+        "prescription": serialize_prescription(prescription, db),
+        "interactions": interactions,
+        "allergyConflicts": allergy_conflicts
+    }
+
+def check_active_interactions(patient_id: str, medication_name: str, db: Session) -> List[dict]:
+    """Interactions between a new medication and the patient's active prescriptions"""
+    active = db.query(Prescription.medication_name).filter(
+        Prescription.patient_id == patient_id,
+        Prescription.status.in_(ACTIVE_PRESCRIPTION_STATUSES)
+    ).all()
+    return get_interaction_graph().check_against([medication_name], [row.medication_name for row in active])
 
 @router.get("/patient/{patient_id}")
 def get_patient_prescriptions(patient_id: str, status: Optional[str] = None, db: Session = Depends(get_db)):
@@ -59,12 +100,39 @@ def get_patient_prescriptions(patient_id: str, status: Optional[str] = None, db:
         query = query.filter(Prescription.status == status)
     
     prescriptions = query.order_by(Prescription.created_at.desc()).all()
+    prime_prescription_lookups(prescriptions, db)
     return {"prescriptions": [serialize_prescription(p, db) for p in prescriptions]}
 
+@router.get("/patient/{patient_id}/allergy-check")
+def check_patient_allergies(patient_id: str, db: Session = Depends(get_db)):
+    """Active prescriptions that conflict with the patient's recorded allergies"""
+    patient = db.query(Patient).filter(Patient.id == patient_id).first()
+    if not patient:
+        raise HTTPException(status_code=404, detail="Patient not found")
+    
+    active = db.query(Prescription.medication_name).filter(
+        Prescription.patient_id == patient_id,
+        Prescription.status.in_(ACTIVE_PRESCRIPTION_STATUSES)
+    ).all()
+    allergies = parse_allergies(patient.allergies)
+    return {
+        "allergies": allergies,
+        "conflicts": get_allergy_index().check([row.medication_name for row in active], allergies)
+    }
+
 @router.get("/pending")
-def get_pending_prescriptions(db: Session = Depends(get_db)):
-    prescriptions = db.query(Prescription).filter(Prescription.status == "pending").all()
-    return {"prescriptions": [serialize_prescription(p, db) for p in prescriptions]}
+def get_pending_prescriptions(
+    cursor: Optional[str] = None,
+    limit: int = limit_param(),
+    db: Session = Depends(get_db)
+):
+    query = db.query(Prescription).filter(Prescription.status == "pending")
+    prescriptions, next_cursor = paginate(query, Prescription.created_at, Prescription.id, cursor, limit)
+    prime_prescription_lookups(prescriptions, db)
+    return {
+        "prescriptions": [serialize_prescription(p, db) for p in prescriptions],
+        "next_cursor": next_cursor
+    }
 
 @router.post("/{prescription_id}/dispense")
 def dispense_prescription(
@@ -90,17 +158,22 @@ def dispense_prescription(
     if dispense_data.notes:
         prescription.notes = dispense_data.notes
     
+    PatientEventService(db).record("prescription", prescription)
     db.commit()
     db.refresh(prescription)
     
     return {"prescription": serialize_prescription(prescription, db)}
 
+def prime_prescription_lookups(prescriptions: List[Prescription], db: Session):
+    loader = EntityLoader.for_session(db)
+    loader.prime(User, [p.doctor_id for p in prescriptions] + [p.dispensed_by for p in prescriptions])
+    loader.prime(Patient, [p.patient_id for p in prescriptions])
+
 def serialize_prescription(prescription: Prescription, db: Session):
-    doctor = db.query(User).filter(User.id == prescription.doctor_id).first()
-    patient = db.query(Patient).filter(Patient.id == prescription.patient_id).first()
-    pharmacist = None
-    if prescription.dispensed_by:
-        pharmacist = db.query(User).filter(User.id == prescription.dispensed_by).first()
+    loader = EntityLoader.for_session(db)
+    doctor = loader.get(User, prescription.doctor_id)
+    patient = loader.get(Patient, prescription.patient_id)
+    pharmacist = loader.get(User, prescription.dispensed_by)
     
     return {
         "id": prescription.id,
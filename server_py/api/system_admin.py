@@ -4,8 +4,9 @@ Provides administrative oversight functions for the platform
 """
 from fastapi import APIRouter, HTTPException, Depends, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import func, desc, or_
-from server_py.db.session import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, desc, or_
+from server_py.db.session import get_db, get_async_db
 from server_py.models.user import User
 from server_py.models.hospital import Hospital
 from server_py.models.patient import Patient
@@ -38,27 +39,29 @@ class AnnouncementRequest(BaseModel):
     priority: str = "normal"
 
 # System Health & Monitoring Endpoints
+# Plain `def` on purpose: psutil sampling blocks for a second, so these run in
+# the threadpool with a sync session instead of on the event loop.
 
 @router.get("/system/health")
-async def get_system_health(db: Session = Depends(get_db)):
+def get_system_health(db: Session = Depends(get_db)):
     """Get overall system health status"""
     monitoring = SystemMonitoringService(db)
     return monitoring.get_system_health()
 
 @router.get("/system/metrics")
-async def get_system_metrics(db: Session = Depends(get_db)):
+def get_system_metrics(db: Session = Depends(get_db)):
     """Get real-time system metrics (CPU, memory, disk)"""
     monitoring = SystemMonitoringService(db)
     return monitoring.get_system_metrics()
 
 @router.get("/system/database-metrics")
-async def get_database_metrics(db: Session = Depends(get_db)):
+def get_database_metrics(db: Session = Depends(get_db)):
     """Get database performance metrics"""
     monitoring = SystemMonitoringService(db)
     return monitoring.get_database_metrics()
 
 @router.get("/system/errors")
-async def get_recent_errors(
+def get_recent_errors(
     limit: int = Query(50, le=200),
     db: Session = Depends(get_db)
 ):
@@ -67,35 +70,41 @@ async def get_recent_errors(
     return monitoring.get_recent_errors(limit)
 
 @router.get("/system/stats")
-async def get_platform_stats(db: Session = Depends(get_db)):
+async def get_platform_stats(db: AsyncSession = Depends(get_async_db)):
     """Get platform-wide statistics"""
-    total_hospitals = db.query(Hospital).count()
-    active_hospitals = db.query(Hospital).filter(
-        Hospital.subscription_status == "active"
-    ).count()
-    total_users = db.query(User).count()
-    total_patients = db.query(Patient).count()
-    total_appointments = db.query(Appointment).count()
+    total_hospitals = await db.scalar(select(func.count(Hospital.id)))
+    active_hospitals = await db.scalar(
+        select(func.count(Hospital.id)).where(Hospital.subscription_status == "active")
+    )
+    total_users = await db.scalar(select(func.count(User.id)))
+    total_patients = await db.scalar(select(func.count(Patient.id)))
+    total_appointments = await db.scalar(select(func.count(Appointment.id)))
     
     # Appointments today
     today = datetime.now().date()
-    appointments_today = db.query(Appointment).filter(
-        func.date(Appointment.appointment_date) == today
-    ).count()
+    appointments_today = await db.scalar(
+        select(func.count(Appointment.id)).where(
+            func.date(Appointment.appointment_date) == today
+        )
+    )
     
     # Users by role
     users_by_role = {}
-    role_counts = db.query(User.role, func.count(User.id)).group_by(User.role).all()
-    for role, count in role_counts:
+    role_counts = await db.execute(
+        select(User.role, func.count(User.id)).group_by(User.role)
+    )
+    for role, count in role_counts.all():
         users_by_role[role] = count
     
     # Hospitals by tier
     hospitals_by_tier = {}
-    tier_counts = db.query(
-        Hospital.subscription_tier, 
-        func.count(Hospital.id)
-    ).group_by(Hospital.subscription_tier).all()
-    for tier, count in tier_counts:
+    tier_counts = await db.execute(
+        select(
+            Hospital.subscription_tier, 
+            func.count(Hospital.id)
+        ).group_by(Hospital.subscription_tier)
+    )
+    for tier, count in tier_counts.all():
         hospitals_by_tier[str(tier)] = count
     
     return {
@@ -128,15 +137,15 @@ async def search_users(
     is_active: Optional[int] = None,
     limit: int = Query(100, le=500),
     offset: int = 0,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Search and list all users across all tenants"""
-    query = db.query(User)
+    query = select(User)
     
     # Apply filters
     if search:
         search_term = f"%{search}%"
-        query = query.filter(
+        query = query.where(
             or_(
                 User.username.ilike(search_term),
                 User.full_name.ilike(search_term)
@@ -144,16 +153,17 @@ async def search_users(
         )
     
     if role:
-        query = query.filter(User.role == role)
+        query = query.where(User.role == role)
     
     if hospital_id:
-        query = query.filter(User.hospital_id == hospital_id)
+        query = query.where(User.hospital_id == hospital_id)
     
     if is_active is not None:
-        query = query.filter(User.is_active == is_active)
+        query = query.where(User.is_active == is_active)
     
-    total = query.count()
-    users = query.offset(offset).limit(limit).all()
+    total = await db.scalar(select(func.count()).select_from(query.subquery()))
+    result = await db.execute(query.offset(offset).limit(limit))
+    users = result.scalars().all()
     
     return {
         "total": total,
@@ -173,16 +183,16 @@ async def search_users(
     }
 
 @router.get("/users/{user_id}")
-async def get_user_details(user_id: str, db: Session = Depends(get_db)):
+async def get_user_details(user_id: str, db: AsyncSession = Depends(get_async_db)):
     """Get detailed user information"""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
     # Get hospital info if applicable
     hospital = None
     if user.hospital_id:
-        hospital = db.query(Hospital).filter(Hospital.id == user.hospital_id).first()
+        hospital = await db.get(Hospital, user.hospital_id)
     
     return {
         "id": user.id,
@@ -201,10 +211,10 @@ async def get_user_details(user_id: str, db: Session = Depends(get_db)):
 async def update_user(
     user_id: str,
     updates: UserUpdateRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update user (including activation/suspension)"""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
@@ -213,10 +223,7 @@ async def update_user(
     for key, value in update_data.items():
         setattr(user, key, value)
     
-    db.commit()
-    db.refresh(user)
-    
-    # Log the action
+    # Log the action in the same transaction
     audit_log = AuditLog(
         user_id="system_admin",
         hospital_id=user.hospital_id,
@@ -227,7 +234,7 @@ async def update_user(
         timestamp=datetime.now()
     )
     db.add(audit_log)
-    db.commit()
+    await db.commit()
     
     return {
         "message": "User updated successfully",
@@ -241,14 +248,15 @@ async def update_user(
     }
 
 @router.get("/users/sessions/active")
-async def get_active_sessions(db: Session = Depends(get_db)):
+async def get_active_sessions(db: AsyncSession = Depends(get_async_db)):
     """Get all active user sessions"""
     # This would integrate with session storage (Redis, etc.)
     # For now, return recently active users
     recent_cutoff = datetime.now() - timedelta(minutes=30)
     
     # Placeholder: In production, this would query actual session data
-    active_users = db.query(User).filter(User.is_active == 1).limit(50).all()
+    result = await db.execute(select(User).where(User.is_active == 1).limit(50))
+    active_users = result.scalars().all()
     
     return {
         "active_sessions": len(active_users),
@@ -267,29 +275,36 @@ async def get_active_sessions(db: Session = Depends(get_db)):
 # Hospital Management Endpoints
 
 @router.get("/hospitals/overview")
-async def get_hospitals_overview(db: Session = Depends(get_db)):
+async def get_hospitals_overview(db: AsyncSession = Depends(get_async_db)):
     """Get enhanced hospital overview with usage stats"""
-    hospitals = db.query(Hospital).all()
+    result = await db.execute(select(Hospital))
+    hospitals = result.scalars().all()
     
     hospital_data = []
     for hospital in hospitals:
         # Get staff count
-        staff_count = db.query(User).filter(
-            User.hospital_id == hospital.id,
-            User.role.in_(["doctor", "nurse", "pharmacist", "lab_tech", "receptionist"])
-        ).count()
+        staff_count = await db.scalar(
+            select(func.count(User.id)).where(
+                User.hospital_id == hospital.id,
+                User.role.in_(["doctor", "nurse", "pharmacist", "lab_tech", "receptionist"])
+            )
+        )
         
         # Get patient count
-        patient_count = db.query(Patient).filter(
-            Patient.registered_by.in_(
-                db.query(User.id).filter(User.hospital_id == hospital.id)
+        patient_count = await db.scalar(
+            select(func.count(Patient.id)).where(
+                Patient.registered_by.in_(
+                    select(User.id).where(User.hospital_id == hospital.id)
+                )
             )
-        ).count()
+        )
         
         # Get appointments count
-        appointment_count = db.query(Appointment).join(
-            User, Appointment.doctor_id == User.id
-        ).filter(User.hospital_id == hospital.id).count()
+        appointment_count = await db.scalar(
+            select(func.count(Appointment.id)).join(
+                User, Appointment.doctor_id == User.id
+            ).where(User.hospital_id == hospital.id)
+        )
         
         hospital_data.append({
             "id": hospital.id,
@@ -312,16 +327,14 @@ async def get_hospitals_overview(db: Session = Depends(get_db)):
     return hospital_data
 
 @router.post("/hospitals/{hospital_id}/suspend")
-async def suspend_hospital(hospital_id: str, db: Session = Depends(get_db)):
+async def suspend_hospital(hospital_id: str, db: AsyncSession = Depends(get_async_db)):
     """Suspend hospital access"""
-    hospital = db.query(Hospital).filter(Hospital.id == hospital_id).first()
+    hospital = await db.get(Hospital, hospital_id)
     if not hospital:
         raise HTTPException(status_code=404, detail="Hospital not found")
     
     hospital.subscription_status = "suspended"
-    db.commit()
-    
-    # Log the action
+    # Log the action in the same transaction
     audit_log = AuditLog(
         user_id="system_admin",
         hospital_id=hospital_id,
@@ -332,21 +345,19 @@ async def suspend_hospital(hospital_id: str, db: Session = Depends(get_db)):
         timestamp=datetime.now()
     )
     db.add(audit_log)
-    db.commit()
+    await db.commit()
     
     return {"message": f"Hospital {hospital.name} has been suspended"}
 
 @router.post("/hospitals/{hospital_id}/activate")
-async def activate_hospital(hospital_id: str, db: Session = Depends(get_db)):
+async def activate_hospital(hospital_id: str, db: AsyncSession = Depends(get_async_db)):
     """Reactivate hospital"""
-    hospital = db.query(Hospital).filter(Hospital.id == hospital_id).first()
+    hospital = await db.get(Hospital, hospital_id)
     if not hospital:
         raise HTTPException(status_code=404, detail="Hospital not found")
     
     hospital.subscription_status = "active"
-    db.commit()
-    
-    # Log the action
+    # Log the action in the same transaction
     audit_log = AuditLog(
         user_id="system_admin",
         hospital_id=hospital_id,
@@ -357,7 +368,7 @@ async def activate_hospital(hospital_id: str, db: Session = Depends(get_db)):
         timestamp=datetime.now()
     )
     db.add(audit_log)
-    db.commit()
+    await db.commit()
     
     return {"message": f"Hospital {hospital.name} has been activated"}
 
@@ -371,22 +382,23 @@ async def get_audit_logs(
     resource_type: Optional[str] = None,
     limit: int = Query(100, le=500),
     offset: int = 0,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get system-wide audit trail"""
-    query = db.query(AuditLog)
+    query = select(AuditLog)
     
     if user_id:
-        query = query.filter(AuditLog.user_id == user_id)
+        query = query.where(AuditLog.user_id == user_id)
     if hospital_id:
-        query = query.filter(AuditLog.hospital_id == hospital_id)
+        query = query.where(AuditLog.hospital_id == hospital_id)
     if action_type:
-        query = query.filter(AuditLog.action_type == action_type)
+        query = query.where(AuditLog.action_type == action_type)
     if resource_type:
-        query = query.filter(AuditLog.resource_type == resource_type)
+        query = query.where(AuditLog.resource_type == resource_type)
     
-    total = query.count()
-    logs = query.order_by(desc(AuditLog.timestamp)).offset(offset).limit(limit).all()
+    total = await db.scalar(select(func.count()).select_from(query.subquery()))
+    result = await db.execute(query.order_by(desc(AuditLog.timestamp)).offset(offset).limit(limit))
+    logs = result.scalars().all()
     
     return {
         "total": total,
@@ -413,20 +425,21 @@ async def get_security_events(
     resolved: Optional[str] = None,
     limit: int = Query(100, le=500),
     offset: int = 0,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get security events"""
-    query = db.query(SecurityEvent)
+    query = select(SecurityEvent)
     
     if event_type:
-        query = query.filter(SecurityEvent.event_type == event_type)
+        query = query.where(SecurityEvent.event_type == event_type)
     if severity:
-        query = query.filter(SecurityEvent.severity == severity)
+        query = query.where(SecurityEvent.severity == severity)
     if resolved:
-        query = query.filter(SecurityEvent.resolved == resolved)
+        query = query.where(SecurityEvent.resolved == resolved)
     
-    total = query.count()
-    events = query.order_by(desc(SecurityEvent.timestamp)).offset(offset).limit(limit).all()
+    total = await db.scalar(select(func.count()).select_from(query.subquery()))
+    result = await db.execute(query.order_by(desc(SecurityEvent.timestamp)).offset(offset).limit(limit))
+    events = result.scalars().all()
     
     return {
         "total": total,
@@ -449,15 +462,18 @@ async def get_security_events(
 @router.get("/security/failed-logins")
 async def get_failed_logins(
     hours: int = Query(24, le=168),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get failed login attempts"""
     cutoff = datetime.now() - timedelta(hours=hours)
     
-    failed_logins = db.query(SecurityEvent).filter(
-        SecurityEvent.event_type == "failed_login",
-        SecurityEvent.timestamp >= cutoff
-    ).order_by(desc(SecurityEvent.timestamp)).limit(200).all()
+    result = await db.execute(
+        select(SecurityEvent).where(
+            SecurityEvent.event_type == "failed_login",
+            SecurityEvent.timestamp >= cutoff
+        ).order_by(desc(SecurityEvent.timestamp)).limit(200)
+    )
+    failed_logins = result.scalars().all()
     
     return {
         "total": len(failed_logins),
@@ -491,7 +507,7 @@ async def get_system_settings():
 @router.post("/announcements")
 async def create_announcement(
     announcement: AnnouncementRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Broadcast system-wide announcement"""
     # This would typically create notifications for all users
@@ -508,7 +524,7 @@ async def create_announcement(
         timestamp=datetime.now()
     )
     db.add(audit_log)
-    db.commit()
+    await db.commit()
     
     return {
         "message": "Announcement created successfully",
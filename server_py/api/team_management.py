@@ -8,6 +8,7 @@ from server_py.db.session import get_db
 from server_py.models.team import Team
 from server_py.models.team_member import TeamMember
 from server_py.models.user import User
+from server_py.services.entity_loader import EntityLoader
 from pydantic import BaseModel
 
 router = APIRouter(prefix="/api/team-management", tags=["team-management"])
@@ -50,10 +51,8 @@ def create_team(team_data: TeamCreate, admin_id: str, db: Session = Depends(get_
     )
     
     db.add(team)
-    db.commit()
-    db.refresh(team)
     
-    # If team lead is specified, add them as a member
+    # If team lead is specified, add them as a member in the same transaction
     if team_data.team_lead_id:
         team_member = TeamMember(
             id=str(uuid.uuid4()),
@@ -62,7 +61,9 @@ def create_team(team_data: TeamCreate, admin_id: str, db: Session = Depends(get_
             role_in_team="lead"
         )
         db.add(team_member)
-        db.commit()
+    
+    db.commit()
+    db.refresh(team)
     
     return {"team": serialize_team(team, db)}
 
@@ -86,6 +87,7 @@ def get_teams(
         query = query.filter(Team.status == status)
     
     teams = query.all()
+    EntityLoader.for_session(db).prime(User, [t.team_lead_id for t in teams])
     return {"teams": [serialize_team(t, db) for t in teams]}
 
 @router.get("/{team_id}")
@@ -98,8 +100,11 @@ def get_team(team_id: str, db: Session = Depends(get_db)):
     team_members = db.query(TeamMember).filter(TeamMember.team_id == team_id).all()
     members = []
     
+    loader = EntityLoader.for_session(db)
+    loader.prime(User, [team.team_lead_id] + [tm.user_id for tm in team_members])
+    
     for tm in team_members:
-        user = db.query(User).filter(User.id == tm.user_id).first()
+        user = loader.get(User, tm.user_id)
         if user:
             members.append({
                 "id": tm.id,
@@ -238,7 +243,7 @@ def get_team_stats(hospital_id: Optional[str] = None, db: Session = Depends(get_
 def serialize_team(team: Team, db: Session):
     team_lead = None
     if team.team_lead_id:
-        lead = db.query(User).filter(User.id == team.team_lead_id).first()
+        lead = EntityLoader.for_session(db).get(User, team.team_lead_id)
         if lead:
             team_lead = {"id": lead.id, "name": lead.full_name, "role": lead.role}
     
@@ -2,9 +2,11 @@
 Telemedicine API Endpoints
 Video consultation scheduling and management
 """
-from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
-from server_py.db.session import get_db
+from fastapi import APIRouter, HTTPException, Depends, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from server_py.db.session import get_async_db
+from server_py.api.pagination import NEXT_CURSOR_HEADER, limit_param, paginate_async
 from server_py.models.telemedicine_session import TelemedicineSession, SessionStatus
 from server_py.models.user import User
 from server_py.models.patient import Patient
@@ -57,19 +59,21 @@ class VideoTokenResponse(BaseModel):
     doctor_name: str
 
 @router.post("/sessions", response_model=SessionResponse, status_code=201)
-async def schedule_consultation(session_data: SessionCreate, db: Session = Depends(get_db)):
+async def schedule_consultation(session_data: SessionCreate, db: AsyncSession = Depends(get_async_db)):
     """Schedule a new telemedicine consultation"""
     
     # Verify patient exists
-    patient = db.query(Patient).filter(Patient.id == session_data.patient_id).first()
+    patient = await db.get(Patient, session_data.patient_id)
     if not patient:
         raise HTTPException(status_code=404, detail="Patient not found")
     
     # Verify doctor exists and is a doctor
-    doctor = db.query(User).filter(
-        User.id == session_data.doctor_id,
-        User.role == "doctor"
-    ).first()
+    doctor = await db.scalar(
+        select(User).where(
+            User.id == session_data.doctor_id,
+            User.role == "doctor"
+        )
+    )
     if not doctor:
         raise HTTPException(status_code=404, detail="Doctor not found or invalid role")
     
@@ -89,46 +93,56 @@ async def schedule_consultation(session_data: SessionCreate, db: Session = Depen
     )
     
     db.add(new_session)
-    db.commit()
-    db.refresh(new_session)
+    await db.commit()
+    await db.refresh(new_session)
     
     return new_session
 
 @router.get("/sessions", response_model=List[SessionResponse])
 async def list_sessions(
+    response: Response,
     hospital_id: Optional[str] = None,
     doctor_id: Optional[str] = None,
     patient_id: Optional[str] = None,
     status: Optional[str] = None,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    limit: int = limit_param(),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """List telemedicine sessions with optional filters"""
-    query = db.query(TelemedicineSession)
+    """
+    List telemedicine sessions with optional filters, latest scheduled first.
+    Pass the X-Next-Cursor response header back as `cursor` for the next page.
+    """
+    query = select(TelemedicineSession)
     
     if hospital_id:
-        query = query.filter(TelemedicineSession.hospital_id == hospital_id)
+        query = query.where(TelemedicineSession.hospital_id == hospital_id)
     if doctor_id:
-        query = query.filter(TelemedicineSession.doctor_id == doctor_id)
+        query = query.where(TelemedicineSession.doctor_id == doctor_id)
     if patient_id:
-        query = query.filter(TelemedicineSession.patient_id == patient_id)
+        query = query.where(TelemedicineSession.patient_id == patient_id)
     if status:
-        query = query.filter(TelemedicineSession.status == status)
+        query = query.where(TelemedicineSession.status == status)
     
-    sessions = query.order_by(TelemedicineSession.scheduled_time.desc()).all()
+    sessions, next_cursor = await paginate_async(
+        db, query, TelemedicineSession.scheduled_time, TelemedicineSession.id, cursor, limit
+    )
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return sessions
 
 @router.get("/sessions/{session_id}", response_model=SessionResponse)
-async def get_session(session_id: str, db: Session = Depends(get_db)):
+async def get_session(session_id: str, db: AsyncSession = Depends(get_async_db)):
     """Get session details"""
-    session = db.query(TelemedicineSession).filter(TelemedicineSession.id == session_id).first()
+    session = await db.get(TelemedicineSession, session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     return session
 
 @router.post("/sessions/{session_id}/start", response_model=VideoTokenResponse)
-async def start_session(session_id: str, user_id: str, db: Session = Depends(get_db)):
+async def start_session(session_id: str, user_id: str, db: AsyncSession = Depends(get_async_db)):
     """Start a video consultation and generate Agora token"""
-    session = db.query(TelemedicineSession).filter(TelemedicineSession.id == session_id).first()
+    session = await db.get(TelemedicineSession, session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
@@ -152,11 +166,11 @@ async def start_session(session_id: str, user_id: str, db: Session = Depends(get
     
     # Store token in session
     session.agora_token = token_data["token"]
-    db.commit()
+    await db.commit()
     
     # Get participant names
-    patient = db.query(Patient).filter(Patient.id == session.patient_id).first()
-    doctor = db.query(User).filter(User.id == session.doctor_id).first()
+    patient = await db.get(Patient, session.patient_id)
+    doctor = await db.get(User, session.doctor_id)
     
     return {
         "session_id": session.id,
@@ -170,9 +184,9 @@ async def start_session(session_id: str, user_id: str, db: Session = Depends(get
     }
 
 @router.post("/sessions/{session_id}/end")
-async def end_session(session_id: str, db: Session = Depends(get_db)):
+async def end_session(session_id: str, db: AsyncSession = Depends(get_async_db)):
     """End a video consultation"""
-    session = db.query(TelemedicineSession).filter(TelemedicineSession.id == session_id).first()
+    session = await db.get(TelemedicineSession, session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
@@ -188,8 +202,8 @@ async def end_session(session_id: str, db: Session = Depends(get_db)):
         duration = (session.actual_end_time - session.actual_start_time).total_seconds() / 60
         session.duration_minutes = int(duration)
     
-    db.commit()
-    db.refresh(session)
+    await db.commit()
+    await db.refresh(session)
     
     return {
         "message": "Session ended successfully",
@@ -201,10 +215,10 @@ async def end_session(session_id: str, db: Session = Depends(get_db)):
 async def update_session(
     session_id: str,
     session_data: SessionUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update session details (notes, prescription, etc.)"""
-    session = db.query(TelemedicineSession).filter(TelemedicineSession.id == session_id).first()
+    session = await db.get(TelemedicineSession, session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
@@ -216,14 +230,14 @@ async def update_session(
         else:
             setattr(session, field, value)
     
-    db.commit()
-    db.refresh(session)
+    await db.commit()
+    await db.refresh(session)
     return session
 
 @router.delete("/sessions/{session_id}", status_code=204)
-async def cancel_session(session_id: str, db: Session = Depends(get_db)):
+async def cancel_session(session_id: str, db: AsyncSession = Depends(get_async_db)):
     """Cancel a scheduled session"""
-    session = db.query(TelemedicineSession).filter(TelemedicineSession.id == session_id).first()
+    session = await db.get(TelemedicineSession, session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
@@ -231,14 +245,14 @@ async def cancel_session(session_id: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=400, detail="Cannot cancel a session in progress")
     
     session.status = SessionStatus.CANCELLED
-    db.commit()
+    await db.commit()
     
     return None
 
 @router.get("/sessions/{session_id}/recording")
-async def get_session_recording(session_id: str, db: Session = Depends(get_db)):
+async def get_session_recording(session_id: str, db: AsyncSession = Depends(get_async_db)):
     """Get recording URL for a completed session (placeholder)"""
-    session = db.query(TelemedicineSession).filter(TelemedicineSession.id == session_id).first()
+    session = await db.get(TelemedicineSession, session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
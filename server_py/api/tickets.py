@@ -6,9 +6,11 @@ from datetime import datetime
 import uuid
 
 from server_py.db.session import get_db
+from server_py.api.pagination import limit_param, paginate
 from server_py.models.ticket import Ticket
 from server_py.models.ticket_comment import TicketComment
 from server_py.models.user import User
+from server_py.services.entity_loader import EntityLoader
 from pydantic import BaseModel
 
 router = APIRouter(prefix="/api/tickets", tags=["tickets"])
@@ -70,6 +72,8 @@ def get_tickets(
     status: Optional[str] = None,
     type: Optional[str] = None,
     assigned_to: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = limit_param(),
     db: Session = Depends(get_db)
 ):
     query = db.query(Ticket)
@@ -88,8 +92,11 @@ def get_tickets(
     if assigned_to:
         query = query.filter(Ticket.assigned_to == assigned_to)
     
-    tickets = query.order_by(Ticket.created_at.desc()).all()
-    return {"tickets": [serialize_ticket(t, db) for t in tickets]}
+    tickets, next_cursor = paginate(query, Ticket.created_at, Ticket.id, cursor, limit)
+    EntityLoader.for_session(db).prime(
+        User, [t.created_by for t in tickets] + [t.assigned_to for t in tickets]
+    )
+    return {"tickets": [serialize_ticket(t, db) for t in tickets], "next_cursor": next_cursor}
 
 @router.get("/{ticket_id}")
 def get_ticket(ticket_id: str, db: Session = Depends(get_db)):
@@ -98,6 +105,9 @@ def get_ticket(ticket_id: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Ticket not found")
     
     comments = db.query(TicketComment).filter(TicketComment.ticket_id == ticket_id).order_by(TicketComment.created_at).all()
+    EntityLoader.for_session(db).prime(
+        User, [ticket.created_by, ticket.assigned_to] + [c.user_id for c in comments]
+    )
     
     return {
         "ticket": serialize_ticket(ticket, db),
@@ -178,8 +188,9 @@ def get_ticket_stats(user_id: str, user_role: str, db: Session = Depends(get_db)
     }
 
 def serialize_ticket(ticket: Ticket, db: Session):
-    created_by_user = db.query(User).filter(User.id == ticket.created_by).first()
-    assigned_to_user = db.query(User).filter(User.id == ticket.assigned_to).first() if ticket.assigned_to else None
+    loader = EntityLoader.for_session(db)
+    created_by_user = loader.get(User, ticket.created_by)
+    assigned_to_user = loader.get(User, ticket.assigned_to)
     
     return {
         "id": ticket.id,
@@ -211,7 +222,7 @@ def serialize_ticket(ticket: Ticket, db: Session):
     }
 
 def serialize_comment(comment: TicketComment, db: Session):
-    user = db.query(User).filter(User.id == comment.user_id).first()
+    user = EntityLoader.for_session(db).get(User, comment.user_id)
     
     return {
         "id": comment.id,
@@ -6,6 +6,34 @@ class Settings(BaseSettings):
     DATABASE_URL: str = os.getenv("DATABASE_URL", "")
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
     NODE_ENV: str = os.getenv("NODE_ENV", "development")
+    # Per-request SQL metrics (see server_py/db/query_metrics.py)
+    SQL_QUERY_BUDGET: int = int(os.getenv("SQL_QUERY_BUDGET", "50"))
+    SQL_DEBUG_HEADERS: bool = os.getenv("SQL_DEBUG_HEADERS", "false").lower() == "true"
+    # Seconds a patient's visit summary is served from cache (0 disables)
+    VISIT_SUMMARY_CACHE_TTL: int = int(os.getenv("VISIT_SUMMARY_CACHE_TTL", "30"))
+    # In-memory patient type-ahead (see server_py/services/patient_autocomplete.py)
+    AUTOCOMPLETE_MAX_HOSPITALS: int = int(os.getenv("AUTOCOMPLETE_MAX_HOSPITALS", "50"))
+    AUTOCOMPLETE_MAX_PATIENTS: int = int(os.getenv("AUTOCOMPLETE_MAX_PATIENTS", "200000"))
+    AUTOCOMPLETE_REBUILD_SECONDS: int = int(os.getenv("AUTOCOMPLETE_REBUILD_SECONDS", "300"))
+    # In-process bill totals reconciliation (0 disables; autofix rewrites drifted totals).
+    # Every worker runs its own loop, so multi-worker deploys schedule reconcile_bill_totals.py instead
+    BILL_RECONCILIATION_INTERVAL_SECONDS: int = int(os.getenv("BILL_RECONCILIATION_INTERVAL_SECONDS", "0"))
+    BILL_RECONCILIATION_AUTOFIX: bool = os.getenv("BILL_RECONCILIATION_AUTOFIX", "false").lower() == "true"
+    # Per-hospital service pricing catalog cache (0 TTL disables)
+    PRICING_CACHE_TTL: int = int(os.getenv("PRICING_CACHE_TTL", "300"))
+    PRICING_CACHE_MAX_HOSPITALS: int = int(os.getenv("PRICING_CACHE_MAX_HOSPITALS", "100"))
+    # JSON lexicon for NLP entity extraction (defaults to server_py/data/medical_lexicon.json)
+    MEDICAL_LEXICON_PATH: str = os.getenv("MEDICAL_LEXICON_PATH", "")
+    # Worker processes per web worker for /api/nlp/analyze/batch
+    # (0 = the CPUs divided among the WEB_CONCURRENCY web workers)
+    NLP_BATCH_WORKERS: int = int(os.getenv("NLP_BATCH_WORKERS", "0"))
+    WEB_CONCURRENCY: int = int(os.getenv("WEB_CONCURRENCY", "1"))
+    # Largest /api/nlp/analyze/batch request body; the body is buffered before analysis
+    NLP_BATCH_MAX_BODY_BYTES: int = int(os.getenv("NLP_BATCH_MAX_BODY_BYTES", str(10 * 1024 * 1024)))
+    # Drug interaction dataset, CSV or SQLite (defaults to server_py/data/drug_interactions.csv)
+    DRUG_INTERACTIONS_PATH: str = os.getenv("DRUG_INTERACTIONS_PATH", "")
+    # Drug classes and synonyms for allergy checks (defaults to server_py/data/drug_classes.json)
+    DRUG_CLASSES_PATH: str = os.getenv("DRUG_CLASSES_PATH", "")
     
     class Config:
         env_file = ".env"
@@ -0,0 +1,92 @@
+"""
+Per-request SQL statement counter
+Counts statements and DB time for every request so N+1 serializers show up
+in response headers, in the log, and in query-budget assertions.
+"""
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+
+from server_py.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    total_ms: float = 0.0
+
+# Stats for the request being served in the current context (None outside a request)
+_request_stats: ContextVar[Optional[QueryStats]] = ContextVar("request_query_stats", default=None)
+
+# Open count_queries() blocks, which see every statement regardless of context
+_captures: List[QueryStats] = []
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed_ms = (time.perf_counter() - conn.info["query_start_time"].pop()) * 1000
+
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.count += 1
+        stats.total_ms += elapsed_ms
+
+    for capture in _captures:
+        capture.count += 1
+        capture.total_ms += elapsed_ms
+
+class QueryMetricsMiddleware(BaseHTTPMiddleware):
+    """Record statement count and DB time per request; flag requests over budget"""
+
+    async def dispatch(self, request: Request, call_next):
+        settings = get_settings()
+        stats = QueryStats()
+        token = _request_stats.set(stats)
+        try:
+            response = await call_next(request)
+        finally:
+            _request_stats.reset(token)
+
+        if settings.SQL_DEBUG_HEADERS:
+            response.headers["X-DB-Query-Count"] = str(stats.count)
+            response.headers["X-DB-Query-Time-Ms"] = f"{stats.total_ms:.2f}"
+
+        if stats.count > settings.SQL_QUERY_BUDGET:
+            logger.warning(
+                "Query budget exceeded: %s %s ran %d statements (budget %d) in %.2f ms",
+                request.method, request.url.path, stats.count,
+                settings.SQL_QUERY_BUDGET, stats.total_ms
+            )
+
+        return response
+
+@contextmanager
+def count_queries() -> Iterator[QueryStats]:
+    """Count every statement executed inside the block, e.g. around a TestClient call"""
+    stats = QueryStats()
+    _captures.append(stats)
+    try:
+        yield stats
+    finally:
+        _captures.remove(stats)
+
+@contextmanager
+def query_budget(max_queries: int) -> Iterator[QueryStats]:
+    """Fail with AssertionError if the block runs more than max_queries statements"""
+    with count_queries() as stats:
+        yield stats
+    assert stats.count <= max_queries, (
+        f"Expected at most {max_queries} SQL statements, got {stats.count}"
+    )
@@ -1,4 +1,5 @@
 from fastapi import FastAPI
+import asyncio
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
@@ -37,7 +38,12 @@ from server_py.api.billing import router as billing_router
 from server_py.api.patient_timeline import router as patient_timeline_router
 from server_py.db.session import engine, Base
 from server_py.services.storage import StorageService
+from server_py.services.patient_search import install_search_backend
+from server_py.services.billing_totals import run_bill_reconciliation
+from server_py.services.nlp_batch import shutdown_pool as shutdown_nlp_pool
+from server_py.config import get_settings
 from server_py.db.session import SessionLocal
+from server_py.db.query_metrics import QueryMetricsMiddleware
 
 app = FastAPI(
     title="Digital Doctors Assistant API",
@@ -60,8 +66,11 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS"],  # Explicit methods including OPTIONS
     allow_headers=["*"],
+    expose_headers=["X-DB-Query-Count", "X-DB-Query-Time-Ms", "X-Next-Cursor"],
 )
 
+app.add_middleware(QueryMetricsMiddleware)
+
 app.include_router(auth_router)
 app.include_router(patients_router)
 app.include_router(appointments_router)
@@ -97,6 +106,9 @@ async def startup_event():
     # Create all database tables
     Base.metadata.create_all(bind=engine)
     
+    # Full-text / trigram index behind /api/patients/search
+    install_search_backend(engine)
+    
     db = SessionLocal()
     try:
         storage = StorageService(db)
@@ -105,37 +117,39 @@ async def startup_event():
         if len(users) == 0:
             print("Initializing database with seed data...")
             
-            storage.create_user({
-                "username": "admin",
-                "password": "paypass",
-                "fullName": "System Administrator",
-                "role": "system_admin",
-                "is_active": 1
-            })
+            # One transaction for all default users
+            with storage.batch():
+                storage.create_user({
+                    "username": "admin",
+                    "password": "paypass",
+                    "fullName": "System Administrator",
+                    "role": "system_admin",
+                    "is_active": 1
+                })
             
-            storage.create_user({
-                "username": "doctor1",
-                "password": "pass123",
-                "fullName": "Dr. James Wilson",
-                "role": "doctor",
-                "is_active": 1
-            })
+                storage.create_user({
+                    "username": "doctor1",
+                    "password": "pass123",
+                    "fullName": "Dr. James Wilson",
+                    "role": "doctor",
+                    "is_active": 1
+                })
             
-            storage.create_user({
-                "username": "nurse1",
-                "password": "nursepass",
-                "fullName": "Nurse Sarah Johnson",
-                "role": "nurse",
-                "is_active": 1
-            })
+                storage.create_user({
+                    "username": "nurse1",
+                    "password": "nursepass",
+                    "fullName": "Nurse Sarah Johnson",
+                    "role": "nurse",
+                    "is_active": 1
+                })
             
-            storage.create_user({
-                "username": "patient",
-                "password": "paypass",
-                "fullName": "John Patient",
-                "role": "patient",
-                "is_active": 1
-            })
+                storage.create_user({
+                    "username": "patient",
+                    "password": "paypass",
+                    "fullName": "John Patient",
+                    "role": "patient",
+                    "is_active": 1
+                })
             
             print("Database initialized with 4 default users")
         else:
@@ -143,8 +157,20 @@ async def startup_event():
     finally:
         db.close()
     
+    # Periodic check that stored bill totals still match their items
+    settings = get_settings()
+    if settings.BILL_RECONCILIATION_INTERVAL_SECONDS > 0:
+        asyncio.create_task(run_bill_reconciliation(
+            settings.BILL_RECONCILIATION_INTERVAL_SECONDS,
+            fix=settings.BILL_RECONCILIATION_AUTOFIX
+        ))
+    
     print("Python backend started successfully on port 5000")
 
+@app.on_event("shutdown")
+def shutdown_event():
+    shutdown_nlp_pool()
+
 @app.get("/api/health")
 def health_check():
     return {"status": "healthy", "service": "Digital Doctors Assistant", "version": "2.0.0", "backend": "Python/FastAPI"}
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, func
+from sqlalchemy import Column, String, DateTime, func, Index
 from server_py.db.session import Base
 import uuid
 
@@ -16,3 +16,9 @@ class Appointment(Base):
     created_by = Column(String, nullable=False)
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+    
+    __table_args__ = (
+        Index('idx_appointments_patient_date', 'patient_id', 'appointment_date'),
+        Index('idx_appointments_doctor_date', 'doctor_id', 'appointment_date'),
+        Index('idx_appointments_created', 'created_at', 'id'),
+    )
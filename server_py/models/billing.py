@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Float, Integer, Text, Boolean, func
+from sqlalchemy import Column, String, Date, DateTime, Float, Integer, Text, Boolean, func, text, Index, UniqueConstraint
 from server_py.db.session import Base
 import uuid
 
@@ -24,7 +24,7 @@ class PatientBill(Base):
     __tablename__ = "patient_bills"
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    bill_number = Column(String, unique=True, nullable=False)  # BIL-2024-00001
+    bill_number = Column(String, nullable=False)  # BIL-2024-00001, unique per hospital
     hospital_id = Column(String, nullable=False)
     patient_id = Column(String, nullable=False)
     visit_type = Column(String, nullable=False)  # outpatient, inpatient, emergency
@@ -46,13 +46,23 @@ class PatientBill(Base):
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
     closed_at = Column(DateTime, nullable=True)
+    
+    __table_args__ = (
+        Index('idx_patient_bills_patient_created', 'patient_id', 'created_at'),
+        Index('idx_patient_bills_hospital_status_created', 'hospital_id', 'status', 'created_at'),
+        # Only unpaid bills, for receivables aging
+        Index('idx_patient_bills_receivable', 'hospital_id', 'created_at',
+              postgresql_where=text('balance > 0'), sqlite_where=text('balance > 0')),
+        # Numbers come from per-hospital sequences (document_sequences)
+        UniqueConstraint('hospital_id', 'bill_number', name='uq_patient_bills_hospital_number'),
+    )
 
 class BillItem(Base):
     """Individual charges on a bill"""
     __tablename__ = "bill_items"
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    bill_id = Column(String, nullable=False)
+    bill_id = Column(String, nullable=False, index=True)
     service_category = Column(String, nullable=False)
     service_name = Column(String, nullable=False)
     service_code = Column(String, nullable=True)
@@ -66,16 +76,21 @@ class BillItem(Base):
     reference_type = Column(String, nullable=True)  # appointment, prescription, lab_order, etc.
     notes = Column(Text, nullable=True)
     created_at = Column(DateTime, server_default=func.now())
+    
+    __table_args__ = (
+        # Period scans for the financial reports
+        Index('idx_bill_items_created', 'created_at'),
+    )
 
 class Payment(Base):
     """Payment transactions"""
     __tablename__ = "payments"
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    payment_number = Column(String, unique=True, nullable=False)  # PAY-2024-00001
-    bill_id = Column(String, nullable=False)
+    payment_number = Column(String, nullable=False)  # PAY-2024-00001, unique per hospital
+    bill_id = Column(String, nullable=False, index=True)
     hospital_id = Column(String, nullable=False)
-    patient_id = Column(String, nullable=False)
+    patient_id = Column(String, nullable=False, index=True)
     amount = Column(Float, nullable=False)
     payment_method = Column(String, nullable=False)  # cash, card, transfer, insurance, mobile_money
     payment_reference = Column(String, nullable=True)  # Transaction reference
@@ -84,13 +99,20 @@ class Payment(Base):
     notes = Column(Text, nullable=True)
     payment_date = Column(DateTime, server_default=func.now())
     created_at = Column(DateTime, server_default=func.now())
+    
+    __table_args__ = (
+        Index('idx_payments_hospital_date', 'hospital_id', 'payment_date'),
+        # Idempotency key: a retried payment with the same reference is not applied twice
+        Index('uq_payments_hospital_reference', 'hospital_id', 'payment_reference', unique=True),
+        UniqueConstraint('hospital_id', 'payment_number', name='uq_payments_hospital_number'),
+    )
 
 class Receipt(Base):
     """Payment receipts"""
     __tablename__ = "receipts"
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    receipt_number = Column(String, unique=True, nullable=False)  # REC-2024-00001
+    receipt_number = Column(String, nullable=False)  # REC-2024-00001, unique per hospital
     payment_id = Column(String, nullable=False)
     bill_id = Column(String, nullable=False)
     hospital_id = Column(String, nullable=False)
@@ -100,6 +122,10 @@ class Receipt(Base):
     issued_by = Column(String, nullable=False)
     issued_at = Column(DateTime, server_default=func.now())
     created_at = Column(DateTime, server_default=func.now())
+    
+    __table_args__ = (
+        UniqueConstraint('hospital_id', 'receipt_number', name='uq_receipts_hospital_number'),
+    )
 
 class BillingAudit(Base):
     """Audit trail for billing actions"""
@@ -113,3 +139,18 @@ class BillingAudit(Base):
     action_details = Column(Text, nullable=True)
     amount_involved = Column(Float, nullable=True)
     timestamp = Column(DateTime, server_default=func.now())
+
+class BillingDailyRollup(Base):
+    """Per-day revenue totals for dashboards, maintained alongside charges and payments"""
+    __tablename__ = "billing_daily_rollup"
+    
+    hospital_id = Column(String, primary_key=True)
+    date = Column(Date, primary_key=True)
+    # Charge rows carry a category and payment rows a method; the other is ""
+    category = Column(String, primary_key=True, default="")
+    payment_method = Column(String, primary_key=True, default="")
+    charges_amount = Column(Float, nullable=False, default=0.0)
+    charges_count = Column(Integer, nullable=False, default=0)
+    payments_amount = Column(Float, nullable=False, default=0.0)
+    payments_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
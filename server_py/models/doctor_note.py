@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Text, func
+from sqlalchemy import Column, String, DateTime, Text, func, Index
 from server_py.db.session import Base
 import uuid
 
@@ -15,3 +15,7 @@ class DoctorNote(Base):
     is_private = Column(String, nullable=False, default="0")  # 0 = shared, 1 = private
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, onupdate=func.now())
+    
+    __table_args__ = (
+        Index('idx_doctor_notes_patient_created', 'patient_id', 'created_at'),
+    )
@@ -0,0 +1,12 @@
+from sqlalchemy import Column, String, Integer, DateTime, func
+from server_py.db.session import Base
+
+class DocumentSequence(Base):
+    """Last number issued per hospital, document type and year (BIL-/PAY-/REC- numbering)"""
+    __tablename__ = "document_sequences"
+    
+    hospital_id = Column(String, primary_key=True)
+    document_type = Column(String, primary_key=True)  # bill, payment, receipt
+    year = Column(Integer, primary_key=True)
+    last_value = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
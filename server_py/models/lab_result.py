@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, func
+from sqlalchemy import Column, String, DateTime, func, Index
 from server_py.db.session import Base
 import uuid
 
@@ -22,3 +22,7 @@ class LabResult(Base):
     reviewed_by = Column(String, nullable=True)
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+    
+    __table_args__ = (
+        Index('idx_lab_results_patient_created', 'patient_id', 'created_at'),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, func
+from sqlalchemy import Column, String, DateTime, func, Index
 from server_py.db.session import Base
 import uuid
 
@@ -18,3 +18,7 @@ class Notification(Base):
     action_data = Column(String, nullable=True)
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+    
+    __table_args__ = (
+        Index('idx_notifications_department_created', 'department_id', 'created_at'),
+    )
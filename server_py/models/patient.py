@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, DateTime, func
+from sqlalchemy import Column, String, Integer, DateTime, func, Index
 from server_py.db.session import Base
 import uuid
 
@@ -28,8 +28,14 @@ class Patient(Base):
     fingerprint_data = Column(String, nullable=True)
     registered_by = Column(String, nullable=False)
     last_updated_by = Column(String, nullable=True)
-    assigned_doctor_id = Column(String, nullable=True)  # Doctor assigned to this patient
-    hospital_id = Column(String, nullable=True)  # Hospital the patient belongs to
+    assigned_doctor_id = Column(String, nullable=True, index=True)  # Doctor assigned to this patient
+    hospital_id = Column(String, nullable=True, index=True)  # Hospital the patient belongs to
     department_id = Column(String, nullable=True)  # Department the patient is in
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+    
+    __table_args__ = (
+        # Keyset pagination of patient lists (created_at, id)
+        Index('idx_patients_created', 'created_at', 'id'),
+        Index('idx_patients_doctor_created', 'assigned_doctor_id', 'created_at'),
+    )
@@ -0,0 +1,22 @@
+from sqlalchemy import Column, String, DateTime, Text, Boolean, func, Index
+from server_py.db.session import Base
+import uuid
+
+class PatientEvent(Base):
+    """Append-only, denormalized patient timeline entry written alongside each clinical/billing write"""
+    __tablename__ = "patient_events"
+    
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    patient_id = Column(String, nullable=False)
+    event_type = Column(String, nullable=False)  # appointment, lab_result, doctor_note, file_upload, prescription, billing, payment
+    source_id = Column(String, nullable=False)  # ID of the appointment, bill, etc. this entry describes
+    action = Column(String, nullable=False)  # created, updated, deleted
+    occurred_at = Column(DateTime, nullable=False)  # When the event happened clinically (timeline order)
+    payload = Column(Text, nullable=False)  # JSON: the timeline entry as rendered at write time
+    is_current = Column(Boolean, nullable=False, default=True)  # False once superseded by a later write
+    recorded_at = Column(DateTime, server_default=func.now())
+    
+    __table_args__ = (
+        Index('idx_patient_events_timeline', 'patient_id', 'is_current', 'occurred_at'),
+        Index('idx_patient_events_source', 'event_type', 'source_id'),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Text, func
+from sqlalchemy import Column, String, DateTime, Text, func, Index
 from server_py.db.session import Base
 import uuid
 
@@ -16,3 +16,7 @@ class PatientFile(Base):
     category = Column(String, nullable=True)  # blood_test, xray, mri, ct_scan, ultrasound, etc.
     uploaded_by_role = Column(String, nullable=False)  # doctor, nurse, lab_tech, pharmacist
     created_at = Column(DateTime, server_default=func.now())
+    
+    __table_args__ = (
+        Index('idx_patient_files_patient_created', 'patient_id', 'created_at'),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Text, Integer, func
+from sqlalchemy import Column, String, DateTime, Text, Integer, func, Index
 from server_py.db.session import Base
 import uuid
 
@@ -13,8 +13,13 @@ class Prescription(Base):
     frequency = Column(String, nullable=False)
     duration = Column(String, nullable=False)
     instructions = Column(Text, nullable=True)
-    status = Column(String, nullable=False, default="pending")  # pending, dispensed, completed
+    status = Column(String, nullable=False, default="pending", index=True)  # pending, dispensed, completed
     dispensed_by = Column(String, nullable=True)  # Pharmacist ID
     dispensed_at = Column(DateTime, nullable=True)
     notes = Column(Text, nullable=True)
     created_at = Column(DateTime, server_default=func.now())
+    
+    __table_args__ = (
+        Index('idx_prescriptions_patient_created', 'patient_id', 'created_at'),
+        Index('idx_prescriptions_status_created', 'status', 'created_at'),
+    )
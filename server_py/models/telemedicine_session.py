@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Integer, func, Enum as SQLEnum
+from sqlalchemy import Column, String, DateTime, Integer, func, Index, Enum as SQLEnum
 from server_py.db.session import Base
 import uuid
 import enum
@@ -39,3 +39,7 @@ class TelemedicineSession(Base):
     # Metadata
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+    
+    __table_args__ = (
+        Index('idx_telemedicine_sessions_scheduled', 'scheduled_time', 'id'),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, DateTime, Text, func
+from sqlalchemy import Column, String, Integer, DateTime, Text, func, Index
 from server_py.db.session import Base
 import uuid
 
@@ -29,3 +29,7 @@ class Ticket(Base):
     # Additional fields
     notes = Column(Text, nullable=True)
     resolution = Column(Text, nullable=True)
+    
+    __table_args__ = (
+        Index('idx_tickets_created', 'created_at', 'id'),
+    )
@@ -0,0 +1,158 @@
+"""
+Allergy Index
+Drug -> class -> allergen index built once from server_py/data/drug_classes.json.
+Every known drug maps to the allergens it conflicts with: itself, its class
+and parent classes ("high"), and classes with known cross-reactivity
+("moderate"). Checking a prescription list against a patient's allergies is
+then one dict lookup per (drug, allergen) instead of substring tests between
+every medication and every allergy, and a penicillin allergy catches
+amoxicillin. Free text ("Amoxicillin 500mg", "allergic to sulfa drugs") is
+resolved with TermMatchers; allergens missing from the table still match any
+medication naming them as whole words ("Vancomycin 1g IV").
+"""
+import json
+import os
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from server_py.config import get_settings
+from server_py.services.term_matcher import TermMatcher, normalize_text
+
+DEFAULT_CLASSES_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "drug_classes.json")
+
+# Plural forms still count ("penicillins" -> penicillin)
+TERM_SUFFIXES = ("s", "es")
+
+_ALLERGY_SEPARATORS = re.compile(r"[,;/\n]|\band\b")
+
+def parse_allergies(text: Optional[str]) -> List[str]:
+    """Split a free-text allergy field ("Penicillin, sulfa and latex") into entries"""
+    if not text:
+        return []
+    return [part.strip() for part in _ALLERGY_SEPARATORS.split(text) if part.strip()]
+
+class AllergyIndex:
+    def __init__(self, data: Dict[str, Any]):
+        classes: Dict[str, Dict[str, Any]] = {
+            normalize_text(name): spec for name, spec in data.get("classes", {}).items()
+        }
+        synonyms = {normalize_text(name): normalize_text(drug) for name, drug in data.get("synonyms", {}).items()}
+
+        drug_classes: Dict[str, List[str]] = {}
+        for class_name, spec in classes.items():
+            for drug in spec.get("drugs", []):
+                drug_classes.setdefault(normalize_text(drug), []).append(class_name)
+        for drug in synonyms.values():
+            drug_classes.setdefault(drug, [])
+
+        # drug -> {allergen: (severity, reason or None)}
+        self._conflicts: Dict[str, Dict[str, Tuple[str, Optional[str]]]] = {}
+        for drug, direct_classes in drug_classes.items():
+            conflicts: Dict[str, Tuple[str, Optional[str]]] = {drug: ("high", None)}
+            for class_name in direct_classes:
+                for ancestor in self._lineage(class_name, classes):
+                    conflicts.setdefault(ancestor, ("high", f"{drug} is one of the {ancestor}"))
+                for other in classes[class_name].get("cross_reactive", []):
+                    other = normalize_text(other)
+                    conflicts.setdefault(other, (
+                        "moderate", f"{drug} ({class_name}) may cross-react with {other}"
+                    ))
+            self._conflicts[drug] = conflicts
+
+        # Drug and class names the index can resolve; anything else is matched by text
+        self._allergen_keys = set(drug_classes) | set(classes)
+
+        drug_terms = [(drug, drug) for drug in drug_classes] + list(synonyms.items())
+        self._drug_matcher = TermMatcher(drug_terms, suffixes=TERM_SUFFIXES)
+        self._allergen_matcher = TermMatcher(
+            drug_terms
+            + [(class_name, class_name) for class_name in classes]
+            + [(alias, class_name) for class_name, spec in classes.items() for alias in spec.get("aliases", [])],
+            suffixes=TERM_SUFFIXES
+        )
+
+    @staticmethod
+    def _lineage(class_name: str, classes: Dict[str, Dict[str, Any]]) -> List[str]:
+        lineage = []
+        while class_name and class_name in classes and class_name not in lineage:
+            lineage.append(class_name)
+            class_name = normalize_text(classes[class_name].get("parent") or "")
+        return lineage
+
+    @staticmethod
+    def _resolve(matcher: TermMatcher, text: str) -> List[str]:
+        text = normalize_text(text or "")
+        found: List[str] = []
+        for match in matcher.find(text, normalized=True):
+            if match.value not in found:
+                found.append(match.value)
+        # Unknown names stand for themselves
+        return found or ([text] if text else [])
+
+    def resolve_drugs(self, medication: str) -> List[str]:
+        return self._resolve(self._drug_matcher, medication)
+
+    def allergens(self, allergies: Sequence[str]) -> Dict[str, str]:
+        """Allergen key -> the patient's allergy entry it came from; resolve once per patient"""
+        resolved: Dict[str, str] = {}
+        for allergy in allergies:
+            for allergen in self._resolve(self._allergen_matcher, allergy):
+                resolved.setdefault(allergen, allergy)
+        return resolved
+
+    @staticmethod
+    def _mentions(text: str, phrase: str) -> bool:
+        return re.search(rf"(?<![a-z0-9]){re.escape(phrase)}(?![a-z0-9])", text) is not None
+
+    def _conflict(self, drugs: List[str], medication_text: str, allergen: str) -> Optional[Tuple[str, Optional[str]]]:
+        """Most severe (severity, reason) between resolved drugs and one allergen, or None"""
+        found = None
+        for drug in drugs:
+            conflict = self._conflicts.get(drug, {}).get(allergen)
+            if conflict is not None and (found is None or conflict[0] == "high"):
+                found = conflict
+        if found is None and allergen not in self._allergen_keys:
+            # Allergens the index does not know ("vancomycin", "latex") fall back to
+            # whole-word containment either way, as "Vancomycin 1g IV" or "latex gloves"
+            if self._mentions(medication_text, allergen) or self._mentions(allergen, medication_text):
+                found = ("high", None)
+        return found
+
+    def conflicts_for(self, medication: str, allergens: Dict[str, str]) -> List[Dict[str, Any]]:
+        """Conflicts between one medication and pre-resolved allergens()"""
+        medication_text = normalize_text(medication or "")
+        drugs = self.resolve_drugs(medication)
+        conflicts = []
+        for allergen, allergy in allergens.items():
+            conflict = self._conflict(drugs, medication_text, allergen)
+            if conflict is None:
+                continue
+            severity, reason = conflict
+            warning = f"Patient is allergic to {allergy}, which may conflict with {medication}"
+            conflicts.append({
+                "medication": medication,
+                "allergy": allergy,
+                "severity": severity,
+                "warning": f"{warning} ({reason})" if reason else warning
+            })
+        return conflicts
+
+    def check(self, medications: Sequence[str], allergies: Sequence[str]) -> List[Dict[str, Any]]:
+        """Every medication against every allergy, resolving the allergies once"""
+        allergens = self.allergens(allergies)
+        if not allergens:
+            return []
+        conflicts = []
+        for medication in medications:
+            conflicts.extend(self.conflicts_for(medication, allergens))
+        return conflicts
+
+def load_allergy_index(path: str) -> AllergyIndex:
+    with open(path, encoding="utf-8") as f:
+        return AllergyIndex(json.load(f))
+
+@lru_cache()
+def get_allergy_index() -> AllergyIndex:
+    """The process-wide index, loaded on first use"""
+    return load_allergy_index(get_settings().DRUG_CLASSES_PATH or DEFAULT_CLASSES_PATH)
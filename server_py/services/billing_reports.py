@@ -0,0 +1,79 @@
+"""
+Billing Reports
+Aggregates behind the daily and monthly financial reports. Every figure is a
+SUM/COUNT ... GROUP BY in the database, so a report costs a handful of
+queries regardless of how many payments or bill items fall in the period.
+"""
+from datetime import datetime
+from typing import Dict, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from server_py.models.billing import PatientBill, BillItem, Payment
+
+# Bucket for bill items posted without a department
+UNASSIGNED_DEPARTMENT = "unassigned"
+
+class BillingReportService:
+    def __init__(self, db: Session, hospital_id: str):
+        self.db = db
+        self.hospital_id = hospital_id
+
+    def payments_by_method(self, start: datetime, end: datetime) -> Dict[str, dict]:
+        """{payment_method: {"amount", "count"}} for completed payments in [start, end)"""
+        rows = self.db.query(
+            Payment.payment_method,
+            func.coalesce(func.sum(Payment.amount), 0.0),
+            func.count(Payment.id)
+        ).filter(
+            Payment.hospital_id == self.hospital_id,
+            Payment.payment_date >= start,
+            Payment.payment_date < end,
+            Payment.payment_status == "completed"
+        ).group_by(Payment.payment_method).all()
+        return {method: {"amount": float(amount), "count": count} for method, amount, count in rows}
+
+    def charges_by(self, column, start: datetime, end: datetime, default: Optional[str] = None) -> Dict[str, float]:
+        """Bill item totals in [start, end) grouped by a BillItem column"""
+        rows = self.db.query(
+            column, func.coalesce(func.sum(BillItem.total_price), 0.0)
+        ).select_from(BillItem).join(
+            PatientBill, PatientBill.id == BillItem.bill_id
+        ).filter(
+            PatientBill.hospital_id == self.hospital_id,
+            BillItem.created_at >= start,
+            BillItem.created_at < end
+        ).group_by(column).all()
+        totals: Dict[str, float] = {}
+        for key, amount in rows:
+            key = key if key is not None else default
+            totals[key] = totals.get(key, 0.0) + float(amount)
+        return totals
+
+    def charges_by_category(self, start: datetime, end: datetime) -> Dict[str, float]:
+        return self.charges_by(BillItem.service_category, start, end)
+
+    def charges_by_department(self, start: datetime, end: datetime) -> Dict[str, float]:
+        return self.charges_by(BillItem.department, start, end, default=UNASSIGNED_DEPARTMENT)
+
+    def bills_created(self, start: datetime, end: datetime) -> dict:
+        """Count and discount total of bills opened in [start, end)"""
+        count, discounts = self.db.query(
+            func.count(PatientBill.id),
+            func.coalesce(func.sum(PatientBill.discount_amount), 0.0)
+        ).filter(
+            PatientBill.hospital_id == self.hospital_id,
+            PatientBill.created_at >= start,
+            PatientBill.created_at < end
+        ).one()
+        return {"count": count, "discounts": float(discounts)}
+
+    def outstanding_balance(self) -> float:
+        return float(self.db.query(
+            func.coalesce(func.sum(PatientBill.balance), 0.0)
+        ).filter(
+            PatientBill.hospital_id == self.hospital_id,
+            PatientBill.status == "open",
+            PatientBill.balance > 0
+        ).scalar())
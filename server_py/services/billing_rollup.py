@@ -0,0 +1,157 @@
+"""
+Billing Daily Rollup
+Maintains billing_daily_rollup, one row per hospital, day and service category
+(for charges) or payment method (for payments). Charge and payment endpoints
+apply their deltas after their own transaction commits, in a separate short
+transaction, so the shared per-day rows are never locked for the length of a
+charge or payment; dashboards spanning months or years then read a few
+hundred rollup rows instead of scanning payments and items. A delta lost to a
+crash or error between the two commits is logged, and rebuild_rollup() (see
+rebuild_billing_rollup.py) recomputes any range from the raw tables.
+"""
+import logging
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, delete, func, insert, literal, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from server_py.models.billing import BillingDailyRollup, BillItem, PatientBill, Payment
+
+logger = logging.getLogger(__name__)
+
+GRANULARITIES = ("day", "month", "quarter", "year")
+
+def _bump(db: Session, hospital_id: str, day: date, category: str = "",
+          payment_method: str = "", **increments) -> None:
+    key = and_(
+        BillingDailyRollup.hospital_id == hospital_id,
+        BillingDailyRollup.date == day,
+        BillingDailyRollup.category == category,
+        BillingDailyRollup.payment_method == payment_method
+    )
+    bump = update(BillingDailyRollup).where(key).values(**{
+        name: getattr(BillingDailyRollup, name) + value for name, value in increments.items()
+    })
+    if db.execute(bump).rowcount:
+        return
+    # First entry for this key today
+    try:
+        with db.begin_nested():
+            db.execute(insert(BillingDailyRollup).values(
+                hospital_id=hospital_id, date=day, category=category,
+                payment_method=payment_method, **increments
+            ))
+    except IntegrityError:
+        # Another transaction created the row first
+        db.execute(bump)
+
+def _apply(db: Session, hospital_id: str, day: date, bumps: List[dict]) -> None:
+    """Apply bumps in a short transaction of their own, after the caller's commit"""
+    try:
+        with Session(db.get_bind()) as rollup_db:
+            for bump in bumps:
+                _bump(rollup_db, hospital_id, day, **bump)
+            rollup_db.commit()
+    except Exception:
+        logger.exception("Billing rollup update failed for hospital %s on %s; "
+                         "run rebuild_billing_rollup.py to correct it", hospital_id, day)
+
+def record_charges(db: Session, hospital_id: str, day: date,
+                   charges: Dict[str, Tuple[float, int]]) -> None:
+    """Add {service_category: (amount, item count)} to the day's charge rows; call after commit"""
+    _apply(db, hospital_id, day, [
+        {"category": category, "charges_amount": amount, "charges_count": count}
+        for category, (amount, count) in charges.items()
+    ])
+
+def record_payment(db: Session, hospital_id: str, day: date,
+                   payment_method: str, amount: float) -> None:
+    """Add a payment to the day's row for its method; call after commit"""
+    _apply(db, hospital_id, day, [
+        {"payment_method": payment_method, "payments_amount": amount, "payments_count": 1}
+    ])
+
+def rebuild_rollup(db: Session, hospital_id: Optional[str] = None,
+                   start: Optional[date] = None, end: Optional[date] = None) -> None:
+    """Recompute rollup rows for [start, end] (all history when omitted) from the raw tables"""
+    charge_day = func.date(BillItem.created_at)
+    payment_day = func.date(Payment.payment_date)
+
+    charges = select(
+        PatientBill.hospital_id, charge_day, BillItem.service_category, literal(""),
+        func.sum(BillItem.total_price), func.count(BillItem.id), literal(0.0), literal(0)
+    ).select_from(BillItem).join(
+        PatientBill, PatientBill.id == BillItem.bill_id
+    ).group_by(PatientBill.hospital_id, charge_day, BillItem.service_category)
+
+    payments = select(
+        Payment.hospital_id, payment_day, literal(""), Payment.payment_method,
+        literal(0.0), literal(0), func.sum(Payment.amount), func.count(Payment.id)
+    ).where(
+        Payment.payment_status == "completed"
+    ).group_by(Payment.hospital_id, payment_day, Payment.payment_method)
+
+    stale = delete(BillingDailyRollup)
+    if hospital_id:
+        charges = charges.where(PatientBill.hospital_id == hospital_id)
+        payments = payments.where(Payment.hospital_id == hospital_id)
+        stale = stale.where(BillingDailyRollup.hospital_id == hospital_id)
+    if start:
+        charges = charges.where(BillItem.created_at >= datetime.combine(start, datetime.min.time()))
+        payments = payments.where(Payment.payment_date >= datetime.combine(start, datetime.min.time()))
+        stale = stale.where(BillingDailyRollup.date >= start)
+    if end:
+        until = datetime.combine(end + timedelta(days=1), datetime.min.time())
+        charges = charges.where(BillItem.created_at < until)
+        payments = payments.where(Payment.payment_date < until)
+        stale = stale.where(BillingDailyRollup.date <= end)
+
+    columns = [
+        BillingDailyRollup.hospital_id, BillingDailyRollup.date,
+        BillingDailyRollup.category, BillingDailyRollup.payment_method,
+        BillingDailyRollup.charges_amount, BillingDailyRollup.charges_count,
+        BillingDailyRollup.payments_amount, BillingDailyRollup.payments_count
+    ]
+    db.execute(stale)
+    db.execute(insert(BillingDailyRollup).from_select(columns, charges))
+    db.execute(insert(BillingDailyRollup).from_select(columns, payments))
+    db.commit()
+
+def _period(day: date, granularity: str) -> str:
+    if granularity == "day":
+        return day.isoformat()
+    if granularity == "month":
+        return f"{day.year}-{day.month:02d}"
+    if granularity == "quarter":
+        return f"{day.year}-Q{(day.month - 1) // 3 + 1}"
+    return str(day.year)
+
+def revenue_trend(db: Session, hospital_id: str, start: date, end: date,
+                  granularity: str = "month") -> List[dict]:
+    """Charges and collections per period in [start, end], read from the rollup only"""
+    rows = db.query(
+        BillingDailyRollup.date,
+        func.sum(BillingDailyRollup.charges_amount),
+        func.sum(BillingDailyRollup.payments_amount),
+        func.sum(BillingDailyRollup.payments_count)
+    ).filter(
+        BillingDailyRollup.hospital_id == hospital_id,
+        BillingDailyRollup.date >= start,
+        BillingDailyRollup.date <= end
+    ).group_by(BillingDailyRollup.date).order_by(BillingDailyRollup.date).all()
+
+    periods: "OrderedDict[str, dict]" = OrderedDict()
+    for day, charged, collected, payments_count in rows:
+        period = periods.setdefault(_period(day, granularity), {
+            "period": _period(day, granularity),
+            "totalCharged": 0.0,
+            "totalCollected": 0.0,
+            "paymentsCount": 0
+        })
+        period["totalCharged"] += float(charged or 0)
+        period["totalCollected"] += float(collected or 0)
+        period["paymentsCount"] += int(payments_count or 0)
+    return list(periods.values())
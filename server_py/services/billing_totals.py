@@ -0,0 +1,118 @@
+"""
+Bill Totals
+Keeps the stored subtotal/total/balance on patient bills in step with their
+items. New charges are applied as in-place SQL increments, so posting a charge
+costs the same on a three-line bill as on a three-hundred-line inpatient bill;
+full recalculation is a single SUM() and is only needed when the discount
+changes or reconciliation finds drift.
+"""
+import asyncio
+import logging
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+
+from server_py.db.session import SessionLocal
+from server_py.models.billing import PatientBill, BillItem
+
+logger = logging.getLogger(__name__)
+
+# Stored totals are floats; differences below this are rounding, not drift
+TOLERANCE = 0.005
+
+def add_charge_to_totals(bill: PatientBill, amount: float, db: Session) -> None:
+    """Apply a new charge as SET col = col + amount, safe against concurrent charges"""
+    bill.subtotal = PatientBill.subtotal + amount
+    bill.total_amount = PatientBill.total_amount + amount
+    bill.balance = PatientBill.balance + amount
+    bill.patient_responsibility = PatientBill.patient_responsibility + amount
+    bill.updated_at = datetime.now()
+    # Emit the UPDATE now; the attributes reload with the incremented values on access
+    db.flush()
+
+def apply_payment_to_totals(bill: PatientBill, amount: float, db: Session) -> None:
+    """Apply a payment as SET amount_paid = amount_paid + amount, so concurrent cashiers never lose an update"""
+    bill.amount_paid = PatientBill.amount_paid + amount
+    bill.balance = PatientBill.balance - amount
+    bill.updated_at = datetime.now()
+    db.flush()
+
+def recalculate_bill_totals(bill: PatientBill, db: Session) -> None:
+    """Recompute every total from the bill's items with one aggregate query"""
+    db.flush()
+    bill.subtotal = db.query(
+        func.coalesce(func.sum(BillItem.total_price), 0.0)
+    ).filter(BillItem.bill_id == bill.id).scalar()
+    bill.total_amount = bill.subtotal - bill.discount_amount + bill.tax_amount
+    # amount_paid as the column, so a payment committed meanwhile is not overwritten
+    bill.balance = bill.total_amount - PatientBill.amount_paid
+    bill.patient_responsibility = bill.total_amount - bill.insurance_coverage
+    bill.updated_at = datetime.now()
+    db.flush()
+
+def find_bill_total_mismatches(db: Session, hospital_id: Optional[str] = None) -> List[dict]:
+    """Bills whose stored totals disagree with their items, in one grouped query"""
+    items = db.query(
+        BillItem.bill_id,
+        func.sum(BillItem.total_price).label("items_total")
+    ).group_by(BillItem.bill_id).subquery()
+    items_total = func.coalesce(items.c.items_total, 0.0)
+
+    query = db.query(PatientBill, items_total).outerjoin(
+        items, items.c.bill_id == PatientBill.id
+    ).filter(or_(
+        func.abs(PatientBill.subtotal - items_total) > TOLERANCE,
+        func.abs(PatientBill.total_amount - (PatientBill.subtotal - PatientBill.discount_amount + PatientBill.tax_amount)) > TOLERANCE,
+        func.abs(PatientBill.balance - (PatientBill.total_amount - PatientBill.amount_paid)) > TOLERANCE
+    ))
+    if hospital_id:
+        query = query.filter(PatientBill.hospital_id == hospital_id)
+
+    return [
+        {
+            "bill": bill,
+            "bill_number": bill.bill_number,
+            "hospital_id": bill.hospital_id,
+            "stored_subtotal": bill.subtotal,
+            "items_total": float(total),
+            "stored_total": bill.total_amount,
+            "stored_balance": bill.balance
+        }
+        for bill, total in query.all()
+    ]
+
+def reconcile_bill_totals(db: Session, hospital_id: Optional[str] = None, fix: bool = False) -> List[dict]:
+    """Report (and with fix=True, repair) bills whose totals drifted from their items"""
+    mismatches = find_bill_total_mismatches(db, hospital_id)
+    for mismatch in mismatches:
+        logger.warning(
+            "Bill %s totals drifted: subtotal %.2f vs items %.2f (total %.2f, balance %.2f)",
+            mismatch["bill_number"], mismatch["stored_subtotal"], mismatch["items_total"],
+            mismatch["stored_total"], mismatch["stored_balance"]
+        )
+        if fix:
+            recalculate_bill_totals(mismatch["bill"], db)
+    if fix and mismatches:
+        db.commit()
+    return mismatches
+
+def _reconcile_once(fix: bool) -> int:
+    db = SessionLocal()
+    try:
+        return len(reconcile_bill_totals(db, fix=fix))
+    finally:
+        db.close()
+
+async def run_bill_reconciliation(interval_seconds: int, fix: bool = False) -> None:
+    """Background loop started with the app; checks every bill each interval.
+    Each worker runs its own copy, so only enable it for single-worker deploys"""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            drifted = await asyncio.to_thread(_reconcile_once, fix)
+            if drifted:
+                logger.warning("Bill reconciliation: %d bills drifted%s", drifted, " (fixed)" if fix else "")
+        except Exception:
+            logger.exception("Bill reconciliation failed")
@@ -0,0 +1,92 @@
+"""
+Document Numbers
+Allocates BIL-/PAY-/REC- numbers from the document_sequences table with a
+single UPDATE ... RETURNING per number, committed in a short transaction of
+its own. Concurrent cashiers queue on the counter row only for that one
+statement instead of racing to the same count()+1, and the lock is not held
+for the rest of the payment or bill transaction. Like a database sequence,
+a number taken by a transaction that later rolls back is skipped, not
+reused. SQLite allows a single writer, so there the number is allocated in
+the caller's transaction instead.
+"""
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import and_, func, insert, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from server_py.models.document_sequence import DocumentSequence
+from server_py.models.billing import PatientBill, Payment, Receipt
+
+# document type -> (number prefix, model, number column)
+DOCUMENT_TYPES = {
+    "bill": ("BIL", PatientBill, PatientBill.bill_number),
+    "payment": ("PAY", Payment, Payment.payment_number),
+    "receipt": ("REC", Receipt, Receipt.receipt_number),
+}
+
+def format_document_number(document_type: str, year: int, value: int) -> str:
+    prefix = DOCUMENT_TYPES[document_type][0]
+    return f"{prefix}-{year}-{value:05d}"
+
+def highest_issued_number(db: Session, hospital_id: str, document_type: str, year: int) -> int:
+    """Largest number already issued for this key, from the documents themselves"""
+    prefix, model, number_column = DOCUMENT_TYPES[document_type]
+    pattern = f"{prefix}-{year}-"
+    # Zero-padded, so the longest then greatest string is the highest number
+    latest = db.query(number_column).filter(
+        model.hospital_id == hospital_id,
+        number_column.like(f"{pattern}%")
+    ).order_by(func.length(number_column).desc(), number_column.desc()).first()
+    if not latest:
+        return 0
+    try:
+        return int(latest[0][len(pattern):])
+    except ValueError:
+        return 0
+
+def _allocate(db: Session, hospital_id: str, document_type: str, year: int) -> int:
+    key = and_(
+        DocumentSequence.hospital_id == hospital_id,
+        DocumentSequence.document_type == document_type,
+        DocumentSequence.year == year
+    )
+    increment = (
+        update(DocumentSequence)
+        .where(key)
+        .values(last_value=DocumentSequence.last_value + 1)
+        .returning(DocumentSequence.last_value)
+    )
+
+    value = db.execute(increment).scalar()
+    if value is None:
+        # First number for this key: continue from any documents issued before
+        # the sequence existed
+        value = highest_issued_number(db, hospital_id, document_type, year) + 1
+        try:
+            with db.begin_nested():
+                db.execute(insert(DocumentSequence).values(
+                    hospital_id=hospital_id,
+                    document_type=document_type,
+                    year=year,
+                    last_value=value
+                ))
+        except IntegrityError:
+            # Another transaction created the row first; take the next value from it
+            value = db.execute(increment).scalar()
+    return value
+
+def next_document_number(db: Session, hospital_id: str, document_type: str,
+                         year: Optional[int] = None) -> str:
+    """Allocate the next number for a hospital's bills, payments or receipts"""
+    year = year or datetime.now().year
+    bind = db.get_bind()
+    if bind.dialect.name == "sqlite":
+        # A second connection would wait on the caller's own write lock
+        value = _allocate(db, hospital_id, document_type, year)
+    else:
+        with Session(bind) as counter_db:
+            value = _allocate(counter_db, hospital_id, document_type, year)
+            counter_db.commit()
+    return format_document_number(document_type, year, value)
@@ -0,0 +1,156 @@
+"""
+Drug Interactions
+Symmetric interaction graph loaded once from a local dataset (CSV, or a
+SQLite file with a drug_interactions table). Drug names are interned to
+integer ids and each drug keeps a dict of neighbour id -> edge, so checking a
+medication list is one hash lookup per pair. Free-text names such as
+"Warfarin 5mg tablets" are resolved to known drugs with a TermMatcher.
+"""
+import csv
+import os
+import sqlite3
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from server_py.config import get_settings
+from server_py.services.term_matcher import TermMatcher, normalize_text
+
+DEFAULT_INTERACTIONS_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), "data", "drug_interactions.csv"
+)
+
+# Least to most severe; unknown labels in a dataset count as "moderate"
+SEVERITY_LEVELS = ("minor", "moderate", "major", "contraindicated")
+DEFAULT_SEVERITY = "moderate"
+
+# (drug1, drug2, severity, description)
+InteractionRow = Tuple[str, str, str, str]
+
+def _read_csv(path: str) -> Iterable[InteractionRow]:
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            yield row["drug1"], row["drug2"], row.get("severity") or "", row.get("description") or ""
+
+def _read_sqlite(path: str) -> Iterable[InteractionRow]:
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        yield from conn.execute("SELECT drug1, drug2, severity, description FROM drug_interactions")
+    finally:
+        conn.close()
+
+def read_interactions(path: str) -> Iterable[InteractionRow]:
+    if path.endswith((".db", ".sqlite", ".sqlite3")):
+        return _read_sqlite(path)
+    return _read_csv(path)
+
+class DrugInteractionGraph:
+    def __init__(self, rows: Iterable[InteractionRow] = ()):
+        self._ids: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._adjacency: List[Dict[int, int]] = []
+        # (severity level index, description) per edge
+        self._edges: List[Tuple[int, str]] = []
+        for drug1, drug2, severity, description in rows:
+            self.add(drug1, drug2, severity, description)
+        self._matcher = TermMatcher(((name, drug_id) for drug_id, name in enumerate(self._names)))
+
+    def __len__(self) -> int:
+        return len(self._edges)
+
+    @property
+    def drug_count(self) -> int:
+        return len(self._names)
+
+    def _intern(self, name: str) -> int:
+        drug_id = self._ids.get(name)
+        if drug_id is None:
+            drug_id = len(self._names)
+            self._ids[name] = drug_id
+            self._names.append(name)
+            self._adjacency.append({})
+        return drug_id
+
+    def add(self, drug1: str, drug2: str, severity: str, description: str = "") -> None:
+        """Add an interaction both ways; a repeated pair keeps its most severe entry"""
+        drug1, drug2 = normalize_text(drug1 or ""), normalize_text(drug2 or "")
+        if not drug1 or not drug2 or drug1 == drug2:
+            return
+        severity = (severity or "").strip().lower()
+        level = SEVERITY_LEVELS.index(severity if severity in SEVERITY_LEVELS else DEFAULT_SEVERITY)
+        first, second = self._intern(drug1), self._intern(drug2)
+        edge = self._adjacency[first].get(second)
+        if edge is None:
+            edge = len(self._edges)
+            self._edges.append((level, description))
+            self._adjacency[first][second] = edge
+            self._adjacency[second][first] = edge
+        elif level > self._edges[edge][0]:
+            self._edges[edge] = (level, description)
+
+    def resolve(self, medication: str) -> List[int]:
+        """Known drug ids named in a medication string, e.g. "Warfarin 5mg" -> [warfarin]"""
+        text = normalize_text(medication or "")
+        drug_id = self._ids.get(text)
+        if drug_id is not None:
+            return [drug_id]
+        found: List[int] = []
+        for match in self._matcher.find(text, normalized=True):
+            if match.value not in found:
+                found.append(match.value)
+        return found
+
+    def _interaction(self, first: int, second: int) -> Optional[dict]:
+        edge = self._adjacency[first].get(second)
+        if edge is None:
+            return None
+        level, description = self._edges[edge]
+        drug1, drug2 = self._names[first], self._names[second]
+        return {
+            "drug1": drug1,
+            "drug2": drug2,
+            "severity": SEVERITY_LEVELS[level],
+            "description": description or f"Potential interaction between {drug1} and {drug2}"
+        }
+
+    def _resolve_all(self, medications: Sequence[str]) -> List[int]:
+        ids: List[int] = []
+        for medication in medications:
+            for drug_id in self.resolve(medication):
+                if drug_id not in ids:
+                    ids.append(drug_id)
+        return ids
+
+    @staticmethod
+    def _by_severity(interactions: List[dict]) -> List[dict]:
+        return sorted(interactions, key=lambda i: SEVERITY_LEVELS.index(i["severity"]), reverse=True)
+
+    def check(self, medications: Sequence[str]) -> List[dict]:
+        """Each interacting pair in a medication list once, most severe first"""
+        ids = self._resolve_all(medications)
+        interactions = []
+        for position, first in enumerate(ids):
+            for second in ids[position + 1:]:
+                interaction = self._interaction(first, second)
+                if interaction:
+                    interactions.append(interaction)
+        return self._by_severity(interactions)
+
+    def check_against(self, new_medications: Sequence[str], current_medications: Sequence[str]) -> List[dict]:
+        """Interactions a new prescription introduces: new vs current and among the new drugs"""
+        new_ids = self._resolve_all(new_medications)
+        current_ids = [drug_id for drug_id in self._resolve_all(current_medications) if drug_id not in new_ids]
+        interactions = []
+        for position, first in enumerate(new_ids):
+            for second in new_ids[position + 1:] + current_ids:
+                interaction = self._interaction(first, second)
+                if interaction:
+                    interactions.append(interaction)
+        return self._by_severity(interactions)
+
+def load_interaction_graph(path: str) -> DrugInteractionGraph:
+    return DrugInteractionGraph(read_interactions(path))
+
+@lru_cache()
+def get_interaction_graph() -> DrugInteractionGraph:
+    """The process-wide graph, loaded on first use"""
+    return load_interaction_graph(get_settings().DRUG_INTERACTIONS_PATH or DEFAULT_INTERACTIONS_PATH)
@@ -0,0 +1,54 @@
+"""
+Entity Loader
+Request-scoped, batched identity cache for the User/Patient lookups that
+serializers make per row. List endpoints prime the ids they are about to
+render, and the first lookup resolves all of them with one IN (...) query.
+"""
+from collections import defaultdict
+from typing import Dict, Iterable, Optional, Set
+
+from sqlalchemy.orm import Session
+
+# Keep IN (...) lists well under driver/SQLite bind-parameter limits
+IN_CHUNK_SIZE = 500
+
+class EntityLoader:
+    def __init__(self, db: Session):
+        self.db = db
+        self._cache: Dict[type, Dict[str, object]] = defaultdict(dict)
+        self._pending: Dict[type, Set[str]] = defaultdict(set)
+
+    @classmethod
+    def for_session(cls, db: Session) -> "EntityLoader":
+        """Return the loader bound to this session; get_db opens one session per request"""
+        loader = db.info.get("entity_loader")
+        if loader is None:
+            loader = cls(db)
+            db.info["entity_loader"] = loader
+        return loader
+
+    def prime(self, model: type, ids: Iterable[Optional[str]]) -> None:
+        """Queue ids to be fetched together on the next lookup of this model"""
+        cache = self._cache[model]
+        self._pending[model].update(i for i in ids if i and i not in cache)
+
+    def get(self, model: type, entity_id: Optional[str]):
+        """Return the entity with this id (or None), loading queued ids in one batch"""
+        if not entity_id:
+            return None
+        cache = self._cache[model]
+        if entity_id not in cache:
+            self._pending[model].add(entity_id)
+            self._load(model)
+        return cache.get(entity_id)
+
+    def _load(self, model: type) -> None:
+        pending = list(self._pending.pop(model, ()))
+        cache = self._cache[model]
+        for start in range(0, len(pending), IN_CHUNK_SIZE):
+            chunk = pending[start:start + IN_CHUNK_SIZE]
+            for entity in self.db.query(model).filter(model.id.in_(chunk)):
+                cache[entity.id] = entity
+        # Remember misses too so a dangling id is not re-queried for every row
+        for entity_id in pending:
+            cache.setdefault(entity_id, None)
@@ -2,6 +2,8 @@ import os
 import requests
 from typing import List, Dict
 
+from server_py.services.nlp_service import NLPService
+
 class HealthChatbot:
     def __init__(self):
         self.api_key = os.getenv("OPENAI_API_KEY")
@@ -91,6 +93,7 @@ Be warm, helpful, and always prioritize user safety."""
     def _get_fallback_response(self, message: str) -> str:
         """Provide basic responses when OpenAI API is not available"""
         message_lower = message.lower()
+        symptoms = NLPService.normalize_symptoms(message)
         
         # Health tips responses
         if any(word in message_lower for word in ["tip", "advice", "suggest", "recommend"]):
@@ -105,9 +108,10 @@ Be warm, helpful, and always prioritize user safety."""
 
 Remember to consult with a healthcare professional for personalized advice!"""
         
-        # Symptom-related questions
-        elif any(word in message_lower for word in ["symptom", "pain", "hurt", "sick", "feel"]):
-            return """I understand you're concerned about symptoms. While I can provide general information, it's important to:
+        # Symptom-related questions, including misspelled symptoms ("hedache")
+        elif symptoms or any(word in message_lower for word in ["symptom", "pain", "hurt", "sick", "feel"]):
+            mentioned = f"You mentioned: {', '.join(symptoms)}.\n\n" if symptoms else ""
+            return mentioned + """I understand you're concerned about symptoms. While I can provide general information, it's important to:
 
 1. **Seek Professional Care**: For any persistent or severe symptoms, please consult a healthcare provider
 2. **Emergency Signs**: If you experience chest pain, difficulty breathing, severe bleeding, or loss of consciousness, call emergency services immediately
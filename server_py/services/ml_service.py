@@ -1,6 +1,8 @@
 from typing import Dict, List, Any, Optional
 import json
 
+from server_py.services.allergy_index import get_allergy_index, parse_allergies
+
 class MLHealthService:
     @staticmethod
     def calculate_health_risk_score(patient_data: Dict[str, Any]) -> int:
@@ -141,13 +143,18 @@ class MLHealthService:
     @staticmethod
     def prescribe_drugs(diagnoses: List[Dict[str, Any]], patient_data: Dict[str, Any]) -> List[Dict[str, Any]]:
         prescriptions = []
-        allergies = patient_data.get("allergies", "").lower() if patient_data.get("allergies") else ""
+        allergies = patient_data.get("allergies")
+        allergy_index = get_allergy_index()
+        allergens = allergy_index.allergens(allergies if isinstance(allergies, list) else parse_allergies(allergies))
+        
+        def allowed(drug_name: str) -> bool:
+            return not allergens or not allergy_index.conflicts_for(drug_name, allergens)
         
         for diagnosis in diagnoses:
             condition = diagnosis.get("condition", "").lower()
             
             if "infection" in condition or "fever" in condition:
-                if "paracetamol" not in allergies and "acetaminophen" not in allergies:
+                if allowed("Paracetamol"):
                     prescriptions.append({
                         "drugName": "Paracetamol",
                         "dosage": "500mg",
@@ -159,7 +166,7 @@ class MLHealthService:
                     })
             
             if "headache" in condition:
-                if "ibuprofen" not in allergies:
+                if allowed("Ibuprofen"):
                     prescriptions.append({
                         "drugName": "Ibuprofen",
                         "dosage": "400mg",
@@ -170,7 +177,7 @@ class MLHealthService:
                         "sideEffects": ["Stomach upset", "Dizziness"]
                     })
             
-            if "respiratory" in condition or "cough" in condition:
+            if ("respiratory" in condition or "cough" in condition) and allowed("Dextromethorphan"):
                 prescriptions.append({
                     "drugName": "Dextromethorphan",
                     "dosage": "15mg",
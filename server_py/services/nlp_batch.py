@@ -0,0 +1,186 @@
+"""
+NLP Batch Analysis
+Runs NLPService.analyze_text over large batches of notes on a shared process
+pool. Input is consumed lazily in chunks, at most a few chunks are in flight
+at once, and results come back in input order, so the analysis of a batch of
+any length runs in bounded memory while every core is busy. (The HTTP endpoint
+buffers the request body itself, up to NLP_BATCH_MAX_BODY_BYTES.)
+"""
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Deque, Iterable, Iterator, List, Optional, Tuple
+
+from server_py.config import get_settings
+from server_py.services.nlp_service import NLPService
+
+logger = logging.getLogger(__name__)
+
+BATCH_CHUNK_SIZE = 200
+
+# A record is (index, caller's id or None, text)
+Record = Tuple[int, Any, Any]
+
+@dataclass
+class BatchStats:
+    documents: int = 0
+    failed: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+    finished_at: Optional[float] = None
+
+    @property
+    def seconds(self) -> float:
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+    @property
+    def docs_per_second(self) -> float:
+        return self.documents / self.seconds if self.seconds > 0 else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "documents": self.documents,
+            "failed": self.failed,
+            "seconds": round(self.seconds, 3),
+            "docsPerSecond": round(self.docs_per_second, 1)
+        }
+
+def _analyze_chunk(records: List[Record]) -> List[dict]:
+    """Runs in a worker process"""
+    results = []
+    for index, doc_id, text in records:
+        result = {"index": index}
+        if doc_id is not None:
+            result["id"] = doc_id
+        if not isinstance(text, str) or not text.strip():
+            result["error"] = "Text is required"
+        else:
+            try:
+                result["result"] = NLPService.analyze_text(text)
+            except Exception as e:
+                result["error"] = str(e)
+        results.append(result)
+    return results
+
+def to_record(index: int, item: Any) -> Record:
+    """Accept a bare string or an {"id": ..., "text": ...} object"""
+    if isinstance(item, dict):
+        return index, item.get("id"), item.get("text")
+    return index, None, item
+
+def parse_ndjson_line(index: int, line: str) -> Record:
+    try:
+        return to_record(index, json.loads(line))
+    except ValueError:
+        return index, None, None
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None:
+            settings = get_settings()
+            # Each web worker has its own pool; together they should not oversubscribe the CPUs
+            _pool_workers = settings.NLP_BATCH_WORKERS or max(
+                (os.cpu_count() or 1) // max(settings.WEB_CONCURRENCY, 1), 1
+            )
+            _pool = ProcessPoolExecutor(max_workers=_pool_workers)
+        return _pool
+
+def shutdown_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(cancel_futures=True)
+            _pool = None
+
+def _max_in_flight() -> int:
+    # Enough queued chunks to keep every worker busy, few enough to bound memory
+    return 2 * max(_pool_workers, 1)
+
+def _count(stats: Optional[BatchStats], results: List[dict]) -> None:
+    if stats is not None:
+        stats.documents += len(results)
+        stats.failed += sum(1 for result in results if "error" in result)
+
+def analyze_texts(items: Iterable[Any], chunk_size: int = BATCH_CHUNK_SIZE,
+                  stats: Optional[BatchStats] = None) -> Iterator[dict]:
+    """Analyze strings or {"id", "text"} dicts in parallel, yielding results in input order"""
+    pool = _get_pool()
+    in_flight: Deque[Future] = deque()
+    chunk: List[Record] = []
+    try:
+        for index, item in enumerate(items):
+            chunk.append(to_record(index, item))
+            if len(chunk) >= chunk_size:
+                in_flight.append(pool.submit(_analyze_chunk, chunk))
+                chunk = []
+                while len(in_flight) >= _max_in_flight():
+                    results = in_flight.popleft().result()
+                    _count(stats, results)
+                    yield from results
+        if chunk:
+            in_flight.append(pool.submit(_analyze_chunk, chunk))
+        while in_flight:
+            results = in_flight.popleft().result()
+            _count(stats, results)
+            yield from results
+    finally:
+        for future in in_flight:
+            future.cancel()
+        if stats is not None:
+            stats.finished_at = time.monotonic()
+            logger.info("NLP batch: %d documents in %.1fs (%.1f docs/sec)",
+                        stats.documents, stats.seconds, stats.docs_per_second)
+
+async def analyze_records_async(records: Iterable[Record], chunk_size: int = BATCH_CHUNK_SIZE,
+                                stats: Optional[BatchStats] = None) -> AsyncIterator[dict]:
+    """analyze_texts() for the event loop: awaits chunk results instead of blocking on them"""
+    pool = _get_pool()
+    in_flight: Deque["asyncio.Future"] = deque()
+    chunk: List[Record] = []
+    try:
+        for record in records:
+            chunk.append(record)
+            if len(chunk) >= chunk_size:
+                in_flight.append(asyncio.wrap_future(pool.submit(_analyze_chunk, chunk)))
+                chunk = []
+                while len(in_flight) >= _max_in_flight():
+                    results = await in_flight.popleft()
+                    _count(stats, results)
+                    for result in results:
+                        yield result
+        if chunk:
+            in_flight.append(asyncio.wrap_future(pool.submit(_analyze_chunk, chunk)))
+        while in_flight:
+            results = await in_flight.popleft()
+            _count(stats, results)
+            for result in results:
+                yield result
+    finally:
+        for future in in_flight:
+            future.cancel()
+        if stats is not None:
+            stats.finished_at = time.monotonic()
+            logger.info("NLP batch: %d documents in %.1fs (%.1f docs/sec)",
+                        stats.documents, stats.seconds, stats.docs_per_second)
+
+def iter_ndjson_records(body: bytes) -> Iterator[Record]:
+    """One record per non-blank NDJSON line; lines that are not JSON become failed records"""
+    index = 0
+    for line in body.splitlines():
+        if line.strip():
+            yield parse_ndjson_line(index, line.decode("utf-8", errors="replace"))
+            index += 1
+
+def iter_list_records(items: List[Any]) -> Iterator[Record]:
+    for index, item in enumerate(items):
+        yield to_record(index, item)
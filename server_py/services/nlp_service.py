@@ -1,29 +1,79 @@
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Tuple
+import json
+import logging
+import os
 import re
 
+try:
+    from wordfreq import zipf_frequency
+except ImportError:  # optional; without it only lexicon words are protected from correction
+    zipf_frequency = None
+
+from server_py.config import get_settings
+from server_py.services.allergy_index import get_allergy_index
+from server_py.services.drug_interactions import get_interaction_graph
+from server_py.services.symspell import SymSpell
+from server_py.services.term_matcher import TermMatcher, normalize_text
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LEXICON_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "medical_lexicon.json")
+
+# Lexicon category -> key in extract_entities() output
+ENTITY_CATEGORIES = {
+    "symptoms": "symptoms",
+    "drugs": "drugs",
+    "diseases": "diseases",
+    "body_parts": "bodyParts"
+}
+
+# Plural forms still count ("headaches" -> headache)
+TERM_SUFFIXES = ("s", "es")
+
+def load_lexicon(path: str) -> Dict[str, Any]:
+    """Term lists per category and symptom_mappings (lay phrase -> symptom) from a JSON file"""
+    with open(path, encoding="utf-8") as f:
+        lexicon = json.load(f)
+    for category in ENTITY_CATEGORIES:
+        lexicon.setdefault(category, [])
+    lexicon.setdefault("symptom_mappings", {})
+    return lexicon
+
+LEXICON = load_lexicon(get_settings().MEDICAL_LEXICON_PATH or DEFAULT_LEXICON_PATH)
+
+# Compiled once at import; each text is then scanned in a single pass
+ENTITY_MATCHER = TermMatcher(
+    ((term, category) for category in ENTITY_CATEGORIES for term in LEXICON[category]),
+    suffixes=TERM_SUFFIXES
+)
+SYMPTOM_MATCHER = TermMatcher(
+    [(phrase, symptom) for phrase, symptom in LEXICON["symptom_mappings"].items()]
+    + [(symptom, symptom) for symptom in LEXICON["symptoms"]],
+    suffixes=TERM_SUFFIXES
+)
+
+
+
+def english_frequency(word: str) -> float:
+    """Zipf frequency of a word in general English (0 if unattested or rarer than ~3, ~7 for "the")"""
+    # The small list (~10 MB resident, loaded on first call) leaves out the rare
+    # tail where common misspellings such as "vomitting" are attested
+    return zipf_frequency(word, "en", wordlist="small")
+
+if zipf_frequency is None:
+    logger.warning("wordfreq is not installed; symptom spelling correction may alter ordinary English words")
+
+# Misspelled words in symptom phrases ("hedache", "vomitting") are corrected
+# before matching; other lexicon words and common English words are never "corrected"
+SYMPTOM_SPELLER = SymSpell(
+    (word for phrase in LEXICON["symptoms"] + list(LEXICON["symptom_mappings"]) for word in phrase.split()),
+    known=[word for category in ENTITY_CATEGORIES for term in LEXICON[category] for word in term.split()],
+    suffixes=TERM_SUFFIXES,
+    frequency=english_frequency if zipf_frequency is not None else None
+)
+
 class NLPService:
-    MEDICAL_TERMS = {
-        "symptoms": [
-            "fever", "headache", "cough", "fatigue", "pain", "nausea", "vomiting",
-            "diarrhea", "dizziness", "weakness", "shortness of breath", "chest pain",
-            "sore throat", "runny nose", "body aches", "chills", "sweating",
-            "loss of appetite", "abdominal pain", "back pain", "joint pain"
-        ],
-        "drugs": [
-            "paracetamol", "ibuprofen", "aspirin", "amoxicillin", "metformin",
-            "lisinopril", "atorvastatin", "omeprazole", "amlodipine", "metoprolol",
-            "acetaminophen", "penicillin", "insulin", "prednisone", "azithromycin"
-        ],
-        "diseases": [
-            "diabetes", "hypertension", "asthma", "arthritis", "cancer", "pneumonia",
-            "bronchitis", "influenza", "covid", "malaria", "typhoid", "tuberculosis",
-            "hepatitis", "anemia", "migraine", "epilepsy", "stroke", "heart disease"
-        ],
-        "body_parts": [
-            "head", "chest", "abdomen", "back", "arm", "leg", "throat", "stomach",
-            "heart", "lung", "liver", "kidney", "brain", "eye", "ear", "nose"
-        ]
-    }
+    MEDICAL_TERMS = {category: LEXICON[category] for category in ENTITY_CATEGORIES}
     
     URGENCY_KEYWORDS = {
         "critical": ["emergency", "critical", "severe", "urgent", "immediately", "dying", "unconscious", "not breathing"],
@@ -32,13 +82,6 @@ class NLPService:
         "low": ["mild", "slight", "minor", "occasional"]
     }
     
-    DRUG_INTERACTIONS = {
-        "warfarin": ["aspirin", "ibuprofen", "vitamin k"],
-        "metformin": ["contrast dye", "alcohol"],
-        "lisinopril": ["potassium supplements", "nsaids"],
-        "aspirin": ["warfarin", "ibuprofen", "blood thinners"]
-    }
-    
     @staticmethod
     def analyze_text(text: str) -> Dict[str, Any]:
         entities = NLPService.extract_entities(text)
@@ -64,21 +107,10 @@ class NLPService:
             "allergies": []
         }
         
-        for symptom in NLPService.MEDICAL_TERMS["symptoms"]:
-            if symptom in text_lower:
-                entities["symptoms"].append(symptom)
-        
-        for drug in NLPService.MEDICAL_TERMS["drugs"]:
-            if drug in text_lower:
-                entities["drugs"].append(drug)
-        
-        for disease in NLPService.MEDICAL_TERMS["diseases"]:
-            if disease in text_lower:
-                entities["diseases"].append(disease)
-        
-        for body_part in NLPService.MEDICAL_TERMS["body_parts"]:
-            if body_part in text_lower:
-                entities["bodyParts"].append(body_part)
+        for match in ENTITY_MATCHER.find(text):
+            found = entities[ENTITY_CATEGORIES[match.value]]
+            if match.term not in found:
+                found.append(match.term)
         
         lab_patterns = [
             r'(\d+\.?\d*)\s*(mg/dl|mmol/l|g/dl|%|mm/hr)',
@@ -100,37 +132,24 @@ class NLPService:
         return entities
     
     @staticmethod
-    def normalize_symptoms(text: str) -> List[str]:
-        text_lower = text.lower()
+    def correct_symptom_spelling(text: str) -> Tuple[str, Dict[str, str]]:
+        """Normalized text with symptom words spelled correctly, plus {misspelling: correction}"""
+        return SYMPTOM_SPELLER.correct_text(normalize_text(text))
+    
+    @staticmethod
+    def normalize_symptoms_with_corrections(text: str) -> Tuple[List[str], Dict[str, str]]:
+        """normalize_symptoms() plus the spelling corrections applied on the way"""
+        corrected, corrections = NLPService.correct_symptom_spelling(text)
         normalized = []
+        for match in SYMPTOM_MATCHER.find(corrected, normalized=True):
+            if match.value not in normalized:
+                normalized.append(match.value)
         
-        symptom_mappings = {
-            "temp": "fever",
-            "temperature": "fever",
-            "hot": "fever",
-            "head hurts": "headache",
-            "head ache": "headache",
-            "tired": "fatigue",
-            "exhausted": "fatigue",
-            "throwing up": "vomiting",
-            "throw up": "vomiting",
-            "belly ache": "abdominal pain",
-            "stomach ache": "abdominal pain",
-            "tummy pain": "abdominal pain",
-            "cant breathe": "shortness of breath",
-            "difficulty breathing": "shortness of breath",
-            "hard to breathe": "shortness of breath"
-        }
-        
-        for term, normalized_term in symptom_mappings.items():
-            if term in text_lower and normalized_term not in normalized:
-                normalized.append(normalized_term)
-        
-        for symptom in NLPService.MEDICAL_TERMS["symptoms"]:
-            if symptom in text_lower and symptom not in normalized:
-                normalized.append(symptom)
-        
-        return normalized
+        return normalized, corrections
+    
+    @staticmethod
+    def normalize_symptoms(text: str) -> List[str]:
+        return NLPService.normalize_symptoms_with_corrections(text)[0]
     
     @staticmethod
     def detect_urgency(text: str) -> str:
@@ -152,36 +171,8 @@ class NLPService:
     
     @staticmethod
     def check_drug_interactions(drugs: List[str]) -> List[Dict[str, Any]]:
-        interactions = []
-        drugs_lower = [d.lower() for d in drugs]
-        
-        for drug in drugs_lower:
-            if drug in NLPService.DRUG_INTERACTIONS:
-                for interacting_drug in NLPService.DRUG_INTERACTIONS[drug]:
-                    if interacting_drug in drugs_lower:
-                        interactions.append({
-                            "drug1": drug,
-                            "drug2": interacting_drug,
-                            "severity": "moderate",
-                            "description": f"Potential interaction between {drug} and {interacting_drug}"
-                        })
-        
-        return interactions
+        return get_interaction_graph().check(drugs)
     
     @staticmethod
     def check_allergy_conflicts(medications: List[str], allergies: List[str]) -> List[Dict[str, Any]]:
-        conflicts = []
-        meds_lower = [m.lower() for m in medications]
-        allergies_lower = [a.lower() for a in allergies]
-        
-        for med in meds_lower:
-            for allergy in allergies_lower:
-                if allergy in med or med in allergy:
-                    conflicts.append({
-                        "medication": med,
-                        "allergy": allergy,
-                        "severity": "high",
-                        "warning": f"Patient is allergic to {allergy}, which may conflict with {med}"
-                    })
-        
-        return conflicts
+        return get_allergy_index().check(medications, allergies)
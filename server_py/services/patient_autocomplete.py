@@ -0,0 +1,263 @@
+"""
+Patient Autocomplete
+In-process prefix index over patient first name, last name, MRN and NIN, one
+per hospital, so reception type-ahead is answered from memory. Each hospital's
+index is built from the database on its first lookup in a worker and then kept
+current by StorageService's patient writes. Indexes are rebuilt after
+AUTOCOMPLETE_REBUILD_SECONDS to pick up writes made by other workers, and
+memory is bounded by an LRU over hospitals plus a per-hospital patient cap.
+
+Builds run outside the registry lock, one at a time per hospital, and are
+swapped in under it; lookups keep using the stale index meanwhile, and patient
+writes that land during a build are replayed onto the new index before the swap.
+"""
+import heapq
+import threading
+import time
+import unicodedata
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from server_py.config import get_settings
+from server_py.models.patient import Patient
+
+def normalize(value: Optional[str]) -> str:
+    """Lowercase, strip accents and drop separators: 'MRN-2024/01' -> 'mrn202401'"""
+    if not value:
+        return ""
+    folded = unicodedata.normalize("NFKD", value).encode("ascii", "ignore").decode()
+    return "".join(ch for ch in folded.lower() if ch.isalnum())
+
+def index_keys(patient) -> Set[str]:
+    keys = set()
+    for name in (patient.first_name, patient.last_name):
+        keys.update(normalize(part) for part in (name or "").split())
+    keys.add(normalize(patient.mrn))
+    keys.add(normalize(patient.nin))
+    keys.discard("")
+    return keys
+
+class IndexedPatient(NamedTuple):
+    """The patient fields an index keeps, copied so they outlive the session"""
+    id: str
+    first_name: Optional[str]
+    last_name: Optional[str]
+    mrn: Optional[str]
+    nin: Optional[str]
+    hospital_id: Optional[str]
+
+    @classmethod
+    def of(cls, patient) -> "IndexedPatient":
+        return cls(patient.id, patient.first_name, patient.last_name, patient.mrn, patient.nin, patient.hospital_id)
+
+class PrefixIndex:
+    """Sorted (key, patient_id) array searched with bisect"""
+
+    def __init__(self):
+        self._keys: List[Tuple[str, str]] = []
+        self._patient_keys: Dict[str, Set[str]] = {}
+        self._entries: Dict[str, dict] = {}
+        # Precomputed ((mrn, nin), (last, first, id)) so ranking does no normalization
+        self._rank_keys: Dict[str, tuple] = {}
+        self.built_at = time.monotonic()
+
+    @classmethod
+    def build(cls, patients) -> "PrefixIndex":
+        index = cls()
+        for patient in patients:
+            index._store(patient)
+            index._keys.extend((key, patient.id) for key in index._patient_keys[patient.id])
+        # One sort instead of an insort per key
+        index._keys.sort()
+        return index
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, patient) -> None:
+        self.remove(patient.id)
+        self._store(patient)
+        for key in self._patient_keys[patient.id]:
+            insort(self._keys, (key, patient.id))
+
+    def _store(self, patient) -> None:
+        self._patient_keys[patient.id] = index_keys(patient)
+        self._rank_keys[patient.id] = (
+            (normalize(patient.mrn), normalize(patient.nin)),
+            (normalize(patient.last_name), normalize(patient.first_name), patient.id)
+        )
+        self._entries[patient.id] = {
+            "id": patient.id,
+            "mrn": patient.mrn,
+            "firstName": patient.first_name,
+            "lastName": patient.last_name,
+            "nin": patient.nin
+        }
+
+    def remove(self, patient_id: str) -> None:
+        for key in self._patient_keys.pop(patient_id, ()):
+            position = bisect_left(self._keys, (key, patient_id))
+            if position < len(self._keys) and self._keys[position] == (key, patient_id):
+                del self._keys[position]
+        self._entries.pop(patient_id, None)
+        self._rank_keys.pop(patient_id, None)
+
+    def _prefix_matches(self, prefix: str) -> Set[str]:
+        matches = set()
+        position = bisect_left(self._keys, (prefix, ""))
+        while position < len(self._keys) and self._keys[position][0].startswith(prefix):
+            matches.add(self._keys[position][1])
+            position += 1
+        return matches
+
+    def lookup(self, query: str, limit: int) -> List[dict]:
+        tokens = [token for token in (normalize(part) for part in query.split()) if token]
+        if not tokens:
+            return []
+
+        # Every query token must prefix some key of the patient
+        candidates = self._prefix_matches(tokens[0])
+        for token in tokens[1:]:
+            candidates = {
+                patient_id for patient_id in candidates
+                if any(key.startswith(token) for key in self._patient_keys[patient_id])
+            }
+
+        whole = normalize(query)
+        def rank(patient_id: str):
+            identifiers, name_order = self._rank_keys[patient_id]
+            return (whole not in identifiers, name_order)
+
+        return [self._entries[patient_id] for patient_id in heapq.nsmallest(limit, candidates, key=rank)]
+
+class PatientAutocomplete:
+    """Per-hospital PrefixIndex registry; hospital_id None indexes every patient"""
+
+    def __init__(self):
+        self._indexes: "OrderedDict[Optional[str], PrefixIndex]" = OrderedDict()
+        # Hospitals found over the patient cap, and when, so they are not re-counted per keystroke
+        self._oversized: Dict[Optional[str], float] = {}
+        self._lock = threading.RLock()
+        # One builder per hospital; writes seen while it runs, as ("add", patient) or ("remove", id)
+        self._build_locks: Dict[Optional[str], threading.Lock] = {}
+        self._pending: Dict[Optional[str], List[Tuple[str, object]]] = {}
+
+    def lookup(self, db: Session, query: str, hospital_id: Optional[str] = None,
+               limit: int = 10) -> Optional[List[dict]]:
+        """Return matches, or None when the hospital is too large to index in memory"""
+        with self._lock:
+            index, fresh = self._cached(hospital_id)
+            if fresh:
+                return index.lookup(query, limit) if index is not None else None
+            build_lock = self._build_locks.setdefault(hospital_id, threading.Lock())
+
+        if index is not None:
+            # Answer from the stale index unless this request is the one free to rebuild it
+            if build_lock.acquire(blocking=False):
+                try:
+                    index = self._build(db, hospital_id)
+                finally:
+                    build_lock.release()
+        else:
+            with build_lock:
+                with self._lock:
+                    index, fresh = self._cached(hospital_id)
+                if not fresh:
+                    # Nobody built it while this request waited
+                    index = self._build(db, hospital_id)
+
+        if index is None:
+            return None
+        with self._lock:
+            return index.lookup(query, limit)
+
+    def upsert(self, patient) -> None:
+        """Reflect a created or updated patient in every index that is already built or building"""
+        with self._lock:
+            for hospital_id, index in self._indexes.items():
+                if hospital_id is None or hospital_id == patient.hospital_id:
+                    index.add(patient)
+                else:
+                    # The patient may have moved to another hospital
+                    index.remove(patient.id)
+            if self._pending:
+                snapshot = IndexedPatient.of(patient)
+                for hospital_id, pending in self._pending.items():
+                    if hospital_id is None or hospital_id == snapshot.hospital_id:
+                        pending.append(("add", snapshot))
+                    else:
+                        pending.append(("remove", snapshot.id))
+
+    def remove(self, patient_id: str) -> None:
+        with self._lock:
+            for index in self._indexes.values():
+                index.remove(patient_id)
+            for pending in self._pending.values():
+                pending.append(("remove", patient_id))
+
+    def invalidate(self, hospital_id: Optional[str]) -> None:
+        """Drop the indexes a bulk write to this hospital made stale; they rebuild on next lookup"""
+        with self._lock:
+            for key in (hospital_id, None):
+                self._indexes.pop(key, None)
+                self._oversized.pop(key, None)
+                # A build already under way read the rows before this write; don't install it
+                self._pending.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._indexes.clear()
+            self._oversized.clear()
+            self._pending.clear()
+
+    def _cached(self, hospital_id: Optional[str]) -> Tuple[Optional[PrefixIndex], bool]:
+        """(index or None, whether it is fresh); a fresh None means the hospital is over the cap"""
+        rebuild_seconds = get_settings().AUTOCOMPLETE_REBUILD_SECONDS
+        index = self._indexes.get(hospital_id)
+        if index is not None:
+            self._indexes.move_to_end(hospital_id)
+            return index, time.monotonic() - index.built_at < rebuild_seconds
+        checked_at = self._oversized.get(hospital_id)
+        return None, checked_at is not None and time.monotonic() - checked_at < rebuild_seconds
+
+    def _build(self, db: Session, hospital_id: Optional[str]) -> Optional[PrefixIndex]:
+        """Read and index a hospital's patients without the registry lock, then swap the index in"""
+        settings = get_settings()
+        with self._lock:
+            self._pending[hospital_id] = []
+        try:
+            query = db.query(Patient.id, Patient.first_name, Patient.last_name, Patient.mrn, Patient.nin, Patient.hospital_id)
+            if hospital_id is not None:
+                query = query.filter(Patient.hospital_id == hospital_id)
+            rows = query.limit(settings.AUTOCOMPLETE_MAX_PATIENTS + 1).all()
+            index = PrefixIndex.build(rows) if len(rows) <= settings.AUTOCOMPLETE_MAX_PATIENTS else None
+        except Exception:
+            with self._lock:
+                self._pending.pop(hospital_id, None)
+            raise
+
+        with self._lock:
+            pending = self._pending.pop(hospital_id, None)
+            if index is None:
+                self._indexes.pop(hospital_id, None)
+                self._oversized[hospital_id] = time.monotonic()
+                return None
+            self._oversized.pop(hospital_id, None)
+            if pending is None:
+                # Invalidated mid-build: answer this lookup, let the next one rebuild
+                return index
+            for action, item in pending:
+                if action == "add":
+                    index.add(item)
+                else:
+                    index.remove(item)
+            self._indexes[hospital_id] = index
+            self._indexes.move_to_end(hospital_id)
+            while len(self._indexes) > settings.AUTOCOMPLETE_MAX_HOSPITALS:
+                self._indexes.popitem(last=False)
+            return index
+
+patient_autocomplete = PatientAutocomplete()
@@ -0,0 +1,224 @@
+"""
+Patient Event Store
+Keeps the patient_events table in step with appointments, lab results, notes,
+files, prescriptions, bills and payments so the timeline is a single indexed
+range scan instead of a read across seven tables.
+"""
+from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import Dict, Any, Optional
+import json
+import uuid
+
+from server_py.models.patient_event import PatientEvent
+from server_py.models.appointment import Appointment
+from server_py.models.lab_result import LabResult
+from server_py.models.doctor_note import DoctorNote
+from server_py.models.patient_file import PatientFile
+from server_py.models.prescription import Prescription
+from server_py.models.billing import PatientBill, Payment
+
+# event type -> (model, key in timeline event_counts)
+EVENT_SOURCES = {
+    "appointment": (Appointment, "appointments"),
+    "lab_result": (LabResult, "lab_results"),
+    "doctor_note": (DoctorNote, "doctor_notes"),
+    "file_upload": (PatientFile, "file_uploads"),
+    "prescription": (Prescription, "prescriptions"),
+    "billing": (PatientBill, "billing"),
+    "payment": (Payment, "payments"),
+}
+
+class PatientEventService:
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def record(self, event_type: str, entity, action: str = "updated") -> PatientEvent:
+        """Append the entity's current timeline entry; call before the caller's commit"""
+        if action != "created":
+            self._supersede(event_type, entity.id)
+        else:
+            # Populate server defaults (created_at) used for the entry's date
+            self.db.flush()
+        
+        entry = EVENT_SERIALIZERS[event_type](entity)
+        event = PatientEvent(
+            id=str(uuid.uuid4()),
+            patient_id=entity.patient_id,
+            event_type=event_type,
+            source_id=entity.id,
+            action=action,
+            occurred_at=event_occurred_at(event_type, entity),
+            payload=json.dumps(entry),
+            is_current=True
+        )
+        self.db.add(event)
+        return event
+    
+    def retract(self, event_type: str, entity) -> None:
+        """Record that the entity was deleted so it drops off the timeline"""
+        self._supersede(event_type, entity.id)
+        self.db.add(PatientEvent(
+            id=str(uuid.uuid4()),
+            patient_id=entity.patient_id,
+            event_type=event_type,
+            source_id=entity.id,
+            action="deleted",
+            occurred_at=event_occurred_at(event_type, entity),
+            payload=json.dumps({"id": entity.id, "type": event_type}),
+            is_current=False
+        ))
+    
+    def _supersede(self, event_type: str, source_id: str) -> None:
+        self.db.query(PatientEvent).filter(
+            PatientEvent.event_type == event_type,
+            PatientEvent.source_id == source_id,
+            PatientEvent.is_current == True
+        ).update({"is_current": False}, synchronize_session=False)
+
+def event_occurred_at(event_type: str, entity) -> datetime:
+    """When the event happened, used to order the timeline"""
+    if event_type == "appointment" and entity.appointment_date:
+        try:
+            return datetime.fromisoformat(
+                f"{entity.appointment_date}T{entity.appointment_time}" if entity.appointment_time
+                else entity.appointment_date
+            )
+        except ValueError:
+            pass
+    if event_type == "payment" and entity.payment_date:
+        return entity.payment_date
+    return entity.created_at or datetime.now()
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+def serialize_appointment_event(apt: Appointment) -> Dict[str, Any]:
+    return {
+        "id": apt.id,
+        "type": "appointment",
+        "title": "Appointment",
+        "description": apt.reason or "No reason provided",
+        "date": f"{apt.appointment_date}T{apt.appointment_time}" if apt.appointment_time else apt.appointment_date,
+        "status": apt.status,
+        "doctor_id": apt.doctor_id,
+        "metadata": {
+            "appointment_time": apt.appointment_time,
+            "notes": apt.notes,
+            "status": apt.status
+        }
+    }
+
+def serialize_lab_result_event(lr: LabResult) -> Dict[str, Any]:
+    return {
+        "id": lr.id,
+        "type": "lab_result",
+        "title": f"Lab Test - {lr.test_name}",
+        "description": f"Result: {lr.automated_analysis or lr.status or 'Pending'}",
+        "date": _isoformat(lr.created_at),
+        "status": lr.status,
+        "metadata": {
+            "test_name": lr.test_name,
+            "test_category": lr.test_category,
+            "test_values": lr.test_values,
+            "reference_range": lr.normal_range,
+            "status": lr.status
+        }
+    }
+
+def serialize_doctor_note_event(note: DoctorNote) -> Dict[str, Any]:
+    return {
+        "id": note.id,
+        "type": "doctor_note",
+        "title": f"Clinical Note - {note.note_type or 'General'}",
+        "description": note.content[:100] + "..." if len(note.content) > 100 else note.content,
+        "date": _isoformat(note.created_at),
+        "doctor_id": note.doctor_id,
+        "metadata": {
+            "note_type": note.note_type,
+            "is_private": note.is_private,
+            "full_content": note.content
+        }
+    }
+
+def serialize_file_upload_event(file: PatientFile) -> Dict[str, Any]:
+    return {
+        "id": file.id,
+        "type": "file_upload",
+        "title": f"Medical Record - {file.file_type or 'Document'}",
+        "description": file.description or file.file_name,
+        "date": _isoformat(file.created_at),
+        "uploaded_by": file.uploaded_by,
+        "metadata": {
+            "file_name": file.file_name,
+            "file_type": file.file_type,
+            "file_path": file.file_url,
+            "file_size": file.file_size
+        }
+    }
+
+def serialize_prescription_event(rx: Prescription) -> Dict[str, Any]:
+    return {
+        "id": rx.id,
+        "type": "prescription",
+        "title": f"Prescription - {rx.medication_name}",
+        "description": f"{rx.dosage}, {rx.frequency} for {rx.duration}",
+        "date": _isoformat(rx.created_at),
+        "doctor_id": rx.doctor_id,
+        "status": rx.status,
+        "metadata": {
+            "medication_name": rx.medication_name,
+            "dosage": rx.dosage,
+            "frequency": rx.frequency,
+            "duration": rx.duration,
+            "instructions": rx.instructions,
+            "status": rx.status,
+            "dispensed_by": rx.dispensed_by,
+            "dispensed_date": _isoformat(rx.dispensed_at)
+        }
+    }
+
+def serialize_billing_event(bill: PatientBill) -> Dict[str, Any]:
+    return {
+        "id": bill.id,
+        "type": "billing",
+        "title": f"Bill Generated - ₦{bill.total_amount or 0:,.2f}",
+        "description": f"Status: {bill.status}, Balance: ₦{bill.balance or 0:,.2f}",
+        "date": _isoformat(bill.created_at),
+        "status": bill.status,
+        "metadata": {
+            "bill_number": bill.bill_number,
+            "total_amount": float(bill.total_amount or 0),
+            "paid_amount": float(bill.amount_paid or 0),
+            "balance": float(bill.balance or 0),
+            "status": bill.status,
+            "discount_amount": float(bill.discount_amount) if bill.discount_amount else 0
+        }
+    }
+
+def serialize_payment_event(payment: Payment) -> Dict[str, Any]:
+    return {
+        "id": payment.id,
+        "type": "payment",
+        "title": f"Payment Received - ₦{payment.amount:,.2f}",
+        "description": f"Method: {payment.payment_method}, Ref: {payment.payment_reference}",
+        "date": _isoformat(payment.payment_date or payment.created_at),
+        "status": payment.payment_status,
+        "metadata": {
+            "amount": float(payment.amount),
+            "payment_method": payment.payment_method,
+            "reference_number": payment.payment_reference,
+            "status": payment.payment_status,
+            "processed_by": payment.received_by
+        }
+    }
+
+EVENT_SERIALIZERS = {
+    "appointment": serialize_appointment_event,
+    "lab_result": serialize_lab_result_event,
+    "doctor_note": serialize_doctor_note_event,
+    "file_upload": serialize_file_upload_event,
+    "prescription": serialize_prescription_event,
+    "billing": serialize_billing_event,
+    "payment": serialize_payment_event,
+}
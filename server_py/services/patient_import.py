@@ -0,0 +1,199 @@
+"""
+Patient Import
+Streams legacy patient records from CSV or NDJSON and bulk-inserts them in
+chunked transactions. Rows are validated a chunk at a time, duplicates of an
+existing MRN are rejected with one IN (...) query per chunk, and each chunk is
+written with a single executemany INSERT, so memory stays flat however large
+the file is.
+"""
+import csv
+import json
+import logging
+import uuid
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, Optional, TextIO, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from server_py.models.patient import Patient
+from server_py.services.storage import patient_fields
+from server_py.services.patient_autocomplete import patient_autocomplete
+
+logger = logging.getLogger(__name__)
+
+IMPORT_FORMATS = ("csv", "ndjson")
+IMPORT_CHUNK_SIZE = 1000
+
+# Per-row errors kept in the report; the counts stay exact beyond this
+MAX_REPORTED_ERRORS = 1000
+
+REQUIRED_FIELDS = (
+    "mrn", "first_name", "last_name", "age", "gender", "phone_number",
+    "nin", "blood_group", "genotype", "registered_by"
+)
+INTEGER_FIELDS = ("age", "bp_systolic", "bp_diastolic", "heart_rate")
+
+class ImportRowError(ValueError):
+    pass
+
+@dataclass
+class ImportReport:
+    processed: int = 0
+    imported: int = 0
+    failed: int = 0
+    errors: List[dict] = field(default_factory=list)
+
+    def add_error(self, line: int, mrn: Optional[str], message: str) -> None:
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "mrn": mrn, "error": message})
+
+    def to_dict(self) -> dict:
+        return {
+            "processed": self.processed,
+            "imported": self.imported,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors)
+        }
+
+def detect_format(filename: Optional[str]) -> Optional[str]:
+    name = (filename or "").lower()
+    if name.endswith(".csv"):
+        return "csv"
+    if name.endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    return None
+
+def iter_records(stream: TextIO, fmt: str) -> Iterator[Tuple[int, object]]:
+    """Yield (line number, record) pairs; a record that cannot be parsed is yielded as the exception"""
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+    elif fmt == "ndjson":
+        for line_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield line_number, ImportRowError(f"Invalid JSON: {e}")
+                continue
+            if not isinstance(record, dict):
+                yield line_number, ImportRowError("Expected a JSON object")
+                continue
+            yield line_number, record
+    else:
+        raise ValueError(f"Unsupported import format: {fmt}")
+
+class PatientImportService:
+    def __init__(self, db: Session, hospital_id: Optional[str] = None,
+                 registered_by: Optional[str] = None, chunk_size: int = IMPORT_CHUNK_SIZE):
+        self.db = db
+        self.hospital_id = hospital_id
+        self.registered_by = registered_by
+        self.chunk_size = chunk_size
+
+    def run(self, stream: TextIO, fmt: str,
+            on_progress: Optional[Callable[[ImportReport], None]] = None) -> ImportReport:
+        """Import every record in stream, committing once per chunk"""
+        report = ImportReport()
+        chunk: List[Tuple[int, object]] = []
+        try:
+            for item in iter_records(stream, fmt):
+                chunk.append(item)
+                if len(chunk) >= self.chunk_size:
+                    self._import_chunk(chunk, report)
+                    chunk = []
+                    if on_progress:
+                        on_progress(report)
+            if chunk:
+                self._import_chunk(chunk, report)
+                if on_progress:
+                    on_progress(report)
+        except (UnicodeDecodeError, csv.Error) as e:
+            report.add_error(report.processed + 1, None, f"Unreadable file: {e}")
+        finally:
+            if report.imported:
+                patient_autocomplete.invalidate(self.hospital_id)
+        return report
+
+    def _validate(self, record: dict) -> dict:
+        # CSV cells are strings; treat blanks as missing
+        record = {key: (value.strip() or None) if isinstance(value, str) else value
+                  for key, value in record.items() if key}
+        values = patient_fields(record)
+        if not values["registered_by"]:
+            values["registered_by"] = self.registered_by
+
+        missing = [name for name in REQUIRED_FIELDS if values.get(name) in (None, "")]
+        if missing:
+            raise ImportRowError(f"Missing required fields: {', '.join(missing)}")
+
+        for name in INTEGER_FIELDS:
+            if values.get(name) is not None:
+                try:
+                    values[name] = int(values[name])
+                except (TypeError, ValueError):
+                    raise ImportRowError(f"{name} must be an integer")
+        for name in ("mrn", "nin", "phone_number", "temperature", "weight"):
+            if values.get(name) is not None:
+                values[name] = str(values[name])
+
+        values["id"] = str(uuid.uuid4())
+        values["hospital_id"] = self.hospital_id
+        return values
+
+    def _import_chunk(self, chunk: List[Tuple[int, object]], report: ImportReport) -> None:
+        rows: Dict[str, Tuple[int, dict]] = {}
+        for line, record in chunk:
+            report.processed += 1
+            if isinstance(record, Exception):
+                report.add_error(line, None, str(record))
+                continue
+            mrn = record.get("mrn")
+            try:
+                values = self._validate(record)
+            except ImportRowError as e:
+                report.add_error(line, mrn, str(e))
+                continue
+            if values["mrn"] in rows:
+                report.add_error(line, values["mrn"], "Duplicate MRN in file")
+                continue
+            rows[values["mrn"]] = (line, values)
+
+        if not rows:
+            return
+
+        existing = {
+            mrn for (mrn,) in self.db.query(Patient.mrn).filter(Patient.mrn.in_(list(rows)))
+        }
+        for mrn in existing:
+            line, _ = rows.pop(mrn)
+            report.add_error(line, mrn, "MRN already exists")
+
+        if not rows:
+            return
+
+        try:
+            self.db.execute(insert(Patient), [values for _, values in rows.values()])
+            self.db.commit()
+            report.imported += len(rows)
+        except IntegrityError:
+            # Lost a race with a concurrent registration; retry row by row to
+            # keep the rest of the chunk
+            self.db.rollback()
+            self._import_rows_individually(rows, report)
+
+    def _import_rows_individually(self, rows: Dict[str, Tuple[int, dict]], report: ImportReport) -> None:
+        for mrn, (line, values) in rows.items():
+            try:
+                with self.db.begin_nested():
+                    self.db.execute(insert(Patient), [values])
+                report.imported += 1
+            except IntegrityError as e:
+                report.add_error(line, mrn, f"Rejected by database: {e.orig}")
+        self.db.commit()
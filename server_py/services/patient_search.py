@@ -0,0 +1,165 @@
+"""
+Patient Search
+Relevance-ranked, hospital-scoped patient search for the registration desk.
+PostgreSQL matches through a pg_trgm GIN index over each patient's searchable
+text; SQLite uses an FTS5 table kept in step with patients by triggers. Other
+databases (or a database the backend was never installed on) fall back to a
+bounded ILIKE scan.
+"""
+import logging
+import re
+from typing import Dict, List, Optional
+
+from sqlalchemy import func, literal, literal_column, or_, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from server_py.models.patient import Patient
+
+logger = logging.getLogger(__name__)
+
+# Must stay byte-identical to the indexed expression so PostgreSQL can use it
+SEARCH_DOCUMENT_SQL = "lower(first_name || ' ' || last_name || ' ' || mrn || ' ' || nin)"
+
+POSTGRES_SETUP = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    f"CREATE INDEX IF NOT EXISTS idx_patients_search_trgm ON patients USING gin (({SEARCH_DOCUMENT_SQL}) gin_trgm_ops)",
+]
+
+SQLITE_SETUP = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS patients_fts USING fts5(
+        first_name, last_name, mrn, nin,
+        content='patients', content_rowid='rowid'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS patients_fts_ai AFTER INSERT ON patients BEGIN
+        INSERT INTO patients_fts(rowid, first_name, last_name, mrn, nin)
+        VALUES (new.rowid, new.first_name, new.last_name, new.mrn, new.nin);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS patients_fts_ad AFTER DELETE ON patients BEGIN
+        INSERT INTO patients_fts(patients_fts, rowid, first_name, last_name, mrn, nin)
+        VALUES ('delete', old.rowid, old.first_name, old.last_name, old.mrn, old.nin);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS patients_fts_au AFTER UPDATE OF first_name, last_name, mrn, nin ON patients BEGIN
+        INSERT INTO patients_fts(patients_fts, rowid, first_name, last_name, mrn, nin)
+        VALUES ('delete', old.rowid, old.first_name, old.last_name, old.mrn, old.nin);
+        INSERT INTO patients_fts(rowid, first_name, last_name, mrn, nin)
+        VALUES (new.rowid, new.first_name, new.last_name, new.mrn, new.nin);
+    END""",
+]
+
+# Whether the search backend is installed, per database URL
+_backend_ready: Dict[str, bool] = {}
+
+def install_search_backend(engine: Engine) -> bool:
+    """Create the search index for this database; safe to run on every start"""
+    dialect = engine.dialect.name
+    try:
+        with engine.begin() as conn:
+            if dialect == "postgresql":
+                for statement in POSTGRES_SETUP:
+                    conn.execute(text(statement))
+            elif dialect == "sqlite":
+                for statement in SQLITE_SETUP:
+                    conn.execute(text(statement))
+                # patients has no INTEGER PRIMARY KEY, so VACUUM may renumber the
+                # rowids the FTS table points at; re-index from scratch each time
+                conn.execute(text("INSERT INTO patients_fts(patients_fts) VALUES ('rebuild')"))
+            else:
+                return False
+    except Exception as e:
+        logger.warning("Patient search index unavailable, falling back to ILIKE: %s", e)
+        _backend_ready[str(engine.url)] = False
+        return False
+
+    _backend_ready[str(engine.url)] = True
+    return True
+
+def _backend_installed(db: Session) -> bool:
+    bind = db.get_bind()
+    key = str(bind.engine.url)
+    if key not in _backend_ready:
+        dialect = bind.dialect.name
+        if dialect == "postgresql":
+            probe = "SELECT 1 FROM pg_indexes WHERE indexname = 'idx_patients_search_trgm'"
+        elif dialect == "sqlite":
+            probe = "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'patients_fts'"
+        else:
+            probe = None
+        _backend_ready[key] = probe is not None and db.execute(text(probe)).first() is not None
+    return _backend_ready[key]
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+class PatientSearchService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def search(self, query: str, hospital_id: Optional[str] = None,
+               limit: int = 20, offset: int = 0) -> List[Patient]:
+        """Return patients matching query, best match first; exact MRN/NIN hits rank top"""
+        query = query.strip()
+        if not query:
+            return []
+
+        dialect = self.db.get_bind().dialect.name
+        if _backend_installed(self.db):
+            if dialect == "postgresql":
+                return self._search_trigram(query, hospital_id, limit, offset)
+            if dialect == "sqlite":
+                return self._search_fts(query, hospital_id, limit, offset)
+        return self._search_ilike(query, hospital_id, limit, offset)
+
+    def _exact_identifier(self, query: str):
+        return or_(Patient.mrn == query, Patient.nin == query)
+
+    def _search_trigram(self, query: str, hospital_id: Optional[str], limit: int, offset: int) -> List[Patient]:
+        document = literal_column(SEARCH_DOCUMENT_SQL)
+        term = query.lower()
+        search = self.db.query(Patient).filter(or_(
+            document.like(f"%{_escape_like(term)}%", escape="\\"),
+            # Word similarity tolerates typos in names ("jonh" -> "john")
+            literal(term).op("<%")(document)
+        ))
+        if hospital_id:
+            search = search.filter(Patient.hospital_id == hospital_id)
+        return search.order_by(
+            self._exact_identifier(query).desc(),
+            func.word_similarity(term, document).desc(),
+            Patient.last_name, Patient.first_name, Patient.id
+        ).offset(offset).limit(limit).all()
+
+    def _search_fts(self, query: str, hospital_id: Optional[str], limit: int, offset: int) -> List[Patient]:
+        tokens = re.findall(r"\w+", query.lower())
+        if not tokens:
+            return []
+        # Every token must prefix-match a word in some field
+        match = " ".join(f'"{token}"*' for token in tokens)
+        hospital_filter = "AND patients.hospital_id = :hospital_id" if hospital_id else ""
+        statement = text(f"""
+            SELECT patients.* FROM patients_fts
+            JOIN patients ON patients.rowid = patients_fts.rowid
+            WHERE patients_fts MATCH :match {hospital_filter}
+            ORDER BY (patients.mrn = :query OR patients.nin = :query) DESC,
+                     bm25(patients_fts), patients.last_name, patients.first_name, patients.id
+            LIMIT :limit OFFSET :offset
+        """)
+        params = {"match": match, "query": query, "limit": limit, "offset": offset}
+        if hospital_id:
+            params["hospital_id"] = hospital_id
+        return self.db.query(Patient).from_statement(statement).params(**params).all()
+
+    def _search_ilike(self, query: str, hospital_id: Optional[str], limit: int, offset: int) -> List[Patient]:
+        search_term = f"%{_escape_like(query)}%"
+        search = self.db.query(Patient).filter(or_(
+            Patient.first_name.ilike(search_term, escape="\\"),
+            Patient.last_name.ilike(search_term, escape="\\"),
+            Patient.mrn.ilike(search_term, escape="\\"),
+            Patient.nin.ilike(search_term, escape="\\")
+        ))
+        if hospital_id:
+            search = search.filter(Patient.hospital_id == hospital_id)
+        return search.order_by(
+            self._exact_identifier(query).desc(),
+            Patient.last_name, Patient.first_name, Patient.id
+        ).offset(offset).limit(limit).all()
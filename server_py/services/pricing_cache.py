@@ -0,0 +1,38 @@
+"""
+Pricing Cache
+Per-hospital, in-process copy of the active service pricing catalog. Charge
+posting looks prices up by (category, name) from memory and the catalog
+endpoint answers conditional requests from the cached ETag. The pricing
+endpoints invalidate a hospital's entry on write; the TTL bounds staleness
+for writes made by other worker processes.
+"""
+import hashlib
+import json
+from typing import Dict, List, Optional, Tuple
+
+from server_py.config import get_settings
+from server_py.services.summary_cache import TTLCache
+
+class PricingCatalog:
+    """Serialized active pricing for one hospital, ordered by category and name"""
+
+    def __init__(self, entries: List[dict]):
+        self.entries = entries
+        self._prices: Dict[Tuple[str, str], float] = {}
+        for entry in entries:
+            self._prices.setdefault((entry["serviceCategory"], entry["serviceName"]), entry["basePrice"])
+        digest = hashlib.sha1(json.dumps(entries, sort_keys=True).encode()).hexdigest()
+        self.etag = f'"{digest[:20]}"'
+
+    def price(self, category: str, name: str) -> Optional[float]:
+        return self._prices.get((category, name))
+
+    def by_category(self, category: Optional[str]) -> List[dict]:
+        if not category:
+            return self.entries
+        return [entry for entry in self.entries if entry["serviceCategory"] == category]
+
+pricing_cache = TTLCache(
+    ttl=get_settings().PRICING_CACHE_TTL,
+    max_entries=get_settings().PRICING_CACHE_MAX_HOSPITALS
+)
@@ -0,0 +1,187 @@
+"""
+Receivables Aging
+Outstanding bill balances bucketed by age (0-30/31-60/61-90/90+ days) per
+hospital, payer or patient. Buckets are CASE sums over bills with a balance,
+read through the partial idx_patient_bills_receivable index, so the cost
+follows the number of unpaid bills rather than every bill ever issued. CSV
+exports stream rows with yield_per instead of materialising them.
+"""
+import csv
+import io
+from datetime import datetime, timedelta
+from typing import Iterator, List, Optional
+
+from sqlalchemy import and_, case, func
+from sqlalchemy.orm import Session
+
+from server_py.db.session import SessionLocal
+from server_py.models.billing import PatientBill
+from server_py.models.patient import Patient
+
+# Bills still owed money; cancelled bills are written off
+RECEIVABLE_STATUSES = ("open", "closed")
+
+# (label, oldest age in days or None) in order of age
+AGING_BUCKETS = [("0-30", 30), ("31-60", 60), ("61-90", 90), ("90+", None)]
+
+AGING_GROUPS = ("hospital", "payer", "patient", "bill")
+
+SELF_PAY = "Self-pay"
+
+EXPORT_BATCH_SIZE = 1000
+
+def _start_of_day(value: datetime) -> datetime:
+    return value.replace(hour=0, minute=0, second=0, microsecond=0)
+
+class ReceivablesAging:
+    def __init__(self, db: Session, hospital_id: Optional[str] = None,
+                 as_of: Optional[datetime] = None):
+        self.db = db
+        self.hospital_id = hospital_id
+        self.as_of = _start_of_day(as_of or datetime.now())
+
+    def _receivable_filter(self):
+        conditions = [
+            PatientBill.status.in_(RECEIVABLE_STATUSES),
+            PatientBill.balance > 0,
+            PatientBill.created_at < self.as_of + timedelta(days=1)
+        ]
+        if self.hospital_id:
+            conditions.append(PatientBill.hospital_id == self.hospital_id)
+        return and_(*conditions)
+
+    def _bucket_columns(self) -> list:
+        """One SUM(CASE ...) per bucket, bounded by the bucket's cut-off dates"""
+        columns = []
+        newer_than = None
+        for label, days in AGING_BUCKETS:
+            cutoff = self.as_of - timedelta(days=days) if days is not None else None
+            conditions = []
+            if cutoff is not None:
+                conditions.append(PatientBill.created_at >= cutoff)
+            if newer_than is not None:
+                conditions.append(PatientBill.created_at < newer_than)
+            columns.append(func.coalesce(func.sum(
+                case((and_(*conditions), PatientBill.balance), else_=0.0)
+            ), 0.0).label(label))
+            newer_than = cutoff
+        return columns
+
+    def _group_columns(self, group_by: str) -> list:
+        if group_by == "hospital":
+            return [PatientBill.hospital_id]
+        if group_by == "payer":
+            return [func.coalesce(PatientBill.insurance_company, SELF_PAY).label("payer")]
+        if group_by == "patient":
+            return [PatientBill.patient_id, Patient.mrn, Patient.first_name, Patient.last_name]
+        raise ValueError(f"Unsupported aging group: {group_by}")
+
+    def _grouped_query(self, group_by: str):
+        group_columns = self._group_columns(group_by)
+        total = func.sum(PatientBill.balance)
+        query = self.db.query(
+            *group_columns, *self._bucket_columns(),
+            total.label("total"),
+            func.count(PatientBill.id).label("bills"),
+            func.min(PatientBill.created_at).label("oldest")
+        ).select_from(PatientBill)
+        if group_by == "patient":
+            query = query.outerjoin(Patient, Patient.id == PatientBill.patient_id)
+        return query.filter(self._receivable_filter()).group_by(*group_columns).order_by(total.desc())
+
+    def _serialize_group(self, row, group_by: str) -> dict:
+        if group_by == "hospital":
+            result = {"hospitalId": row.hospital_id}
+        elif group_by == "payer":
+            result = {"payer": row.payer}
+        else:
+            name = " ".join(part for part in (row.first_name, row.last_name) if part)
+            result = {"patientId": row.patient_id, "mrn": row.mrn, "patientName": name or None}
+        result.update({
+            "buckets": {label: float(getattr(row, label)) for label, _ in AGING_BUCKETS},
+            "total": float(row.total),
+            "bills": row.bills,
+            "oldestBillDate": row.oldest.date().isoformat() if row.oldest else None
+        })
+        return result
+
+    def summary(self, group_by: str = "payer", limit: int = 100) -> dict:
+        """Totals per bucket plus the `limit` groups owing the most"""
+        totals = self.db.query(
+            *self._bucket_columns(),
+            func.coalesce(func.sum(PatientBill.balance), 0.0).label("total"),
+            func.count(PatientBill.id).label("bills")
+        ).select_from(PatientBill).filter(self._receivable_filter()).one()
+        rows = self._grouped_query(group_by).limit(limit).all()
+        return {
+            "asOf": self.as_of.date().isoformat(),
+            "groupBy": group_by,
+            "buckets": [label for label, _ in AGING_BUCKETS],
+            "totals": {
+                "buckets": {label: float(getattr(totals, label)) for label, _ in AGING_BUCKETS},
+                "total": float(totals.total),
+                "bills": totals.bills
+            },
+            "rows": [self._serialize_group(row, group_by) for row in rows]
+        }
+
+    def _bucket_for(self, created_at: datetime) -> str:
+        for label, days in AGING_BUCKETS:
+            if days is None or created_at >= self.as_of - timedelta(days=days):
+                return label
+        return AGING_BUCKETS[-1][0]
+
+    def iter_rows(self, group_by: str) -> Iterator[List]:
+        """CSV rows (header first) for the given grouping, or one row per bill"""
+        labels = [label for label, _ in AGING_BUCKETS]
+        if group_by == "bill":
+            yield ["bill_number", "hospital_id", "patient_id", "mrn", "patient_name", "payer",
+                   "bill_date", "age_days", "bucket", "balance"]
+            query = self.db.query(
+                PatientBill.bill_number, PatientBill.hospital_id, PatientBill.patient_id,
+                Patient.mrn, Patient.first_name, Patient.last_name,
+                PatientBill.insurance_company, PatientBill.created_at, PatientBill.balance
+            ).outerjoin(
+                Patient, Patient.id == PatientBill.patient_id
+            ).filter(self._receivable_filter()).order_by(PatientBill.created_at)
+            for row in query.yield_per(EXPORT_BATCH_SIZE):
+                name = " ".join(part for part in (row.first_name, row.last_name) if part)
+                yield [
+                    row.bill_number, row.hospital_id, row.patient_id, row.mrn, name,
+                    row.insurance_company or SELF_PAY, row.created_at.date().isoformat(),
+                    (self.as_of - _start_of_day(row.created_at)).days,
+                    self._bucket_for(row.created_at), f"{row.balance:.2f}"
+                ]
+            return
+
+        if group_by == "hospital":
+            yield ["hospital_id", *labels, "total", "bills", "oldest_bill_date"]
+        elif group_by == "payer":
+            yield ["payer", *labels, "total", "bills", "oldest_bill_date"]
+        else:
+            yield ["patient_id", "mrn", "patient_name", *labels, "total", "bills", "oldest_bill_date"]
+        for row in self._grouped_query(group_by).yield_per(EXPORT_BATCH_SIZE):
+            group = self._serialize_group(row, group_by)
+            keys = [value for key, value in group.items()
+                    if key not in ("buckets", "total", "bills", "oldestBillDate")]
+            yield [
+                *keys, *(f"{group['buckets'][label]:.2f}" for label in labels),
+                f"{group['total']:.2f}", group["bills"], group["oldestBillDate"]
+            ]
+
+def stream_aging_csv(hospital_id: Optional[str], as_of: Optional[datetime], group_by: str) -> Iterator[str]:
+    """CSV text chunks for StreamingResponse; owns its session since it outlives the request handler"""
+    db = SessionLocal()
+    try:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        aging = ReceivablesAging(db, hospital_id, as_of)
+        for count, row in enumerate(aging.iter_rows(group_by), start=1):
+            writer.writerow(row)
+            if count % EXPORT_BATCH_SIZE == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+    finally:
+        db.close()
@@ -1,6 +1,6 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
-from typing import Optional, List
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional, List
 import uuid
 
 from server_py.models.user import User
@@ -10,11 +10,91 @@ from server_py.models.lab_result import LabResult
 from server_py.models.subscription import Subscription
 from server_py.models.department import Department
 from server_py.models.notification import Notification
+from server_py.services.patient_events import PatientEventService
+from server_py.services.patient_search import PatientSearchService
+from server_py.services.patient_autocomplete import patient_autocomplete
+
+def patient_fields(patient_data: dict) -> dict:
+    """Map an API/import payload (snake_case or camelCase keys) to Patient columns"""
+    return dict(
+        mrn=patient_data.get("mrn"),
+        first_name=patient_data.get("first_name") or patient_data.get("firstName"),
+        last_name=patient_data.get("last_name") or patient_data.get("lastName"),
+        age=patient_data.get("age"),
+        gender=patient_data.get("gender"),
+        phone_number=patient_data.get("phone_number") or patient_data.get("phoneNumber"),
+        email=patient_data.get("email"),
+        address=patient_data.get("address"),
+        nin=patient_data.get("nin"),
+        blood_group=patient_data.get("blood_group") or patient_data.get("bloodGroup"),
+        genotype=patient_data.get("genotype"),
+        allergies=patient_data.get("allergies"),
+        symptoms=patient_data.get("symptoms"),
+        bp_systolic=patient_data.get("bp_systolic") or patient_data.get("bloodPressureSystolic"),
+        bp_diastolic=patient_data.get("bp_diastolic") or patient_data.get("bloodPressureDiastolic"),
+        temperature=patient_data.get("temperature"),
+        heart_rate=patient_data.get("heart_rate") or patient_data.get("heartRate"),
+        weight=patient_data.get("weight"),
+        facial_recognition_data=patient_data.get("facial_recognition_data") or patient_data.get("facialRecognitionData"),
+        fingerprint_data=patient_data.get("fingerprint_data") or patient_data.get("fingerprintData"),
+        registered_by=patient_data.get("registered_by") or patient_data.get("registeredBy")
+    )
 
 class StorageService:
     def __init__(self, db: Session):
         self.db = db
     
+    # Unit of work
+    @contextmanager
+    def batch(self) -> Iterator["StorageService"]:
+        """
+        Defer commits until the block exits so several writes share one transaction:
+        
+            with storage.batch():
+                appointment = storage.create_appointment(...)
+                storage.create_notification(...)
+        
+        Writes inside the block are flushed rather than committed and refreshed;
+        nested blocks join the outermost one. Any exception rolls everything back.
+        The batch state lives on the session, so every StorageService sharing it joins.
+        """
+        info = self.db.info
+        outermost = not info.get("storage_batch_depth")
+        if outermost:
+            info["storage_after_commit"] = []
+        info["storage_batch_depth"] = info.get("storage_batch_depth", 0) + 1
+        try:
+            yield self
+            if outermost:
+                self.db.commit()
+                for callback in info["storage_after_commit"]:
+                    callback()
+        except Exception:
+            if outermost:
+                self.db.rollback()
+            raise
+        finally:
+            info["storage_batch_depth"] -= 1
+            if outermost:
+                info.pop("storage_after_commit", None)
+    
+    def _commit(self, *instances) -> None:
+        """Commit and refresh now, or only flush when inside batch()"""
+        if self.db.info.get("storage_batch_depth"):
+            # Assigns keys and surfaces constraint errors at the write that caused them
+            self.db.flush()
+            return
+        self.db.commit()
+        for instance in instances:
+            self.db.refresh(instance)
+    
+    def _after_commit(self, callback: Callable[[], None]) -> None:
+        """Run an in-process side effect once the data it reflects is committed"""
+        if self.db.info.get("storage_batch_depth"):
+            self.db.info["storage_after_commit"].append(callback)
+        else:
+            callback()
+    
     # User operations
     def get_user(self, user_id: str) -> Optional[User]:
         return self.db.query(User).filter(User.id == user_id).first()
@@ -44,8 +124,7 @@ class StorageService:
             is_active=user_data.get("is_active", 1)
         )
         self.db.add(user)
-        self.db.commit()
-        self.db.refresh(user)
+        self._commit(user)
         return user
     
     def get_all_users(self) -> List[User]:
@@ -57,8 +136,7 @@ class StorageService:
             for key, value in updates.items():
                 if hasattr(user, key) and value is not None:
                     setattr(user, key, value)
-            self.db.commit()
-            self.db.refresh(user)
+            self._commit(user)
         return user
     
     # Patient operations
@@ -78,45 +156,15 @@ class StorageService:
     # def get_patient_by_facial(self, facial_data: str) -> Optional[Patient]:
     #     return self.db.query(Patient).filter(Patient.facial_recognition_data == facial_data).first()
     
-    def search_patients(self, query: str) -> List[Patient]:
-        search_term = f"%{query}%"
-        return self.db.query(Patient).filter(
-            or_(
-                Patient.first_name.ilike(search_term),
-                Patient.last_name.ilike(search_term),
-                Patient.mrn.ilike(search_term),
-                Patient.nin.ilike(search_term)
-            )
-        ).all()
+    def search_patients(self, query: str, hospital_id: Optional[str] = None,
+                        limit: int = 20, offset: int = 0) -> List[Patient]:
+        return PatientSearchService(self.db).search(query, hospital_id, limit, offset)
     
     def create_patient(self, patient_data: dict) -> Patient:
-        patient = Patient(
-            id=str(uuid.uuid4()),
-            mrn=patient_data.get("mrn"),
-            first_name=patient_data.get("first_name") or patient_data.get("firstName"),
-            last_name=patient_data.get("last_name") or patient_data.get("lastName"),
-            age=patient_data.get("age"),
-            gender=patient_data.get("gender"),
-            phone_number=patient_data.get("phone_number") or patient_data.get("phoneNumber"),
-            email=patient_data.get("email"),
-            address=patient_data.get("address"),
-            nin=patient_data.get("nin"),
-            blood_group=patient_data.get("blood_group") or patient_data.get("bloodGroup"),
-            genotype=patient_data.get("genotype"),
-            allergies=patient_data.get("allergies"),
-            symptoms=patient_data.get("symptoms"),
-            bp_systolic=patient_data.get("bp_systolic") or patient_data.get("bloodPressureSystolic"),
-            bp_diastolic=patient_data.get("bp_diastolic") or patient_data.get("bloodPressureDiastolic"),
-            temperature=patient_data.get("temperature"),
-            heart_rate=patient_data.get("heart_rate") or patient_data.get("heartRate"),
-            weight=patient_data.get("weight"),
-            facial_recognition_data=patient_data.get("facial_recognition_data") or patient_data.get("facialRecognitionData"),
-            fingerprint_data=patient_data.get("fingerprint_data") or patient_data.get("fingerprintData"),
-            registered_by=patient_data.get("registered_by") or patient_data.get("registeredBy")
-        )
+        patient = Patient(id=str(uuid.uuid4()), **patient_fields(patient_data))
         self.db.add(patient)
-        self.db.commit()
-        self.db.refresh(patient)
+        self._commit(patient)
+        self._after_commit(lambda: patient_autocomplete.upsert(patient))
         return patient
     
     def get_all_patients(self) -> List[Patient]:
@@ -128,15 +176,16 @@ class StorageService:
             for key, value in updates.items():
                 if hasattr(patient, key) and value is not None:
                     setattr(patient, key, value)
-            self.db.commit()
-            self.db.refresh(patient)
+            self._commit(patient)
+            self._after_commit(lambda: patient_autocomplete.upsert(patient))
         return patient
     
     def delete_patient(self, patient_id: str) -> bool:
         patient = self.get_patient(patient_id)
         if patient:
             self.db.delete(patient)
-            self.db.commit()
+            self._commit()
+            self._after_commit(lambda: patient_autocomplete.remove(patient_id))
             return True
         return False
     
@@ -154,8 +203,8 @@ class StorageService:
             created_by=appointment_data.get("created_by") or appointment_data.get("createdBy")
         )
         self.db.add(appointment)
-        self.db.commit()
-        self.db.refresh(appointment)
+        PatientEventService(self.db).record("appointment", appointment, "created")
+        self._commit(appointment)
         return appointment
     
     def get_appointment(self, appointment_id: str) -> Optional[Appointment]:
@@ -176,15 +225,16 @@ class StorageService:
             for key, value in updates.items():
                 if hasattr(appointment, key) and value is not None:
                     setattr(appointment, key, value)
-            self.db.commit()
-            self.db.refresh(appointment)
+            PatientEventService(self.db).record("appointment", appointment)
+            self._commit(appointment)
         return appointment
     
     def delete_appointment(self, appointment_id: str) -> bool:
         appointment = self.get_appointment(appointment_id)
         if appointment:
+            PatientEventService(self.db).retract("appointment", appointment)
             self.db.delete(appointment)
-            self.db.commit()
+            self._commit()
             return True
         return False
     
@@ -204,8 +254,8 @@ class StorageService:
             uploaded_by=lab_result_data.get("uploaded_by") or lab_result_data.get("uploadedBy")
         )
         self.db.add(lab_result)
-        self.db.commit()
-        self.db.refresh(lab_result)
+        PatientEventService(self.db).record("lab_result", lab_result, "created")
+        self._commit(lab_result)
         return lab_result
     
     def get_lab_result(self, lab_result_id: str) -> Optional[LabResult]:
@@ -220,15 +270,16 @@ class StorageService:
             for key, value in updates.items():
                 if hasattr(lab_result, key) and value is not None:
                     setattr(lab_result, key, value)
-            self.db.commit()
-            self.db.refresh(lab_result)
+            PatientEventService(self.db).record("lab_result", lab_result)
+            self._commit(lab_result)
         return lab_result
     
     def delete_lab_result(self, lab_result_id: str) -> bool:
         lab_result = self.get_lab_result(lab_result_id)
         if lab_result:
+            PatientEventService(self.db).retract("lab_result", lab_result)
             self.db.delete(lab_result)
-            self.db.commit()
+            self._commit()
             return True
         return False
     
@@ -243,8 +294,7 @@ class StorageService:
             status=department_data.get("status", "active")
         )
         self.db.add(department)
-        self.db.commit()
-        self.db.refresh(department)
+        self._commit(department)
         return department
     
     def get_department(self, department_id: str) -> Optional[Department]:
@@ -262,8 +312,7 @@ class StorageService:
             for key, value in updates.items():
                 if hasattr(department, key) and value is not None:
                     setattr(department, key, value)
-            self.db.commit()
-            self.db.refresh(department)
+            self._commit(department)
         return department
     
     # Subscription operations
@@ -276,8 +325,7 @@ class StorageService:
             status=subscription_data.get("status", "trial")
         )
         self.db.add(subscription)
-        self.db.commit()
-        self.db.refresh(subscription)
+        self._commit(subscription)
         return subscription
     
     def get_subscription_by_admin_id(self, admin_user_id: str) -> Optional[Subscription]:
@@ -289,8 +337,7 @@ class StorageService:
             for key, value in updates.items():
                 if hasattr(subscription, key) and value is not None:
                     setattr(subscription, key, value)
-            self.db.commit()
-            self.db.refresh(subscription)
+            self._commit(subscription)
         return subscription
     
     # Notification operations
@@ -309,8 +356,7 @@ class StorageService:
             action_data=notification_data.get("action_data") or notification_data.get("actionData")
         )
         self.db.add(notification)
-        self.db.commit()
-        self.db.refresh(notification)
+        self._commit(notification)
         return notification
     
     def get_notification(self, notification_id: str) -> Optional[Notification]:
@@ -325,6 +371,5 @@ class StorageService:
             for key, value in updates.items():
                 if hasattr(notification, key) and value is not None:
                     setattr(notification, key, value)
-            self.db.commit()
-            self.db.refresh(notification)
+            self._commit(notification)
         return notification
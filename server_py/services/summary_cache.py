@@ -0,0 +1,91 @@
+"""
+Visit Summary Cache
+Short-lived, per-patient cache for the visit summary shown on every chart open.
+Entries are dropped as soon as a session commits a change to any table the
+summary reads for that patient; the TTL bounds staleness for writes made by
+other worker processes.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from server_py.config import get_settings
+from server_py.models.patient import Patient
+from server_py.models.appointment import Appointment
+from server_py.models.lab_result import LabResult
+from server_py.models.doctor_note import DoctorNote
+from server_py.models.patient_file import PatientFile
+from server_py.models.prescription import Prescription
+from server_py.models.billing import PatientBill, Payment
+
+class TTLCache:
+    """Thread-safe key/value cache whose entries expire after ttl seconds; with
+    max_entries set, the least recently used entry is evicted when full"""
+
+    def __init__(self, ttl: float, max_entries: Optional[int] = None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            if self.max_entries is not None:
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+visit_summary_cache = TTLCache(ttl=get_settings().VISIT_SUMMARY_CACHE_TTL)
+
+# Tables the visit summary aggregates, all keyed to the patient by patient_id
+SUMMARY_SOURCE_MODELS = (Appointment, LabResult, DoctorNote, PatientFile, Prescription, PatientBill, Payment)
+
+def _changed_patient_ids(session: Session):
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Patient):
+            yield obj.id
+        elif isinstance(obj, SUMMARY_SOURCE_MODELS):
+            yield obj.patient_id
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_patients(session, flush_context):
+    changed = session.info.setdefault("visit_summary_changed", set())
+    changed.update(pid for pid in _changed_patient_ids(session) if pid)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_patients(session):
+    # Invalidate only once the change is visible, so a concurrent read cannot
+    # re-cache the pre-commit summary
+    for patient_id in session.info.pop("visit_summary_changed", ()):
+        visit_summary_cache.invalidate(patient_id)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_patients(session):
+    session.info.pop("visit_summary_changed", None)
@@ -0,0 +1,130 @@
+"""
+SymSpell
+Spelling correction against a fixed vocabulary using a precomputed deletion
+index (Symmetric Delete): every vocabulary word is stored under each string
+obtainable by deleting up to max_distance characters. A misspelling is
+looked up by generating its own deletes, so only the handful of words
+sharing a delete are ever compared, however large the vocabulary.
+"""
+import re
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+def _deletes(word: str, max_distance: int) -> Set[str]:
+    """Every string reachable from `word` by up to max_distance deletions, including itself"""
+    found = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier if len(w) > 1 for i in range(len(w))} - found
+        found |= frontier
+    return found
+
+def edit_distance(a: str, b: str, max_distance: int) -> Optional[int]:
+    """Optimal string alignment distance (adjacent transpositions count once), or None if above max_distance"""
+    if abs(len(a) - len(b)) > max_distance:
+        return None
+    previous_previous: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+        if min(current) > max_distance:
+            return None
+        previous_previous, previous = previous, current
+    return previous[-1] if previous[-1] <= max_distance else None
+
+class SymSpell:
+    """
+    Corrects words to the closest vocabulary word. Words shorter than
+    min_length are left alone, as are known words: the vocabulary, `known`,
+    and, given a `frequency` function (Zipf scale, e.g. wordfreq), any word at
+    least known_frequency common in general English ("never", "kelly",
+    "chill"). Words up to eight letters allow one edit, longer words
+    max_distance. A correction must keep the word's first letter, and a word
+    that is attested in English at all must be frequency_margin rarer than
+    its correction: "hever" and "burts" are likelier a name than a misspelt
+    "fever" or "hurts".
+    """
+
+    def __init__(self, vocabulary: Iterable[str], max_distance: int = 2, min_length: int = 5,
+                 known: Iterable[str] = (), suffixes: Sequence[str] = (),
+                 frequency: Optional[Callable[[str], float]] = None, known_frequency: float = 2.5,
+                 frequency_margin: float = 1.5, cache_size: int = 50000):
+        self.max_distance = max_distance
+        self.min_length = min_length
+        self.suffixes = tuple(suffixes)
+        self.frequency = frequency
+        self.known_frequency = known_frequency
+        self.frequency_margin = frequency_margin
+        self._words = re.compile(rf"\b[a-z]{{{min_length},}}\b")
+        # Earlier vocabulary words win ties
+        self._rank: Dict[str, int] = {}
+        self._index: Dict[str, List[str]] = {}
+        for word in vocabulary:
+            word = word.lower()
+            if word in self._rank or len(word) < min_length:
+                continue
+            self._rank[word] = len(self._rank)
+            for deleted in _deletes(word, max_distance):
+                self._index.setdefault(deleted, []).append(word)
+        self.known = {word.lower() for word in known} | set(self._rank)
+        self.lookup = lru_cache(maxsize=cache_size)(self._lookup)
+
+    def __len__(self) -> int:
+        return len(self._rank)
+
+    def _frequency(self, word: str) -> float:
+        return self.frequency(word) if self.frequency is not None else 0.0
+
+    def is_known(self, word: str) -> bool:
+        """In the known set as written or once a suffix is dropped ("headaches"), or common English"""
+        if word in self.known:
+            return True
+        if any(word.endswith(suffix) and word[:-len(suffix)] in self.known for suffix in self.suffixes):
+            return True
+        return self._frequency(word) >= self.known_frequency
+
+    def allowed_distance(self, word: str) -> int:
+        return 1 if len(word) <= 8 else self.max_distance
+
+    def _lookup(self, word: str) -> Optional[Tuple[str, int]]:
+        """(closest vocabulary word, distance) for a word outside the known set, or None"""
+        if len(word) < self.min_length or self.is_known(word):
+            return None
+        max_distance = self.allowed_distance(word)
+        word_frequency = self._frequency(word)
+        best: Optional[Tuple[str, int]] = None
+        seen: Set[str] = set()
+        for deleted in _deletes(word, max_distance):
+            for candidate in self._index.get(deleted, ()):
+                if candidate in seen:
+                    continue
+                seen.add(candidate)
+                if candidate[0] != word[0]:
+                    continue
+                if word_frequency > 0 and self._frequency(candidate) - word_frequency < self.frequency_margin:
+                    continue
+                distance = edit_distance(word, candidate, max_distance)
+                if distance is None:
+                    continue
+                if best is None or (distance, self._rank[candidate]) < (best[1], self._rank[best[0]]):
+                    best = (candidate, distance)
+        return best
+
+    def correct_text(self, text: str) -> Tuple[str, Dict[str, str]]:
+        """Lowercase text with misspelled words replaced, plus {misspelling: correction}"""
+        text = text.lower()
+        corrections: Dict[str, str] = {}
+        for word in set(self._words.findall(text)):
+            if word in self.known:
+                continue
+            found = self.lookup(word)
+            if found is not None:
+                corrections[word] = found[0]
+        if not corrections:
+            return text, corrections
+        return self._words.sub(lambda match: corrections.get(match.group(0), match.group(0)), text), corrections
@@ -0,0 +1,109 @@
+"""
+Term Matcher
+Aho-Corasick automaton for finding every occurrence of a large set of terms
+in one left-to-right pass over the text, independent of the number of terms.
+Matches must start and end on word boundaries, so "ear" does not hit inside
+"heart"; optional suffixes let "headaches" still match "headache".
+"""
+import re
+from collections import deque
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+_WHITESPACE = re.compile(r"\s+")
+_APOSTROPHES = re.compile(r"['’]")
+
+def normalize_text(text: str) -> str:
+    """Lowercase, drop apostrophes ("can't" -> "cant") and collapse whitespace"""
+    return _WHITESPACE.sub(" ", _APOSTROPHES.sub("", text.lower())).strip()
+
+class TermMatch(NamedTuple):
+    start: int
+    end: int
+    term: str
+    value: Any
+
+class TermMatcher:
+    """Compiled multi-pattern matcher; build once, then call find() from any thread"""
+
+    def __init__(self, terms: Iterable[Tuple[str, Any]] = (), suffixes: Sequence[str] = ()):
+        self.suffixes = tuple(suffixes)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # Terms ending exactly at each state, as (length, term, value)
+        self._terms: List[List[Tuple[int, str, Any]]] = [[]]
+        # The same plus every term ending at a suffix of the state, filled by build()
+        self._outputs: List[List[Tuple[int, str, Any]]] = [[]]
+        self._size = 0
+        for term, value in terms:
+            self.add(term, value)
+        self.build()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, term: str, value: Any) -> None:
+        """Add a term; call build() before the next find()"""
+        term = normalize_text(term)
+        if not term:
+            return
+        state = 0
+        for ch in term:
+            next_state = self._goto[state].get(ch)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][ch] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._terms.append([])
+            state = next_state
+        entry = (len(term), term, value)
+        if entry not in self._terms[state]:
+            self._terms[state].append(entry)
+            self._size += 1
+
+    def build(self) -> None:
+        """Compute failure links breadth-first and merge suffix outputs into each state"""
+        outputs = [list(terms) for terms in self._terms]
+        queue = deque(self._goto[0].values())
+        for state in queue:
+            self._fail[state] = 0
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(ch, 0)
+                outputs[next_state].extend(outputs[self._fail[next_state]])
+        self._outputs = outputs
+
+    def _word_end(self, text: str, end: int) -> Optional[int]:
+        """End of the word if a match ending at `end` finishes one (allowing a suffix), else None"""
+        if end == len(text) or not text[end].isalnum():
+            return end
+        for suffix in self.suffixes:
+            tail = end + len(suffix)
+            if text.startswith(suffix, end) and (tail == len(text) or not text[tail].isalnum()):
+                return tail
+        return None
+
+    def find(self, text: str, normalized: bool = False) -> Iterator[TermMatch]:
+        """Yield whole-word matches in order of where they end; offsets refer to normalize_text(text)"""
+        if not normalized:
+            text = normalize_text(text)
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        state = 0
+        for position, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if not outputs[state]:
+                continue
+            end = self._word_end(text, position + 1)
+            if end is None:
+                continue
+            for term_length, term, value in outputs[state]:
+                start = position + 1 - term_length
+                if start == 0 or not text[start - 1].isalnum():
+                    yield TermMatch(start, end, term, value)
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Concurrency stress test for payment processing
+
+Fires parallel payments at one or more bills of a single hospital, sending
+every payment reference more than once, then checks that no update was lost
+and no payment was applied twice:
+- one payment row per reference
+- each bill's amount_paid equals the sum of its payments, and balance follows
+- payment and receipt numbers are unique
+- every retry of a reference returned the original payment
+
+Usage:
+    python stress_test_payments.py
+    python stress_test_payments.py --payments 200 --workers 16 --retries 3 --bills 16
+
+Run it against PostgreSQL (DATABASE_URL=postgresql://...): SQLite allows one
+writer at a time, so it cannot show whether payments to different bills of
+the same hospital serialize on shared rows. The rows it creates are removed
+afterwards unless --keep is given.
+"""
+import argparse
+import os
+import sys
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+# Add current directory to path
+sys.path.append(os.getcwd())
+
+from fastapi import HTTPException
+
+from server_py.db.session import engine, Base, SessionLocal
+from server_py.models.user import User
+from server_py.models.patient import Patient
+from server_py.models.patient_event import PatientEvent
+from server_py.models.document_sequence import DocumentSequence
+from server_py.models.billing import (
+    PatientBill, Payment, Receipt, BillingAudit, BillingDailyRollup
+)
+from server_py.api.billing import PaymentCreate, process_payment
+
+def setup(run_id: str, bills: int, total: float) -> dict:
+    db = SessionLocal()
+    try:
+        ids = {
+            "hospital_id": f"stress-{run_id}",
+            "user_id": f"stress-cashier-{run_id}",
+            "patient_id": f"stress-patient-{run_id}",
+            "bill_ids": [f"stress-bill-{run_id}-{n}" for n in range(bills)],
+        }
+        db.add(User(
+            id=ids["user_id"], username=ids["user_id"], password="x",
+            role="accountant", full_name="Stress Test Cashier", hospital_id=ids["hospital_id"]
+        ))
+        db.add(Patient(
+            id=ids["patient_id"], mrn=f"STRESS-{run_id}", first_name="Stress", last_name="Test",
+            age=30, gender="other", phone_number="0", nin=f"STRESS-{run_id}",
+            blood_group="O+", genotype="AA", registered_by=ids["user_id"], hospital_id=ids["hospital_id"]
+        ))
+        for n, bill_id in enumerate(ids["bill_ids"]):
+            db.add(PatientBill(
+                id=bill_id, bill_number=f"BIL-STRESS-{run_id}-{n}", hospital_id=ids["hospital_id"],
+                patient_id=ids["patient_id"], visit_type="outpatient", status="open",
+                subtotal=total, total_amount=total, balance=total, patient_responsibility=total
+            ))
+        db.commit()
+        return ids
+    finally:
+        db.close()
+
+def pay(ids: dict, bill_id: str, reference: str, amount: float):
+    db = SessionLocal()
+    try:
+        result = process_payment(
+            PaymentCreate(bill_id=bill_id, amount=amount, payment_method="cash", payment_reference=reference),
+            ids["user_id"], ids["hospital_id"], db
+        )
+        return reference, result["payment"]["id"], None
+    except HTTPException as e:
+        return reference, None, f"HTTP {e.status_code}: {e.detail}"
+    except Exception as e:
+        return reference, None, f"{type(e).__name__}: {e}"
+    finally:
+        db.close()
+
+def verify(ids: dict, results: list, expected: dict, amount: float, total: float) -> list:
+    """expected: bill id -> number of distinct payments sent to it"""
+    problems = []
+    by_reference = defaultdict(set)
+    for reference, payment_id, error in results:
+        if error:
+            problems.append(f"{reference}: {error}")
+        else:
+            by_reference[reference].add(payment_id)
+    for reference, payment_ids in by_reference.items():
+        if len(payment_ids) > 1:
+            problems.append(f"{reference}: retries returned {len(payment_ids)} different payments")
+
+    db = SessionLocal()
+    try:
+        rows = db.query(Payment).filter(Payment.hospital_id == ids["hospital_id"]).all()
+        bills = {bill.id: bill for bill in db.query(PatientBill).filter(PatientBill.id.in_(ids["bill_ids"]))}
+        receipts = db.query(Receipt.receipt_number).filter(Receipt.hospital_id == ids["hospital_id"]).all()
+    finally:
+        db.close()
+
+    payments = sum(expected.values())
+    if len(rows) != payments:
+        problems.append(f"expected {payments} payments, found {len(rows)}")
+    if len({p.payment_reference for p in rows}) != len(rows):
+        problems.append("a payment reference was applied more than once")
+    if len({p.payment_number for p in rows}) != len(rows):
+        problems.append("duplicate payment numbers")
+    if len({r.receipt_number for r in receipts}) != len(receipts):
+        problems.append("duplicate receipt numbers")
+    for bill_id, count in expected.items():
+        bill = bills[bill_id]
+        paid = sum(p.amount for p in rows if p.bill_id == bill_id)
+        if abs(bill.amount_paid - paid) > 0.005:
+            problems.append(f"{bill_id}: lost update, amount_paid {bill.amount_paid:.2f} != payments {paid:.2f}")
+        if abs(bill.amount_paid - count * amount) > 0.005:
+            problems.append(f"{bill_id}: amount_paid {bill.amount_paid:.2f} != expected {count * amount:.2f}")
+        if abs(bill.balance - (total - bill.amount_paid)) > 0.005:
+            problems.append(f"{bill_id}: balance {bill.balance:.2f} != total {total:.2f} - paid {bill.amount_paid:.2f}")
+    return problems
+
+def cleanup(ids: dict):
+    db = SessionLocal()
+    try:
+        hospital_id = ids["hospital_id"]
+        for model in (Payment, Receipt, BillingAudit, BillingDailyRollup, DocumentSequence, PatientBill):
+            db.query(model).filter(model.hospital_id == hospital_id).delete(synchronize_session=False)
+        db.query(PatientEvent).filter(PatientEvent.patient_id == ids["patient_id"]).delete(synchronize_session=False)
+        db.query(Patient).filter(Patient.id == ids["patient_id"]).delete(synchronize_session=False)
+        db.query(User).filter(User.id == ids["user_id"]).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Fire parallel payments at one bill and check the totals")
+    parser.add_argument("--payments", type=int, default=100, help="distinct payments (references)")
+    parser.add_argument("--retries", type=int, default=2, help="times each reference is sent")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--amount", type=float, default=10.0)
+    parser.add_argument("--bills", type=int, default=1, help="bills the payments are spread over")
+    parser.add_argument("--keep", action="store_true", help="leave the test rows in the database")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    run_id = uuid.uuid4().hex[:8]
+    per_bill = -(-args.payments // args.bills)
+    total = per_bill * args.amount
+    ids = setup(run_id, args.bills, total)
+    print(f"   ✓ {args.bills} bills created for ₦{total:,.2f} each ({engine.dialect.name})")
+
+    references = [f"STRESS-{run_id}-{n}" for n in range(args.payments)]
+    bill_for = {reference: ids["bill_ids"][n % args.bills] for n, reference in enumerate(references)}
+    expected = {}
+    for bill_id in bill_for.values():
+        expected[bill_id] = expected.get(bill_id, 0) + 1
+    # Interleave retries so duplicates of a reference run concurrently
+    attempts = [reference for _ in range(args.retries) for reference in references]
+    print(f"Sending {len(attempts)} payment requests with {args.workers} workers...")
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        results = list(pool.map(lambda reference: pay(ids, bill_for[reference], reference, args.amount), attempts))
+    elapsed = time.monotonic() - started
+    print(f"   ✓ {len(attempts)} requests in {elapsed:.2f}s ({len(attempts) / elapsed:.0f} requests/sec)")
+
+    problems = verify(ids, results, expected, args.amount, total)
+    if not args.keep:
+        cleanup(ids)
+
+    for problem in problems[:20]:
+        print(f"   ❌ {problem}")
+    if len(problems) > 20:
+        print(f"   ... and {len(problems) - 20} more")
+    if problems:
+        print(f"\n❌ Stress test failed with {len(problems)} problems")
+        sys.exit(1)
+    print(f"\n✅ {args.payments} payments applied exactly once across {len(attempts)} concurrent requests")
+
+if __name__ == "__main__":
+    main()
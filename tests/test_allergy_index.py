@@ -0,0 +1,30 @@
+from server_py.services.allergy_index import get_allergy_index, parse_allergies
+
+def conflicts(medications, allergies):
+    return [(c["medication"], c["allergy"], c["severity"]) for c in get_allergy_index().check(medications, allergies)]
+
+def test_class_allergy_catches_member_drug():
+    assert conflicts(["Amoxicillin 500mg"], ["penicillin"]) == [("Amoxicillin 500mg", "penicillin", "high")]
+
+def test_cross_reactive_class_is_moderate():
+    assert conflicts(["Ceftriaxone 1g"], ["penicillin"]) == [("Ceftriaxone 1g", "penicillin", "moderate")]
+
+def test_synonym_resolves_to_generic():
+    assert conflicts(["Panadol extra"], ["acetaminophen"]) == [("Panadol extra", "acetaminophen", "high")]
+
+def test_unknown_drug_with_dose_still_conflicts():
+    assert conflicts(["Vancomycin 1g IV"], ["Vancomycin"]) == [("Vancomycin 1g IV", "Vancomycin", "high")]
+
+def test_unknown_allergen_contained_either_way():
+    assert conflicts(["Latex gloves"], ["latex"]) == [("Latex gloves", "latex", "high")]
+    assert conflicts(["latex"], ["latex gloves"]) == [("latex", "latex gloves", "high")]
+
+def test_unknown_allergen_needs_whole_words():
+    assert conflicts(["Heparin 5000 units"], ["ear"]) == []
+    assert conflicts(["Vancomycin 1g IV"], ["penicillin"]) == []
+
+def test_parse_allergies():
+    assert parse_allergies("Penicillin, sulfa and latex; aspirin/peanuts") == [
+        "Penicillin", "sulfa", "latex", "aspirin", "peanuts"
+    ]
+    assert parse_allergies(None) == []
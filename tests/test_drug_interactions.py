@@ -0,0 +1,88 @@
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from server_py.api.prescriptions import PrescriptionCreate, create_prescription
+from server_py.db.session import Base
+from server_py.models.patient import Patient
+from server_py.models.prescription import Prescription
+from server_py.models.user import User
+from server_py.services.drug_interactions import DrugInteractionGraph
+
+def pairs(interactions):
+    return [(i["drug1"], i["drug2"], i["severity"]) for i in interactions]
+
+def test_interactions_are_symmetric():
+    graph = DrugInteractionGraph([("warfarin", "aspirin", "major", "Bleeding risk")])
+    assert pairs(graph.check(["warfarin", "aspirin"])) == [("warfarin", "aspirin", "major")]
+    assert pairs(graph.check(["aspirin", "warfarin"])) == [("aspirin", "warfarin", "major")]
+
+def test_duplicate_pairs_share_one_edge():
+    graph = DrugInteractionGraph([
+        ("warfarin", "aspirin", "major", ""),
+        ("Aspirin", "Warfarin", "major", ""),
+    ])
+    assert len(graph) == 1
+    assert graph.drug_count == 2
+    assert len(graph.check(["warfarin", "aspirin"])) == 1
+
+def test_most_severe_row_wins():
+    graph = DrugInteractionGraph([
+        ("fluoxetine", "tramadol", "moderate", "Serotonin syndrome possible"),
+        ("fluoxetine", "tramadol", "contraindicated", "Serotonin syndrome"),
+        ("tramadol", "fluoxetine", "minor", "Ignored"),
+    ])
+    [interaction] = graph.check(["fluoxetine", "tramadol"])
+    assert interaction["severity"] == "contraindicated"
+    assert interaction["description"] == "Serotonin syndrome"
+
+def test_free_text_resolves_to_known_drug():
+    graph = DrugInteractionGraph([("warfarin", "aspirin", "major", "")])
+    assert graph.resolve("Warfarin 5mg") == graph.resolve("warfarin")
+    assert pairs(graph.check(["Warfarin 5mg tablets", "Aspirin 75mg"])) == [("warfarin", "aspirin", "major")]
+    assert graph.resolve("Paracetamol 500mg") == []
+
+def test_check_against_skips_current_vs_current():
+    graph = DrugInteractionGraph([
+        ("warfarin", "aspirin", "major", ""),
+        ("simvastatin", "clarithromycin", "contraindicated", ""),
+    ])
+    # warfarin + aspirin are both already being taken; only the new drug's pairs count
+    assert graph.check_against(["Metformin 500mg"], ["warfarin", "aspirin"]) == []
+    assert pairs(graph.check_against(["Clarithromycin 500mg"], ["warfarin", "aspirin", "simvastatin"])) == [
+        ("clarithromycin", "simvastatin", "contraindicated")
+    ]
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all([
+            User(id="d1", username="doctor1", password="x", role="doctor", full_name="Dr. Ada Obi"),
+            Patient(id="p1", mrn="MRN1", first_name="Bola", last_name="Ade", age=60, gender="female",
+                    phone_number="0800", nin="NIN1", blood_group="O+", genotype="AA", registered_by="d1"),
+            Prescription(id="rx1", patient_id="p1", doctor_id="d1", medication_name="Simvastatin 40mg",
+                         dosage="40mg", frequency="nightly", duration="90 days", status="dispensed"),
+        ])
+        session.commit()
+        yield session
+
+def prescribe(db, **overrides):
+    rx = PrescriptionCreate(patient_id="p1", medication_name="Clarithromycin 500mg", dosage="500mg",
+                            frequency="twice daily", duration="7 days", **overrides)
+    return create_prescription(rx, doctor_id="d1", db=db)
+
+def test_contraindicated_prescription_is_refused(db):
+    with pytest.raises(HTTPException) as error:
+        prescribe(db)
+    assert error.value.status_code == 409
+    assert pairs(error.value.detail["interactions"]) == [("clarithromycin", "simvastatin", "contraindicated")]
+    assert db.query(Prescription).count() == 1
+
+def test_override_prescribes_and_reports_interactions(db):
+    result = prescribe(db, override_interactions=True)
+    assert result["prescription"]["medicationName"] == "Clarithromycin 500mg"
+    assert pairs(result["interactions"]) == [("clarithromycin", "simvastatin", "contraindicated")]
+    assert db.query(Prescription).count() == 2
@@ -0,0 +1,18 @@
+import pytest
+from sqlalchemy import create_engine
+
+import migrate_indexes
+from server_py.db.session import Base
+
+@pytest.fixture(scope="module")
+def engine():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    return engine
+
+@pytest.mark.parametrize("name", list(migrate_indexes.HOT_QUERIES))
+def test_hot_query_uses_an_index(engine, monkeypatch, name):
+    monkeypatch.setattr(migrate_indexes, "engine", engine)
+    sql = str(migrate_indexes.HOT_QUERIES[name].compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+    with engine.connect() as conn:
+        assert migrate_indexes._full_scans(conn, sql) == []
@@ -0,0 +1,59 @@
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import Column, DateTime, String, create_engine, text
+from sqlalchemy.orm import Session, declarative_base
+
+from server_py.api.pagination import decode_cursor, encode_cursor, paginate
+
+Base = declarative_base()
+
+class Item(Base):
+    __tablename__ = "items"
+    id = Column(String, primary_key=True)
+    created_at = Column(DateTime, nullable=True)
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all([
+            Item(id="a", created_at=datetime(2024, 1, 1, 10, 0, 0)),
+            Item(id="b", created_at=datetime(2024, 1, 1, 10, 0, 0)),
+            Item(id="d", created_at=datetime(2024, 1, 2, 9, 30, 0, 250000)),
+            Item(id="e", created_at=None),
+            Item(id="f", created_at=None),
+        ])
+        session.commit()
+        # CURRENT_TIMESTAMP-style text without fractional seconds, tied with a and b
+        session.execute(text("INSERT INTO items (id, created_at) VALUES ('c', '2024-01-01 10:00:00')"))
+        session.commit()
+        yield session
+
+def all_pages(db, limit):
+    ids, cursor = [], None
+    while True:
+        page, cursor = paginate(db.query(Item), Item.created_at, Item.id, cursor, limit)
+        ids.extend(item.id for item in page)
+        if cursor is None:
+            return ids
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 10])
+def test_pages_cover_every_row_once(db, limit):
+    ids = all_pages(db, limit)
+    assert sorted(ids) == ["a", "b", "c", "d", "e", "f"]
+    assert ids == all_pages(db, 10)
+
+def test_null_sort_values_come_last_on_sqlite(db):
+    assert all_pages(db, 2)[-2:] == ["f", "e"]
+
+def test_cursor_round_trips_null_and_text():
+    assert decode_cursor(encode_cursor(None, "x"), "sqlite") == (None, "x")
+    assert decode_cursor(encode_cursor("2024-01-01 10:00:00", "x"), "sqlite") == ("2024-01-01 10:00:00", "x")
+    assert decode_cursor(encode_cursor(datetime(2024, 1, 1), "x")) == (datetime(2024, 1, 1), "x")
+
+def test_invalid_cursor_is_rejected():
+    with pytest.raises(HTTPException):
+        decode_cursor("not-a-cursor")
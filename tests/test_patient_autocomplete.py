@@ -0,0 +1,113 @@
+import threading
+
+import pytest
+
+from server_py.config import get_settings
+from server_py.services.patient_autocomplete import IndexedPatient, PatientAutocomplete
+
+def patient(patient_id, first_name, last_name, hospital_id="h1"):
+    return IndexedPatient(patient_id, first_name, last_name, f"MRN{patient_id}", f"NIN{patient_id}", hospital_id)
+
+class FakeQuery:
+    def __init__(self, db):
+        self.db = db
+
+    def filter(self, *criteria):
+        return self
+
+    def limit(self, count):
+        return self
+
+    def all(self):
+        self.db.builds += 1
+        self.db.started.set()
+        self.db.release.wait(5)
+        return list(self.db.rows)
+
+class FakeSession:
+    """Stands in for the patient query; all() blocks until release is set"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.builds = 0
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def query(self, *columns):
+        return FakeQuery(self)
+
+@pytest.fixture
+def settings(monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "AUTOCOMPLETE_REBUILD_SECONDS", 3600)
+    return settings
+
+def names(results):
+    return [result["firstName"] for result in results]
+
+def test_lookup_builds_once_and_answers(settings):
+    db = FakeSession([patient("1", "Ada", "Obi"), patient("2", "Adamu", "Bello")])
+    db.release.set()
+    autocomplete = PatientAutocomplete()
+    assert names(autocomplete.lookup(db, "ada", "h1")) == ["Adamu", "Ada"]
+    assert names(autocomplete.lookup(db, "obi", "h1")) == ["Ada"]
+    assert db.builds == 1
+
+def test_build_runs_outside_the_registry_lock(settings):
+    db = FakeSession([patient("1", "Ada", "Obi")])
+    autocomplete = PatientAutocomplete()
+    results = []
+    builder = threading.Thread(target=lambda: results.append(autocomplete.lookup(db, "ada", "h1")))
+    builder.start()
+    assert db.started.wait(5)
+
+    # Other hospitals' indexes and writes are not held up by the build
+    other = FakeSession([patient("9", "Bola", "Ade", "h2")])
+    other.release.set()
+    assert names(autocomplete.lookup(other, "bola", "h2")) == ["Bola"]
+    # A patient written mid-build is replayed onto the new index
+    autocomplete.upsert(patient("3", "Adaeze", "Eze"))
+
+    db.release.set()
+    builder.join(5)
+    assert names(results[0]) == ["Adaeze", "Ada"]
+    assert names(autocomplete.lookup(db, "adaeze", "h1")) == ["Adaeze"]
+
+def test_one_builder_per_hospital(settings):
+    db = FakeSession([patient("1", "Ada", "Obi")])
+    autocomplete = PatientAutocomplete()
+    results = []
+    lookups = [
+        threading.Thread(target=lambda: results.append(autocomplete.lookup(db, "ada", "h1")))
+        for _ in range(4)
+    ]
+    for thread in lookups:
+        thread.start()
+    assert db.started.wait(5)
+    db.release.set()
+    for thread in lookups:
+        thread.join(5)
+    assert db.builds == 1
+    assert [names(result) for result in results] == [["Ada"]] * 4
+
+def test_stale_index_answers_while_rebuilding(settings, monkeypatch):
+    db = FakeSession([patient("1", "Ada", "Obi")])
+    db.release.set()
+    autocomplete = PatientAutocomplete()
+    autocomplete.lookup(db, "ada", "h1")
+
+    monkeypatch.setattr(settings, "AUTOCOMPLETE_REBUILD_SECONDS", 0)
+    db.release.clear()
+    db.started.clear()
+    db.rows = [patient("1", "Ada", "Obi"), patient("2", "Adamu", "Bello")]
+    results = []
+    rebuilder = threading.Thread(target=lambda: results.append(autocomplete.lookup(db, "ada", "h1")))
+    rebuilder.start()
+    assert db.started.wait(5)
+    # Served from the old index without waiting for the rebuild
+    assert names(autocomplete.lookup(db, "ada", "h1")) == ["Ada"]
+
+    db.release.set()
+    rebuilder.join(5)
+    assert names(results[0]) == ["Adamu", "Ada"]
+    assert db.builds == 2
@@ -0,0 +1,44 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from server_py.api.patients import get_patient_status_counts
+from server_py.db.session import Base
+from server_py.models.patient import Patient
+
+def patient(patient_id, days_old=30, doctor_id="d1", phone="0800", **vitals):
+    return Patient(
+        id=patient_id, mrn=f"MRN{patient_id}", first_name="Ada", last_name="Obi", age=vitals.pop("age", 40),
+        gender="female", phone_number=phone, nin=f"NIN{patient_id}", blood_group="O+", genotype="AA",
+        registered_by="r1", assigned_doctor_id=doctor_id,
+        created_at=datetime.utcnow() - timedelta(days=days_old, hours=1), **vitals
+    )
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all([
+            patient("1", days_old=0, temperature="36.8"),
+            patient("2", days_old=5, bp_systolic=170, temperature="36.5"),
+            patient("3", heart_rate=130, phone=""),
+            patient("4", age=72, temperature="37.1C"),
+            patient("5", age=65, temperature="38.2"),
+            patient("6", temperature="", doctor_id="d2"),
+            patient("7", days_old=1, temperature="normal", doctor_id="d2"),
+        ])
+        session.commit()
+        yield session
+
+def test_counts_match_dashboard_heuristics(db):
+    assert get_patient_status_counts(db=db) == {
+        "total": 7, "new": 2, "lastVisit": 3, "critical": 2, "lowRisk": 2,
+        "booked": 6, "discharged": 1, "death": 0
+    }
+
+def test_counts_for_one_doctor(db):
+    counts = get_patient_status_counts(doctor_id="d2", db=db)
+    assert (counts["total"], counts["new"], counts["lowRisk"]) == (2, 1, 0)
@@ -0,0 +1,62 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from server_py.db.session import Base
+from server_py.models.appointment import Appointment
+from server_py.models.notification import Notification
+from server_py.models.patient_event import PatientEvent
+from server_py.services.storage import StorageService
+
+APPOINTMENT = {
+    "patientId": "p1", "doctorId": "d1", "appointmentDate": "2026-10-20",
+    "appointmentTime": "10:00", "reason": "Checkup", "createdBy": "u1",
+}
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+
+def counts(db):
+    return db.query(Appointment).count(), db.query(Notification).count(), db.query(PatientEvent).count()
+
+def test_batch_commits_once(db, monkeypatch):
+    storage = StorageService(db)
+    commits = []
+    real_commit = db.commit
+    monkeypatch.setattr(db, "commit", lambda: commits.append(1) or real_commit())
+
+    with storage.batch():
+        appointment = storage.create_appointment(APPOINTMENT)
+        storage.create_notification({
+            "department_id": "dep1", "patient_id": "p1", "appointment_id": appointment.id,
+            "type": "appointment", "title": "New appointment", "message": "Checkup",
+            "requested_by": "u1",
+        })
+        # Nested blocks join the outer transaction
+        with storage.batch():
+            storage.create_appointment(APPOINTMENT)
+        assert commits == []
+
+    assert commits == [1]
+    assert counts(db) == (2, 1, 2)
+
+def test_batch_rolls_back_every_write(db):
+    storage = StorageService(db)
+    with pytest.raises(Exception):
+        with storage.batch():
+            storage.create_appointment(APPOINTMENT)
+            storage.create_notification({"department_id": "dep1"})
+    assert counts(db) == (0, 0, 0)
+
+def test_after_commit_callbacks_wait_for_the_commit(db):
+    storage = StorageService(db)
+    calls = []
+    with storage.batch():
+        storage._after_commit(lambda: calls.append(db.query(Appointment).count()))
+        storage.create_appointment(APPOINTMENT)
+        assert calls == []
+    assert calls == [1]
@@ -0,0 +1,49 @@
+import pytest
+
+from server_py.services.nlp_service import NLPService
+from server_py.services.symspell import SymSpell, edit_distance
+
+def corrections(text):
+    return NLPService.normalize_symptoms_with_corrections(text)[1]
+
+@pytest.mark.parametrize("text", [
+    "kelly has a sore throat",
+    "bella brought her son in",
+    "gummy vitamins daily",
+    "visited hever castle",
+    "burts bees lip balm",
+    "felt a chill outside",
+])
+def test_ordinary_words_are_not_corrected(text):
+    assert corrections(text) == {}
+
+@pytest.mark.parametrize("text, expected", [
+    ("bad hedache", {"hedache": "headache"}),
+    ("vomitting since morning", {"vomitting": "vomiting"}),
+    ("severe fatique", {"fatique": "fatigue"}),
+    ("diarhea", {"diarhea": "diarrhea"}),
+])
+def test_misspelt_symptoms_are_corrected(text, expected):
+    assert corrections(text) == expected
+
+def test_normalize_symptoms_uses_corrected_text():
+    assert NLPService.normalize_symptoms_with_corrections("hedache and nausia") == (
+        ["headache", "nausea"], {"hedache": "headache", "nausia": "nausea"}
+    )
+    assert NLPService.normalize_symptoms("diarrhoea for two days") == ["diarrhea"]
+
+def test_correction_keeps_first_letter():
+    speller = SymSpell(["belly"])
+    assert speller.lookup("kelly") is None
+    assert speller.lookup("bellu") == ("belly", 1)
+
+def test_attested_words_need_a_frequency_margin():
+    frequencies = {"fevar": 1.0, "fevor": 3.0, "fever": 4.2}
+    speller = SymSpell(["fever"], frequency=lambda word: frequencies.get(word, 0.0), known_frequency=3.5)
+    assert speller.lookup("fevar") == ("fever", 1)
+    assert speller.lookup("fevor") is None
+    assert speller.lookup("fevvr") == ("fever", 1)
+
+def test_edit_distance_counts_transpositions_once():
+    assert edit_distance("haedache", "headache", 2) == 1
+    assert edit_distance("abcdef", "azzzef", 2) is None